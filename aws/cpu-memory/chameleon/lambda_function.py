@@ -1,38 +1,20 @@
-from time import time
-import six
-import json
-from chameleon import PageTemplate
-
-
-BIGTABLE_ZPT = """\
-<table xmlns="http://www.w3.org/1999/xhtml"
-xmlns:tal="http://xml.zope.org/namespaces/tal">
-<tr tal:repeat="row python: options['table']">
-<td tal:repeat="c python: row.values()">
-<span tal:define="d python: c + 1"
-tal:attributes="class python: 'column-' + %s(d)"
-tal:content="python: d" />
-</td>
-</tr>
-</table>""" % six.text_type.__name__
+from functionbench import events, instrument
+from functionbench.workloads.chameleon import render_table, render_table_stream
 
 
 def lambda_handler(event, context):
     num_of_rows = event['num_of_rows']
     num_of_cols = event['num_of_cols']
 
-    start = time()
-    tmpl = PageTemplate(BIGTABLE_ZPT)
-
-    data = {}
-    for i in range(num_of_cols):
-        data[str(i)] = i
-
-    table = [data for x in range(num_of_rows)]
-    options = {'table': table}
-
-    data = tmpl.render(options=options)
-    latency = time() - start
-
-    result = json.dumps({'latency': latency, 'data': data})
-    return result
+    data = None
+    with instrument.Recorder("chameleon", "aws") as rec:
+        if events.flag(event.get('stream')):
+            result = render_table_stream(num_of_rows, num_of_cols, event.get('sink', 'discard'),
+                                         int(event.get('chunk_rows', 1000)))
+        else:
+            result, data = render_table(num_of_rows, num_of_cols)
+
+    # the rendered table is part of the response, as it always was on AWS
+    return rec.result(data=data, output_bytes=result['output_bytes'], template_cache=result['template_cache'],
+                      cache_hit=result['cache_hit'],
+                      rows_per_sec=result['rows_per_sec'], peak_rss_growth=result['peak_rss_growth'])
@@ -1,38 +1,24 @@
-import boto3
 import pandas as pd
-from time import time
-import re
+import io
 
-s3 = boto3.client('s3')
+from functionbench import instrument, storage
+from functionbench.workloads.feature_generation import extract_features
 
-cleanup_re = re.compile('[^a-z]+')
-
-
-def cleanup(sentence):
-    sentence = sentence.lower()
-    sentence = cleanup_re.sub(' ', sentence).strip()
-    return sentence
+s3 = storage.open_store()
 
 
 def lambda_handler(event, context):
     bucket = event['input_bucket']
     key = event['key']
-    path = bucket + "/" + key
-    df = pd.read_csv('s3://' + path)
-
-    start = time()
-    df['Text'] = df['Text'].apply(cleanup)
-    text = df['Text'].tolist()
-    result = set()
-    for item in text:
-        result.update(item.split())
-    print("Number of Feature : " + str(len(result)))
-
-    feature = str(list(result))
-    feature = feature.lstrip('[').rstrip(']').replace(' ', '')
-    latency = time() - start
-    print(latency)
-
-    write_key = event['key'].split('.')[0] + ".txt"
-    s3.put_object(Body=feature, Bucket=bucket, Key=write_key)
-    return latency
+
+    with instrument.Recorder("feature_extractor", "aws") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            df = pd.read_csv(io.BytesIO(s3.get_object(bucket, key)))
+
+        latency, feature = extract_features(df)
+
+        write_key = event['key'].split('.')[0] + ".txt"
+        with rec.span(instrument.UPLOAD_DATA):
+            s3.put_object(bucket, write_key, feature)
+
+    return rec.result()
@@ -1,32 +1,28 @@
-import boto3
-from time import time
-from sklearn.feature_extraction.text import TfidfVectorizer
+from functionbench import instrument, storage
+from functionbench.workloads.feature_generation import split_features, reduce_features
 
-s3 = boto3.resource('s3')
-s3_client = boto3.client('s3')
+s3_client = storage.open_store()
 
 
 def lambda_handler(event, context):
     bucket = event['input_bucket']
-    s3_bucket = s3.Bucket(bucket)
 
     result = []
-    latency = 0
 
-    for obj in s3_bucket.objects.all():
-        body = obj.get()['Body'].read()
-        start = time()
-        word = body.replace("'", '').split(',')
-        result.extend(word)
-        latency += time() - start
+    with instrument.Recorder("feature_reducer", "aws") as rec:
+        for key in s3_client.list_objects(bucket):
+            with rec.span(instrument.DOWNLOAD_DATA):
+                body = s3_client.get_object(bucket, key)
+            with rec.span(instrument.FUNCTION_EXECUTION):
+                result.extend(split_features(body))
 
-    print(len(result))
+        print(len(result))
 
-    tfidf_vect = TfidfVectorizer().fit(result)
-    feature = str(tfidf_vect.get_feature_names())
-    feature = feature.lstrip('[').rstrip(']').replace(' ' , '')
-    
-    feature_key = 'feature.txt'
-    s3_client.put_object(Body=str(feature), Bucket=bucket, Key=feature_key)
+        with rec.span("reduce"):
+            feature = reduce_features(result)
 
-    return latency
+        feature_key = 'feature.txt'
+        with rec.span(instrument.UPLOAD_DATA):
+            s3_client.put_object(bucket, feature_key, str(feature))
+
+    return rec.result()
@@ -1,15 +1,12 @@
-import boto3
+from functionbench import storage
 
-s3 = boto3.resource('s3')
+s3 = storage.open_store()
 
 
 def lambda_handler(event, context):
     num_of_file = int(event['num_of_file'])
     bucket = event['input_bucket']
-    all_keys = []
-
-    for obj in s3.Bucket(bucket).objects.all():
-        all_keys.append(obj.key)
+    all_keys = s3.list_objects(bucket)
     print("Number of File : " + str(len(all_keys)))
     
     if num_of_file == len(all_keys):
@@ -3,7 +3,9 @@ import json
 from functools import partial
 from multiprocessing.dummy import Pool as ThreadPool
 
-s3 = boto3.resource('s3')
+from functionbench import storage
+
+s3 = storage.open_store()
 lambda_client = boto3.client('lambda')
 
 
@@ -20,10 +22,7 @@ def invoke_lambda(bucket, key):
 
 def lambda_handler(event, context):
     bucket = event['bucket'] 
-    all_keys = []
-
-    for obj in s3.Bucket(bucket).objects.all():
-        all_keys.append(obj.key)
+    all_keys = s3.list_objects(bucket)
     print("Number of File : " + str(len(all_keys)))
     print("File : " + str(all_keys))
     
@@ -1,19 +1,12 @@
-import math
-from time import time
-
-
-def float_operations(n):
-    start = time()
-    for i in range(0, n):
-        sin_i = math.sin(i)
-        cos_i = math.cos(i)
-        sqrt_i = math.sqrt(i)
-    latency = time() - start
-    return latency
+from functionbench import instrument
+from functionbench.workloads.float_operation import float_operations
 
 
 def lambda_handler(event, context):
     n = int(event['n'])
-    result = float_operations(n)
-    print(result)
-    return result
+    engine = event.get('engine', 'python')
+    threads = event.get('threads')
+    with instrument.Recorder("float_operation", "aws") as rec:
+        result = float_operations(n, engine, threads=threads and int(threads))
+    return rec.result(engine=result['engine'], threads=result['threads'],
+                      ops_per_sec=result['ops_per_sec'])
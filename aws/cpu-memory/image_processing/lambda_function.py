@@ -1,41 +1,37 @@
-import boto3
-import uuid
-from time import time
-from PIL import Image
+from functionbench import instrument, storage
+from functionbench.workloads.image_processing import image_batch, image_pipeline
 
-import ops
-
-s3_client = boto3.client('s3')
-FILE_NAME_INDEX = 2
-
-
-def image_processing(file_name, image_path):
-    path_list = []
-    start = time()
-    with Image.open(image_path) as image:
-        tmp = image
-        path_list += ops.flip(image, file_name)
-        path_list += ops.rotate(image, file_name)
-        path_list += ops.filter(image, file_name)
-        path_list += ops.gray_scale(image, file_name)
-        path_list += ops.resize(image, file_name)
-
-    latency = time() - start
-    return latency, path_list
+s3_client = storage.open_store()
 
 
 def lambda_handler(event, context):
     input_bucket = event['input_bucket']
-    object_key = event['object_key']
     output_bucket = event['output_bucket']
+    workers = event.get('workers')
+    ops = event.get('ops')
+
+    # batch form: "object_keys": [...] or "prefix": "photos/"
+    object_keys = event.get('object_keys')
+    if object_keys is not None or 'prefix' in event:
+        with instrument.Recorder("image_processing", "aws") as rec:
+            keys = object_keys
+            if keys is None:
+                keys = s3_client.list_objects(input_bucket, event['prefix'])
+            result = image_batch(s3_client, input_bucket, keys, output_bucket,
+                                 int(event.get('concurrency', 4)), int(workers or 1), ops)
+        return rec.result(images=result['images'], images_per_sec=result['images_per_sec'],
+                          input_mb_per_sec=result['input_mb_per_sec'],
+                          mean_image_latency=result['mean_image_latency'], per_image=result['per_image'])
 
-    download_path = '/tmp/{}{}'.format(uuid.uuid4(), object_key)
-
-    s3_client.download_file(input_bucket, object_key, download_path)
+    object_key = event['object_key']
+    with instrument.Recorder("image_processing", "aws") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            data = s3_client.get_object(input_bucket, object_key)
 
-    latency, path_list = image_processing(object_key, download_path)
+        result, outputs = image_pipeline(data, object_key, workers, ops)
 
-    for upload_path in path_list:
-        s3_client.upload_file(upload_path, output_bucket, upload_path.split("/")[FILE_NAME_INDEX])
+        with rec.span(instrument.UPLOAD_DATA):
+            for key, body in outputs.items():
+                s3_client.put_object(output_bucket, key, body)
 
-    return latency
+    return rec.result(output_bytes=result['output_bytes'])
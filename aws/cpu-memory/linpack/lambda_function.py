@@ -1,36 +1,11 @@
-from numpy import matrix, linalg, random
-from time import time
-
-
-def linpack(n):
-    # LINPACK benchmarks
-    ops = (2.0 * n) * n * n / 3.0 + (2.0 * n) * n
-
-    # Create AxA array of random numbers -0.5 to 0.5
-    A = random.random_sample((n, n)) - 0.5
-    B = A.sum(axis=1)
-
-    # Convert to matrices
-    A = matrix(A)
-    B = matrix(B.reshape((n, 1)))
-
-    # Ax = B
-    start = time()
-    x = linalg.solve(A, B)
-    latency = time() - start
-
-    mflops = (ops * 1e-6 / latency)
-
-    result = {
-        'mflops': mflops,
-        'latency': latency
-    }
-
-    return result
+from functionbench import instrument
+from functionbench.workloads.linpack import linpack
 
 
 def lambda_handler(event, context):
     n = int(event['n'])
-    result = linpack(n)
-    print(result)
-    return result
+    with instrument.Recorder("linpack", "aws") as rec:
+        result = linpack(n, event.get('mode', 'solve'), int(event.get('rhs', 100)),
+                         int(event.get('batch', 1000)))
+    return rec.result(mflops=result['mflops'], residual=result['residual'],
+                      residual_ok=result['residual_ok'])
@@ -4,9 +4,10 @@ from functools import partial
 from multiprocessing.dummy import Pool as ThreadPool
 import time
 
+from functionbench import instrument, storage
+
 # Create AWS resource and client
-s3 = boto3.resource('s3')
-s3_client = boto3.client('s3')
+s3_client = storage.open_store()
 lambda_client = boto3.client('lambda')
 
 total_map = 0
@@ -30,14 +31,14 @@ def map_invoke_lambda(job_bucket, bucket, all_keys, batch_size, mapper_id):
             "mapper_id": mapper_id
         })
     )
-    output = eval(response['Payload'].read())
+    output = json.loads(response['Payload'].read())
     print("mapper output : ", output)
 
-    json_data = json.loads(output)
+    latencies = output['latencies']
 
     global total_map, total_network
-    total_map += float(json_data['map'])
-    total_network += float(json_data['network'])
+    total_map += latencies[instrument.FUNCTION_EXECUTION]
+    total_network += latencies[instrument.DOWNLOAD_DATA] + latencies[instrument.UPLOAD_DATA]
 
 
 def reduce_invoke_lambda(job_bucket):
@@ -48,7 +49,7 @@ def reduce_invoke_lambda(job_bucket):
             "job_bucket": job_bucket
         })
     )
-    output = eval(response['Payload'].read())
+    output = json.loads(response['Payload'].read())
     print("reducer output : ", output)
 
 
@@ -58,9 +59,7 @@ def lambda_handler(event, context):
     n_mapper = event['n_mapper']
 
     # Fetch all the keys
-    all_keys = []
-    for obj in s3.Bucket(src_bucket).objects.all():
-        all_keys.append(obj.key)
+    all_keys = s3_client.list_objects(src_bucket)
 
     print("dataset file : " + str(len(all_keys)))
     print("key name : " + str(all_keys))
@@ -84,7 +83,7 @@ def lambda_handler(event, context):
     pool.join()
 
     while True:
-        job_keys = s3_client.list_objects(Bucket=job_bucket)["Contents"]
+        job_keys = s3_client.list_objects(job_bucket)
         print("Wait Mapper Jobs ...")
         time.sleep(5)
         if len(job_keys) == len(all_keys):
@@ -1,19 +1,13 @@
-import numpy as np
-from time import time
-
-
-def matmul(n):
-    A = np.random.rand(n, n)
-    B = np.random.rand(n, n)
-
-    start = time()
-    C = np.matmul(A, B)
-    latency = time() - start
-    return latency
+from functionbench import events, instrument
+from functionbench.workloads.matmul import matmul
 
 
 def lambda_handler(event, context):
     n = int(event['n'])
-    result = matmul(n)
-    print(result)
-    return result
+    with instrument.Recorder("matmul", "aws") as rec:
+        result = matmul(n, event.get('dtype', 'float64'), event.get('layout', 'C'),
+                        threads=int(event.get('threads', 0)), reps=int(event.get('reps', 1)),
+                        warmup=int(event.get('warmup', 0)), blocked=events.flag(event.get('blocked')),
+                        block_size=int(event.get('block_size', 1024)))
+    return rec.result(gflops=result['gflops'], best_gflops=result['best_gflops'],
+                      peak_rss_growth=result['peak_rss_growth'], blas_threads=result['blas_threads'])
@@ -0,0 +1,37 @@
+import os
+import uuid
+
+from functionbench import instrument, models, storage
+from functionbench.workloads.cnn_image_classification_lite import load_labels, load_model, predict
+
+s3_client = storage.open_store()
+
+tmp = "/tmp/"
+
+
+def lambda_handler(event, context):
+    input_bucket = event['input_bucket']
+    object_key = event['object_key']
+
+    model_object_key = event['model_object_key']  # example : squeezenet.tflite or squeezenet.onnx
+    model_bucket = event['model_bucket']
+    model_sha256 = event.get('model_sha256')
+    labels_object_key = event.get('labels_object_key')  # example : imagenet_class_index.json
+    preprocessing = event.get('preprocessing', 'keras')  # or "fast"
+
+    with instrument.Recorder("cnn_image_classification_lite", "aws") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            download_path = tmp + '{}{}'.format(uuid.uuid4(), os.path.basename(object_key))
+            s3_client.download_file(input_bucket, object_key, download_path)
+
+        with rec.span(instrument.MODEL_LOAD):
+            model, model_cache = models.load(s3_client, model_bucket, model_object_key, load_model,
+                                             sha256=model_sha256)
+            labels = None
+            if labels_object_key:
+                labels, _ = models.load(s3_client, model_bucket, labels_object_key, load_labels)
+
+        latency, result = predict(download_path, model, labels, preprocessing)
+
+    return rec.result(predictions=[[x[1], float(x[2])] for x in result[0]],
+                      model_cache=model_cache, cache_hit=model_cache != models.DOWNLOAD)
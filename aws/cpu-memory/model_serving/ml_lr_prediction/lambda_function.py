@@ -1,53 +1,32 @@
-import boto3
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.externals import joblib
 import pandas as pd
-from time import time
-import os
-import re
+import io
 
-s3_client = boto3.client('s3')
-tmp = '/tmp/'
-cleanup_re = re.compile('[^a-z]+')
+from functionbench import instrument, models, storage
+from functionbench.workloads.ml_lr_prediction import load_model, needs_dataset, predict
 
-
-def cleanup(sentence):
-    sentence = sentence.lower()
-    sentence = cleanup_re.sub(' ', sentence).strip()
-    return sentence
+s3_client = storage.open_store()
 
 
 def lambda_handler(event, context):
     x = event['x']
 
-    dataset_object_key = event['dataset_object_key']
-    dataset_bucket = event['dataset_bucket']
+    # only read for models trained before the vectorizer was saved with them
+    dataset_object_key = event.get('dataset_object_key')
+    dataset_bucket = event.get('dataset_bucket')
 
     model_object_key = event['model_object_key']  # example : lr_model.pk
     model_bucket = event['model_bucket']
 
-    model_path = tmp + model_object_key
-    if not os.path.isfile(model_path):
-        s3_client.download_file(model_bucket, model_object_key, model_path)
-
-    dataset_path = 's3://'+dataset_bucket+'/'+dataset_object_key
-    dataset = pd.read_csv(dataset_path)
-
-    start = time()
-
-    df_input = pd.DataFrame()
-    df_input['x'] = [x]
-    df_input['x'] = df_input['x'].apply(cleanup)
-
-    dataset['train'] = dataset['Text'].apply(cleanup)
-
-    tfidf_vect = TfidfVectorizer(min_df=100).fit(dataset['train'])
-
-    X = tfidf_vect.transform(df_input['x'])
+    with instrument.Recorder("ml_lr_prediction", "aws") as rec:
+        with rec.span(instrument.MODEL_LOAD):
+            model, model_cache = models.load(s3_client, model_bucket, model_object_key, load_model)
 
-    model = joblib.load(model_path)
-    y = model.predict(X)
+        dataset = None
+        if needs_dataset(model):
+            with rec.span(instrument.DOWNLOAD_DATA):
+                dataset = pd.read_csv(io.BytesIO(s3_client.get_object(dataset_bucket, dataset_object_key)))
 
-    latency = time() - start
+        latency, y = predict(x, model, dataset)
 
-    return {'y': y, 'latency': latency}
+    return rec.result(y=[str(v) for v in y], model_cache=model_cache, cache_hit=model_cache != models.DOWNLOAD,
+                      refit=dataset is not None)
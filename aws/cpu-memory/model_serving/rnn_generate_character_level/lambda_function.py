@@ -1,23 +1,11 @@
-import boto3
 import os
-import pickle
-import numpy as np
-import torch
-import rnn
 
-from time import time
+from functionbench import instrument, storage
+from functionbench.workloads.rnn_generate_character_level import load_model, generate
 
-
-s3_client = boto3.client('s3')
+s3_client = storage.open_store()
 tmp = "/tmp/"
 
-"""
-Language
- - Italian, German, Portuguese, Chinese, Greek, Polish, French
- - English, Spanish, Arabic, Crech, Russian, Irish, Dutch
- - Scottish, Vietnamese, Korean, Japanese
-"""
-
 
 def lambda_handler(event, context):
     language = event['language']
@@ -27,32 +15,23 @@ def lambda_handler(event, context):
     model_object_key = event['model_object_key']  # example : rnn_model.pth
     model_bucket = event['model_bucket']
 
-    # Load pre-processing parameters
-    # Check if model parameters are available
-    parameter_path = tmp + model_parameter_object_key
-    if not os.path.isfile(parameter_path):
-        s3_client.download_file(model_bucket, model_parameter_object_key, parameter_path)
-
-    with open(parameter_path, 'rb') as pkl:
-        params = pickle.load(pkl)
-
-    all_categories = params['all_categories']
-    n_categories = params['n_categories']
-    all_letters = params['all_letters']
-    n_letters = params['n_letters']
+    with instrument.Recorder("rnn_generate_character_level", "aws") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            # Load pre-processing parameters
+            # Check if model parameters are available
+            parameter_path = tmp + model_parameter_object_key
+            if not os.path.isfile(parameter_path):
+                s3_client.download_file(model_bucket, model_parameter_object_key, parameter_path)
 
-    # Check if models are available
-    # Download model from S3 if model is not already present
-    model_path = tmp + model_object_key
-    if not os.path.isfile(model_path):
-        s3_client.download_file(model_bucket, model_object_key, model_path)
+            # Check if models are available
+            # Download model from S3 if model is not already present
+            model_path = tmp + model_object_key
+            if not os.path.isfile(model_path):
+                s3_client.download_file(model_bucket, model_object_key, model_path)
 
-    rnn_model = rnn.RNN(n_letters, 128, n_letters, all_categories, n_categories, all_letters, n_letters)
-    rnn_model.load_state_dict(torch.load(model_path))
-    rnn_model.eval()
+        with rec.span("model_load"):
+            rnn_model = load_model(parameter_path, model_path)
 
-    start = time()
-    output_names = list(rnn_model.samples(language, start_letters))
-    latency = time() - start
+        latency, output_names = generate(rnn_model, language, start_letters)
 
-    return {'latency': latency, 'predict': output_names}
+    return rec.result(predict=output_names)
@@ -1,33 +1,15 @@
-from time import time
-import random
-import string
-import pyaes
-
-
-def generate(length):
-    letters = string.ascii_lowercase + string.digits
-    return ''.join(random.choice(letters) for i in range(length))
+from functionbench import instrument
+from functionbench.workloads.pyaes import generate, encrypt_decrypt
 
 
 def lambda_handler(event, context):
     length_of_message = event['length_of_message']
     num_of_iterations = event['num_of_iterations']
+    backend = event.get('backend', 'pyaes')
 
     message = generate(length_of_message)
 
-    # 128-bit key (16 bytes)
-    KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
-
-    start = time()
-    for loops in range(num_of_iterations):
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        ciphertext = aes.encrypt(message)
-        print(ciphertext)
-
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        plaintext = aes.decrypt(ciphertext)
-        print(plaintext)
-        aes = None
-
-    latency = time() - start
-    return latency
+    with instrument.Recorder("pyaes", "aws") as rec:
+        result = encrypt_decrypt(message, num_of_iterations, backend)
+    return rec.result(backend=result['backend'], mb_per_sec=result['mb_per_sec'],
+                      verified=result['verified'])
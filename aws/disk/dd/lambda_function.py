@@ -1,5 +1,7 @@
 import subprocess
 
+from functionbench import instrument
+
 tmp = '/tmp'
 
 """
@@ -23,12 +25,14 @@ def lambda_handler(event, context):
     bs = 'bs='+event['bs']
     count = 'count='+event['count']
 
-    out_fd = open(tmp + '/io_write_logs', 'w')
-    dd = subprocess.Popen(['dd', 'if=/dev/zero', 'of=/tmp/out', bs, count], stderr=out_fd)
-    dd.communicate()
+    with instrument.Recorder("dd", "aws") as rec:
+        out_fd = open(tmp + '/io_write_logs', 'w')
+        with rec.span("disk_write"):
+            dd = subprocess.Popen(['dd', 'if=/dev/zero', 'of=/tmp/out', bs, count], stderr=out_fd)
+            dd.communicate()
     
-    subprocess.check_output(['ls', '-alh', tmp])
+        subprocess.check_output(['ls', '-alh', tmp])
 
     with open(tmp + '/io_write_logs') as logs:
         result = str(logs.readlines()[2]).replace('\n', '')
-        return result
+        return rec.result(dd=result)
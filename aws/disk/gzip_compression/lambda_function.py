@@ -1,23 +1,11 @@
-from time import time
-import gzip
-import os
+from functionbench import instrument
+from functionbench.workloads.gzip_compression import gzip_compression
 
 
 def lambda_handler(event, context):
     file_size = event['file_size']
-    file_write_path = '/tmp/file'
 
-    start = time()
-    with open(file_write_path, 'wb') as f:
-        f.write(os.urandom(file_size * 1024 * 1024))
-    disk_latency = time() - start
+    with instrument.Recorder("gzip_compression", "aws") as rec:
+        gzip_compression(file_size)
 
-    with open(file_write_path) as f:
-        start = time()
-        with gzip.open('/tmp/result.gz', 'wb') as gz:
-            gz.writelines(f)
-        compress_latency = time() - start
-
-    print(compress_latency)
-
-    return {'disk_write': disk_latency, "compress": compress_latency}
+    return rec.result()
@@ -1,6 +1,8 @@
 import subprocess
 import json
 
+from functionbench import instrument
+
 """
 iPerf3 :  The ultimate speed test tool for TCP, UDP and SCTP
 doc : https://iperf.fr/iperf-doc.php
@@ -48,6 +50,8 @@ def lambda_handler(event, context):
     test_time = event['test_time']
     reverse = event['reverse']
 
-    send_mbit_s, recv_mbit_s = network_test(server_ip, server_port, test_time, reverse)
+    with instrument.Recorder("iperf3", "aws") as rec:
+        with rec.span("network"):
+            send_mbit_s, recv_mbit_s = network_test(server_ip, server_port, test_time, reverse)
 
-    return {'send_mbit_s': send_mbit_s, 'recv_mbit_s': recv_mbit_s}
+    return rec.result(send_mbit_s=send_mbit_s, recv_mbit_s=recv_mbit_s)
@@ -1,21 +1,13 @@
-import json
-from urllib.request import urlopen
-from time import time
+from functionbench import instrument
+from functionbench.workloads.json_dumps_loads import fetch, dumps_loads
 
 
 def lambda_handler(event, context):
     link = event['link']  # https://github.com/jdorfman/awesome-json-datasets
 
-    start = time()
-    f = urlopen(link)
-    data = f.read().decode("utf-8")
-    network = time() - start
+    with instrument.Recorder("json_dumps_loads", "aws") as rec:
+        network, data = fetch(link)
 
-    start = time()
-    json_data = json.loads(data)
-    str_json = json.dumps(json_data, indent=4)
-    latency = time() - start
-
-    print(str_json)
-    return {"network": network, "serialization": latency}
+        latency, str_json = dumps_loads(data)
 
+    return rec.result()
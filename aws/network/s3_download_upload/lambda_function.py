@@ -1,7 +1,6 @@
-import boto3
-from time import time
+from functionbench import instrument, storage
 
-s3_client = boto3.client('s3')
+s3_client = storage.open_store()
 
 
 def lambda_handler(event, context):
@@ -11,12 +10,11 @@ def lambda_handler(event, context):
 
     path = '/tmp/'+object_key
 
-    start = time()
-    s3_client.download_file(input_bucket, object_key, path)
-    download_time = time() - start
+    with instrument.Recorder("s3_download_upload", "aws") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            s3_client.download_file(input_bucket, object_key, path)
 
-    start = time()
-    s3_client.upload_file(path, output_bucket, object_key)
-    upload_time = time() - start
+        with rec.span(instrument.UPLOAD_DATA):
+            s3_client.upload_file(path, output_bucket, object_key)
 
-    return {"download_time": download_time, "upload_time": upload_time}
+    return rec.result()
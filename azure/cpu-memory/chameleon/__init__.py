@@ -1,37 +1,23 @@
 import azure.functions as func
-import six
-from time import time
-from chameleon import PageTemplate
 
+import json
 
-BIGTABLE_ZPT = """\
-<table xmlns="http://www.w3.org/1999/xhtml"
-xmlns:tal="http://xml.zope.org/namespaces/tal">
-<tr tal:repeat="row python: options['table']">
-<td tal:repeat="c python: row.values()">
-<span tal:define="d python: c + 1"
-tal:attributes="class python: 'column-' + %s(d)"
-tal:content="python: d" />
-</td>
-</tr>
-</table>""" % six.text_type.__name__
+from functionbench import events, instrument
+from functionbench.workloads.chameleon import render_table, render_table_stream
 
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
-    num_of_rows = req.params.get('num_of_rows')
-    num_of_cols = req.params.get('num_of_cols')
-
-    start = time()
-    tmpl = PageTemplate(BIGTABLE_ZPT)
-
-    data = {}
-    for i in range(num_of_cols):
-        data[str(i)] = i
-
-    table = [data for x in range(num_of_rows)]
-    options = {'table': table}
-
-    data = tmpl.render(options=options)
-    latency = time() - start
-
-    return func.HttpResponse(str(latency))
+    num_of_rows = int(req.params.get('num_of_rows'))
+    num_of_cols = int(req.params.get('num_of_cols'))
+
+    with instrument.Recorder("chameleon", "azure") as rec:
+        if events.flag(req.params.get('stream')):
+            result = render_table_stream(num_of_rows, num_of_cols, req.params.get('sink', 'discard'),
+                                         int(req.params.get('chunk_rows', 1000)))
+        else:
+            result, data = render_table(num_of_rows, num_of_cols)
+
+    metrics = {'output_bytes': result['output_bytes'], 'template_cache': result['template_cache'],
+               'cache_hit': result['cache_hit'],
+               'rows_per_sec': result['rows_per_sec'], 'peak_rss_growth': result['peak_rss_growth']}
+    return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
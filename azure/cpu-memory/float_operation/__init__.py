@@ -1,20 +1,18 @@
 import azure.functions as func
-import math
-from time import time
 
+import json
 
-def float_operations(N):
-    start = time()
-    for i in range(0, N):
-        sin_i = math.sin(i)
-        cos_i = math.cos(i)
-        sqrt_i = math.sqrt(i)
-    latency = time() - start
-    return latency
+from functionbench import instrument
+from functionbench.workloads.float_operation import float_operations
 
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     N = int(req.params.get('N'))
-    latency = str(float_operations(N))
+    engine = req.params.get('engine', 'python')
+    threads = req.params.get('threads')
+    with instrument.Recorder("float_operation", "azure") as rec:
+        result = float_operations(N, engine, threads=threads and int(threads))
 
-    return func.HttpResponse(latency)
+    metrics = {'engine': result['engine'], 'threads': result['threads'],
+               'ops_per_sec': result['ops_per_sec']}
+    return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
@@ -1,96 +1,9 @@
 import azure.functions as func
-from azure.storage.blob import BlockBlobService, PublicAccess
-from PIL import Image, ImageFilter
+import json
 import logging
-from time import time
 
-TMP = "/tmp/"
-
-
-def flip(image, file_name):
-    path_list = []
-    path = TMP + "flip-left-right-" + file_name
-    img = image.transpose(Image.FLIP_LEFT_RIGHT)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "flip-top-bottom-" + file_name
-    img = image.transpose(Image.FLIP_TOP_BOTTOM)
-    img.save(path)
-    path_list.append(path)
-
-    return path_list
-
-
-def rotate(image, file_name):
-    path_list = []
-    path = TMP + "rotate-90-" + file_name
-    img = image.transpose(Image.ROTATE_90)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "rotate-180-" + file_name
-    img = image.transpose(Image.ROTATE_180)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "rotate-270-" + file_name
-    img = image.transpose(Image.ROTATE_270)
-    img.save(path)
-    path_list.append(path)
-
-    return path_list
-
-
-def filter(image, file_name):
-    path_list = []
-    path = TMP + "blur-" + file_name
-    img = image.filter(ImageFilter.BLUR)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "contour-" + file_name
-    img = image.filter(ImageFilter.CONTOUR)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "sharpen-" + file_name
-    img = image.filter(ImageFilter.SHARPEN)
-    img.save(path)
-    path_list.append(path)
-
-    return path_list
-
-
-def gray_scale(image, file_name):
-    path = TMP + "gray-scale-" + file_name
-    img = image.convert('L')
-    img.save(path)
-
-    return [path]
-
-
-def resize(image, file_name):
-    path = TMP + "resized-" + file_name
-    image.thumbnail((128, 128))
-    image.save(path)
-
-    return [path]
-
-
-def image_processing(file_name, image_path):
-    path_list = []
-    start = time()
-    with Image.open(image_path) as image:
-        path_list += flip(image, file_name)
-        path_list += rotate(image, file_name)
-        path_list += filter(image, file_name)
-        path_list += gray_scale(image, file_name)
-        path_list += resize(image, file_name)
-
-    latency = time() - start
-
-    return latency, path_list
+from functionbench import instrument, storage
+from functionbench.workloads.image_processing import image_batch, image_pipeline
 
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
@@ -99,20 +12,39 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     container_name = req.params.get('container_name')
     blob_name = req.params.get('blob_name')
 
-    block_blob_service = BlockBlobService(account_name=acc_name, account_key=acc_key)
+    block_blob_service = storage.open_store(default='azure', account_name=acc_name, account_key=acc_key)
     logging.info(block_blob_service)
-    block_blob_service.set_container_acl(container_name, public_access=PublicAccess.Container)
-    generator = block_blob_service.list_blobs(container_name)
-    for blob in generator:
-        logging.info("\t Blob name: " + blob.name)
-
-    download_path = "/tmp/" + blob_name
-    block_blob_service.get_blob_to_path(container_name, blob_name, download_path)
-    logging.info("Downloading blob to " + download_path)
+    for name in block_blob_service.list_objects(container_name):
+        logging.info("\t Blob name: " + name)
+
+    workers = req.params.get('workers')
+    # ops is a JSON list, e.g. [{"name": "thumb-", "op": "resize", "size": [256, 256]}]
+    ops = json.loads(req.params['ops']) if req.params.get('ops') else None
+
+    # batch form: blob_names=a.jpg,b.jpg or prefix=photos/
+    if req.params.get('blob_names') is not None or req.params.get('prefix') is not None:
+        with instrument.Recorder("image_processing", "azure") as rec:
+            if req.params.get('blob_names') is not None:
+                keys = [name for name in req.params['blob_names'].split(',') if name]
+            else:
+                keys = block_blob_service.list_objects(container_name, req.params['prefix'])
+            result = image_batch(block_blob_service, container_name, keys, container_name,
+                                 int(req.params.get('concurrency', 4)), int(workers or 1), ops)
+        metrics = {'images': result['images'], 'images_per_sec': result['images_per_sec'],
+                   'input_mb_per_sec': result['input_mb_per_sec'],
+                   'mean_image_latency': result['mean_image_latency'], 'per_image': result['per_image']}
+        return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
+
+    with instrument.Recorder("image_processing", "azure") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            data = block_blob_service.get_object(container_name, blob_name)
+        logging.info("Downloaded blob " + blob_name)
     
-    latency, path_list = image_processing(blob_name, download_path)
+        result, outputs = image_pipeline(data, blob_name, workers and int(workers), ops)
 
-    for upload_path in path_list:
-        block_blob_service.create_blob_from_path(container_name, upload_path.split("/")[2], upload_path)
+        with rec.span(instrument.UPLOAD_DATA):
+            for key, body in outputs.items():
+                block_blob_service.put_object(container_name, key, body)
 
-    return func.HttpResponse(str(latency))
+    metrics = {'output_bytes': result['output_bytes']}
+    return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
@@ -1,39 +1,17 @@
 import azure.functions as func
-from numpy import matrix, linalg, random, amax
-from time import time
 
+import json
 
-
-def linpack(N):
-    eps = 2.22e-16
-
-    ops = (2.0*N)*N*N/3.0+(2.0*N)*N
-
-    # Create AxA array of random numbers -0.5 to 0.5
-    A = random.random_sample((N, N))-0.5
-    B = A.sum(axis=1)
-
-    # Convert to matrices
-    A = matrix(A)
-
-    B = matrix(B.reshape((N, 1)))
-
-    start = time()
-    X = linalg.solve(A, B)
-    latency = time() - start
-
-    mflops = (ops*1e-6/latency)
-
-    result = {
-        'mflops': mflops,
-        'latency': latency
-    }
-
-    return result
+from functionbench import instrument
+from functionbench.workloads.linpack import linpack
 
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     N = int(req.params.get('N'))
-    latency = str(linpack(N))
+    with instrument.Recorder("linpack", "azure") as rec:
+        result = linpack(N, req.params.get('mode', 'solve'), int(req.params.get('rhs', 100)),
+                         int(req.params.get('batch', 1000)))
 
-    return func.HttpResponse(latency)
+    metrics = {'mflops': result['mflops'], 'residual': result['residual'],
+               'residual_ok': result['residual_ok']}
+    return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
@@ -1,21 +1,20 @@
 import azure.functions as func
-import numpy as np
-from time import time
 
+import json
 
-def matmul(N):
-    A = np.random.rand(N, N)
-    B = np.random.rand(N, N)
-
-    start = time()
-    C = np.matmul(A, B)
-    latency = time() - start
-
-    return latency
+from functionbench import events, instrument
+from functionbench.workloads.matmul import matmul
 
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     N = int(req.params.get('N'))
-    latency = str(matmul(N))
+    params = req.params
+    with instrument.Recorder("matmul", "azure") as rec:
+        result = matmul(N, params.get('dtype', 'float64'), params.get('layout', 'C'),
+                        threads=int(params.get('threads', 0)), reps=int(params.get('reps', 1)),
+                        warmup=int(params.get('warmup', 0)), blocked=events.flag(params.get('blocked')),
+                        block_size=int(params.get('block_size', 1024)))
 
-    return func.HttpResponse(latency)
+    metrics = {'gflops': result['gflops'], 'best_gflops': result['best_gflops'],
+               'peak_rss_growth': result['peak_rss_growth'], 'blas_threads': result['blas_threads']}
+    return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
@@ -1,24 +1,14 @@
 import azure.functions as func
-from azure.storage.blob import BlockBlobService
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.externals import joblib
 
 import pandas as pd
-import numpy as np 
 
+import io
+import json
 import logging
-from time import time
-import re
 
-FILE_NAME_INDEX = 2
+from functionbench import instrument, models, storage
+from functionbench.workloads.ml_lr_prediction import load_model, needs_dataset, predict
 
-cleanup_re = re.compile('[^a-z]+')
-def cleanup(sentence):
-    sentence = sentence.lower()
-    sentence = cleanup_re.sub(' ', sentence).strip()
-    return sentence
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     x = req.params.get('input')
@@ -28,31 +18,22 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     blob_name = req.params.get('blob_name')
     model_blob_name = req.params.get('model_blob_name')
 
-    block_blob_service = BlockBlobService(account_name=acc_name, account_key=acc_key)
-    
-    model_path = "/tmp/" + model_blob_name
-    block_blob_service.get_blob_to_path(container_name, model_blob_name, model_path)
-
-    download_path = "/tmp/" + blob_name
-    block_blob_service.get_blob_to_path(container_name, blob_name, download_path)
-    logging.info("Downloading blob to " + download_path)
-
-    df = pd.read_csv(download_path)
+    block_blob_service = storage.open_store(default='azure', account_name=acc_name, account_key=acc_key)
     
-    start = time()
-    df_input = pd.DataFrame()
-    df_input['x']  = [x]
-    df_input['x'] = df_input['x'].apply(cleanup)
-
-    df['train'] = df['Text'].apply(cleanup)
-    tfidf_vect = TfidfVectorizer(min_df=100).fit(df['train'])
-    X = tfidf_vect.transform(df_input['x'])
-
-    model = joblib.load('/tmp/lr_model.pk')
-    y = model.predict(X)
+    with instrument.Recorder("ml_lr_prediction", "azure") as rec:
+        with rec.span(instrument.MODEL_LOAD):
+            model, model_cache = models.load(block_blob_service, container_name, model_blob_name, load_model)
+
+        # blob_name (the training set) is only read for models trained before the vectorizer was saved with them
+        df = None
+        if needs_dataset(model):
+            with rec.span(instrument.DOWNLOAD_DATA):
+                df = pd.read_csv(io.BytesIO(block_blob_service.get_object(container_name, blob_name)))
+            logging.info("Downloaded blob " + blob_name)
+
+        latency, y = predict(x, model, df)
     logging.info(y)
 
-    latency = time() - start
-    logging.info(latency)
-    
-    return func.HttpResponse(str(latency))
+    metrics = {'y': [str(v) for v in y], 'model_cache': model_cache,
+               'cache_hit': model_cache != models.DOWNLOAD, 'refit': df is not None}
+    return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
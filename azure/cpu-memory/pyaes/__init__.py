@@ -1,35 +1,21 @@
 import azure.functions as func
-from time import time
-import string
-import random
-import pyaes
 
+import json
 
-def generate(length):
-    letters = string.ascii_lowercase + string.digits
-    return ''.join(random.choice(letters) for i in range(length))
+from functionbench import instrument
+from functionbench.workloads.pyaes import generate, encrypt_decrypt
 
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
-    length_of_message = req.params.get('lenght_of_message')
-    num_of_iterations = req.params.get('num_of_iterations')\
+    length_of_message = int(req.params.get('length_of_message'))
+    num_of_iterations = int(req.params.get('num_of_iterations'))
+    backend = req.params.get('backend', 'pyaes')
 
     message = generate(length_of_message)
 
-    # 128-bit key (16 bytes)
-    KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
+    with instrument.Recorder("pyaes", "azure") as rec:
+        result = encrypt_decrypt(message, num_of_iterations, backend)
 
-    start = time()
-    for loops in range(num_of_iterations):
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        ciphertext = aes.encrypt(message)
-        print(ciphertext)
-
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        plaintext = aes.decrypt(ciphertext)
-        print(plaintext)
-        aes = None
-
-    latency = time() - start
-
-    return func.HttpResponse(str(latency))
+    metrics = {'backend': result['backend'], 'mb_per_sec': result['mb_per_sec'],
+               'verified': result['verified']}
+    return func.HttpResponse(json.dumps(rec.result(**metrics)), mimetype="application/json")
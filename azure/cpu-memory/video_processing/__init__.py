@@ -1,40 +1,13 @@
 import azure.functions as func
-from azure.storage.file import FileService
 
-import cv2
+import json
 import logging
-from time import time
+import os
 
-FILE_PATH_INDEX = 2
+from functionbench import events, instrument, storage
+from functionbench.workloads.video_processing import (video_processing, video_processing_parallel,
+                                                       video_processing_pipelined)
 
-def video_processing(file_name, video_path):
-    result_file_path = '/tmp/'+file_name+'-output.avi'
-
-    video = cv2.VideoCapture(video_path)
-
-    width = int(video.get(3))
-    height = int(video.get(4))
-
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')
-    out = cv2.VideoWriter(result_file_path, fourcc, 20.0, (width, height))
-
-    start = time()
-    while(video.isOpened()):
-        ret, frame = video.read()
-
-        if ret:
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            im = cv2.imwrite('/tmp/tmp.jpg', gray_frame)
-            gray_frame = cv2.imread('/tmp/tmp.jpg')
-            out.write(gray_frame)
-        else:
-            break
-
-    latency = time() - start
-
-    video.release()
-    out.release()
-    return latency, result_file_path
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     acc_name = req.params.get('account_name')
@@ -42,16 +15,29 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     container_name = req.params.get('container_name')
     blob_name = req.params.get('blob_name')
 
-    file_service = FileService(account_name=acc_name, account_key=acc_key)
+    file_service = storage.open_store(default='azure-file', account_name=acc_name, account_key=acc_key)
 
-    download_path = "/tmp/" + blob_name
-    file_service.get_file_to_path(container_name, None, blob_name, download_path)
+    with instrument.Recorder("video_processing", "azure") as rec:
+        download_path = "/tmp/" + blob_name
+        with rec.span(instrument.DOWNLOAD_DATA):
+            file_service.download_file(container_name, blob_name, download_path)
 
-    logging.info("Downloading blob to " + download_path)
+        logging.info("Downloading blob to " + download_path)
 
-    latency, upload_path = video_processing(blob_name, download_path)
+        mode = req.params.get('mode', 'memory')
+        workers = req.params.get('workers')
+        if mode == 'parallel':
+            result, upload_path = video_processing_parallel(blob_name, download_path, workers=workers and int(workers),
+                                                            compare=events.flag(req.params.get('compare')))
+        elif mode == 'pipelined':
+            result, upload_path = video_processing_pipelined(blob_name, download_path, workers=int(workers or 2))
+        else:
+            result, upload_path = video_processing(blob_name, download_path, mode=mode)
 
-    file_service.create_file_from_path(container_name, None, upload_path.split("/")[FILE_PATH_INDEX], upload_path)
+        with rec.span(instrument.UPLOAD_DATA):
+            file_service.upload_file(upload_path, container_name, os.path.basename(upload_path))
 
-    logging.info(latency)
-    return func.HttpResponse(str(latency))
\ No newline at end of file
+    metrics = dict((k, v) for k, v in result.items() if k != 'latency')
+    result = rec.result(**metrics)
+    logging.info(result["latencies"])
+    return func.HttpResponse(json.dumps(result), mimetype="application/json")
@@ -1,8 +1,9 @@
 import azure.functions as func
-from azure.storage.blob import BlockBlobService
 
+import json
 import logging
-from time import time
+
+from functionbench import instrument, storage
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     acc_name = req.params.get('account_name')
@@ -11,20 +12,17 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     dst_container_name = req.params.get('dst_container_name')
     blob_name = req.params.get('blob_name')
 
-    block_blob_service = BlockBlobService(account_name=acc_name, account_key=acc_key)
+    block_blob_service = storage.open_store(default='azure', account_name=acc_name, account_key=acc_key)
     download_path = "/tmp/" + blob_name
 
-    start = time()
-    block_blob_service.get_blob_to_path(src_container_name, blob_name, download_path)
-    download_time = time() - start
-    logging.info("Download time : " + str(download_time))
-
-    start = time()
-    upload_path = download_path
-    block_blob_service.create_blob_from_path(dst_container_name, upload_path.split("/")[2], upload_path)
-    upload_time = time() - start
-    logging.info("Upload time : " + str(upload_time))
+    with instrument.Recorder("blob_download_upload", "azure") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA) as span:
+            block_blob_service.download_file(src_container_name, blob_name, download_path)
+        logging.info("Download time : " + str(span.seconds))
 
-    result = "download_time : " + str(download_time) + "(s) upload_time : " + str(upload_time) + "(s)"
+        upload_path = download_path
+        with rec.span(instrument.UPLOAD_DATA) as span:
+            block_blob_service.upload_file(upload_path, dst_container_name, upload_path.split("/")[2])
+        logging.info("Upload time : " + str(span.seconds))
 
-    return func.HttpResponse(result)
\ No newline at end of file
+    return func.HttpResponse(json.dumps(rec.result()), mimetype="application/json")
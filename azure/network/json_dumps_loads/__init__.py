@@ -1,20 +1,17 @@
 import azure.functions as func
-from urllib.request import urlopen
-from time import time
+
 import json
 
+from functionbench import instrument
+from functionbench.workloads.json_dumps_loads import fetch, dumps_loads
+
 
 def main(req: func.HttpRequest) -> func.HttpResponse:
     link = req.params.get('link') # https://github.com/jdorfman/awesome-json-datasets
 
-    start = time()
-    f = urlopen(link)
-    data = f.read().decode("utf-8")
-    network = time() - start
+    with instrument.Recorder("json_dumps_loads", "azure") as rec:
+        network, data = fetch(link)
 
-    start = time()
-    json_data = json.loads(data)
-    str_json = json.dumps(json_data, indent=4)
-    latency = time() - start
+        latency, str_json = dumps_loads(data)
 
-    return func.HttpResponse("latency : " + str(latency) + "/ network : " + str(network))
+    return func.HttpResponse(json.dumps(rec.result()), mimetype="application/json")
@@ -0,0 +1,7 @@
+"""
+FunctionBench : a suite of workloads for serverless cloud function services.
+
+The compute kernels live in ``functionbench.workloads`` and are shared by the
+per-platform entry points under ``aws/``, ``google/``, ``azure/`` and
+``openwhisk/``, so every platform measures identical code.
+"""
@@ -0,0 +1,23 @@
+"""
+Parsing of event parameters shared by the platform adapters.
+
+AWS, Google and OpenWhisk events are JSON while Azure parameters arrive as
+query strings, so the same switch can be ``true``, ``"true"`` or ``"1"``.
+"""
+
+TRUE = ("1", "true", "yes", "on")
+FALSE = ("", "0", "false", "no", "off")
+
+
+def flag(value, default=False):
+    """A boolean parameter; ``None`` (absent) gives ``default``."""
+    if value is None:
+        return default
+    if isinstance(value, (bool, int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in TRUE:
+        return True
+    if text in FALSE:
+        return False
+    raise ValueError("expected a boolean, got %r" % (value,))
@@ -0,0 +1,296 @@
+"""
+Local in-process invocation harness.
+
+Loads any platform handler (AWS ``lambda_handler``, Google
+``function_handler``, Azure ``main(req)`` or OpenWhisk ``main(event)``) and
+invokes it repeatedly, either warm (one persistent interpreter) or cold (a
+freshly spawned interpreter per call), reporting import time, first-call time
+and steady-state latency separately.
+
+    python -m functionbench.harness aws/cpu-memory/matmul/lambda_function.py \\
+        --event '{"n": 512}' --mode warm -n 20
+
+With ``--store DIR`` every invocation is also appended to a
+``functionbench.results`` store.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+from time import perf_counter
+
+import functionbench
+from functionbench import results, storage
+
+PLATFORMS = ("aws", "google", "azure", "openwhisk")
+DEFAULT_HANDLERS = {
+    "aws": "lambda_handler",
+    "google": "function_handler",
+    "azure": "main",
+    "openwhisk": "main",
+}
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(functionbench.__file__)))
+
+
+class LambdaContext(object):
+    """The subset of the AWS Lambda context object handlers may touch."""
+
+    def __init__(self, function_name, memory_limit_in_mb=128, timeout=900):
+        self.function_name = function_name
+        self.function_version = "$LATEST"
+        self.memory_limit_in_mb = memory_limit_in_mb
+        self.aws_request_id = str(uuid.uuid4())
+        self.log_group_name = "/aws/lambda/" + function_name
+        self.log_stream_name = "local"
+        self._deadline = perf_counter() + timeout
+
+    def get_remaining_time_in_millis(self):
+        return int(max(self._deadline - perf_counter(), 0) * 1000)
+
+
+class JsonRequest(object):
+    """Minimal stand-in for the flask request passed to Google Cloud Functions."""
+
+    def __init__(self, event):
+        self._event = event
+        self.args = {k: str(v) for k, v in event.items()}
+        self.method = "POST"
+
+    def get_json(self, force=False, silent=False, cache=True):
+        return self._event
+
+
+def detect_platform(path):
+    parts = os.path.abspath(path).split(os.sep)
+    for platform in PLATFORMS:
+        if platform in parts:
+            return platform
+    raise ValueError("cannot detect platform of %s, pass --platform" % path)
+
+
+def load_handler(path, handler_name=None, platform=None):
+    """Import the handler module at ``path``; returns (handler, platform, import_time)."""
+    platform = platform or detect_platform(path)
+    handler_name = handler_name or DEFAULT_HANDLERS[platform]
+    path = os.path.abspath(path)
+
+    # handlers import their siblings (e.g. squeezenet, rnn) as top-level modules
+    handler_dir = os.path.dirname(path)
+    for p in (REPO_ROOT, handler_dir):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+
+    module_name = "functionbench_handler_" + uuid.uuid4().hex
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+
+    start = perf_counter()
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    import_time = perf_counter() - start
+
+    return getattr(module, handler_name), platform, import_time
+
+
+def seed_store(puts):
+    """Uploads ``BUCKET/KEY=FILE`` entries to the store the handlers will open."""
+    if not puts:
+        return
+    store = storage.open_store()
+    for put in puts:
+        target, path = put.split("=", 1)
+        bucket, key = target.split("/", 1)
+        store.upload_file(path, bucket, key)
+
+
+def make_invoker(handler, platform, event, name="local", memory_mb=128):
+    """Returns a zero-argument callable that invokes ``handler`` the way ``platform`` would."""
+    if platform == "aws":
+        return lambda: handler(event, LambdaContext(name, memory_mb))
+    if platform == "openwhisk":
+        return lambda: handler(dict(event))
+    if platform == "google":
+        return lambda: handler(JsonRequest(event))
+    if platform == "azure":
+        import azure.functions as func
+
+        def invoke():
+            req = func.HttpRequest(method="POST", url="/api/" + name,
+                                   params={k: str(v) for k, v in event.items()},
+                                   body=json.dumps(event).encode())
+            resp = handler(req)
+            return resp.get_body().decode() if hasattr(resp, "get_body") else resp
+        return invoke
+    raise ValueError("unknown platform %s" % platform)
+
+
+def _jsonable(value):
+    # Google and Azure handlers return the result schema as a JSON body
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return json.loads(json.dumps(value, default=str))
+
+
+def run_warm(path, event, invocations=10, handler_name=None, platform=None, puts=(),
+             memory_mb=128, on_sample=None):
+    """``on_sample(sample)`` is called with the timings and result of every invocation."""
+    seed_store(puts)
+    handler, platform, import_time = load_handler(path, handler_name, platform)
+    invoke = make_invoker(handler, platform, event, os.path.basename(os.path.dirname(path)), memory_mb)
+
+    latencies = []
+    result = None
+    for i in range(invocations):
+        start = perf_counter()
+        result = invoke()
+        latencies.append(perf_counter() - start)
+        if on_sample:
+            on_sample({"call_time": latencies[-1], "first_call": i == 0,
+                       "import_time": import_time if i == 0 else None,
+                       "result": _jsonable(result)})
+
+    return {
+        "mode": "warm",
+        "handler": path,
+        "platform": platform,
+        "import_time": import_time,
+        "first_call": latencies[0] if latencies else None,
+        "steady_state": results.summarize(latencies[1:]),
+        "result": _jsonable(result),
+    }
+
+
+def _child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (REPO_ROOT, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def run_cold(path, event, invocations=10, handler_name=None, platform=None, puts=(),
+             memory_mb=128, on_sample=None):
+    platform = platform or detect_platform(path)
+    spawn, imports, calls = [], [], []
+    result = None
+
+    for _ in range(invocations):
+        fd, result_file = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        cmd = [sys.executable, "-m", "functionbench.harness", path,
+               "--platform", platform, "--event", json.dumps(event),
+               "--child", result_file, "--memory-mb", str(memory_mb)]
+        if handler_name:
+            cmd += ["--handler", handler_name]
+        for put in puts:
+            cmd += ["--put", put]
+        try:
+            start = perf_counter()
+            subprocess.run(cmd, env=_child_env(), check=True,
+                           stdout=subprocess.DEVNULL)
+            total = perf_counter() - start
+            with open(result_file) as f:
+                child = json.load(f)
+        finally:
+            os.remove(result_file)
+
+        imports.append(child["import_time"])
+        calls.append(child["call_time"])
+        # everything that is neither import nor the call: interpreter start-up and teardown
+        spawn.append(total - child["import_time"] - child["call_time"])
+        result = child["result"]
+        if on_sample:
+            on_sample({"call_time": child["call_time"], "first_call": True,
+                       "import_time": child["import_time"], "process_overhead": spawn[-1],
+                       "result": result})
+
+    return {
+        "mode": "cold",
+        "handler": path,
+        "platform": platform,
+        "process_overhead": results.summarize(spawn),
+        "import_time": results.summarize(imports),
+        "first_call": results.summarize(calls),
+        "result": result,
+    }
+
+
+def _run_child(args, event):
+    seed_store(args.put)
+    handler, platform, import_time = load_handler(args.handler_path, args.handler, args.platform)
+    invoke = make_invoker(handler, platform, event, memory_mb=args.memory_mb)
+    start = perf_counter()
+    result = invoke()
+    call_time = perf_counter() - start
+    with open(args.child, "w") as f:
+        json.dump({"import_time": import_time, "call_time": call_time,
+                   "result": _jsonable(result)}, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("handler_path", help="path to the handler module")
+    parser.add_argument("--handler", help="handler function name (default depends on the platform)")
+    parser.add_argument("--platform", choices=PLATFORMS, help="detected from the path by default")
+    parser.add_argument("--event", default="{}", help="event as a JSON string")
+    parser.add_argument("--event-file", help="read the event from a JSON file")
+    parser.add_argument("--mode", choices=("warm", "cold"), default="warm")
+    parser.add_argument("-n", "--invocations", type=int, default=10)
+    parser.add_argument("--storage", help="storage backend for the handlers, e.g. memory or local:/tmp/store")
+    parser.add_argument("--put", action="append", default=[], metavar="BUCKET/KEY=FILE",
+                        help="upload FILE to the store before invoking (repeatable)")
+    parser.add_argument("--memory-mb", type=int, default=128,
+                        help="memory size reported to AWS handlers and recorded with the results")
+    parser.add_argument("--store", default=os.environ.get(results.RESULTS_ENV),
+                        help="append every invocation to this result store directory")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.event_file:
+        with open(args.event_file) as f:
+            event = json.load(f)
+    else:
+        event = json.loads(args.event)
+
+    if args.storage:
+        os.environ[storage.STORAGE_ENV] = args.storage
+
+    if args.child:
+        _run_child(args, event)
+        return
+
+    samples = []
+    run = run_warm if args.mode == "warm" else run_cold
+    report = run(args.handler_path, event, args.invocations, args.handler, args.platform, args.put,
+                 args.memory_mb, samples.append if args.store else None)
+    if args.store:
+        record(results.ResultStore(args.store), args.handler_path, report["platform"],
+               args.mode, event, args.memory_mb, samples)
+    print(json.dumps(report, indent=2))
+
+
+def record(store, path, platform, mode, event, memory_mb, samples):
+    """Appends one row per invocation sample to ``store``."""
+    if not samples:
+        return
+    result = samples[0]["result"]
+    workload = result.get("workload") if isinstance(result, dict) else None
+    run = results.new_run(workload or os.path.basename(os.path.dirname(os.path.abspath(path))),
+                          platform, mode, event, memory_mb, handler=path)
+    rows = []
+    for sample in samples:
+        rows.append(results.make_row(run, call_time=sample["call_time"],
+                                     first_call=sample["first_call"],
+                                     import_time=sample["import_time"],
+                                     process_overhead=sample.get("process_overhead"),
+                                     **results.flatten(sample["result"])))
+    store.append(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Shared timing and resource instrumentation.
+
+A span measures a region with ``perf_counter_ns`` together with the CPU time,
+resident set size change and bytes read/written by the process while it was
+open.  Spans opened while a ``Recorder`` is active in the current thread are
+collected into it; spans with the same name accumulate.  ``Recorder.result()``
+is the single result schema returned by every adapter on every platform:
+
+    {
+        "workload": "image_processing",
+        "platform": "aws",
+        "timestamps": {"starting_time": 1700000000.1, "finishing_time": 1700000001.6},
+        "latencies": {"download_data": 0.11, "function_execution": 1.32, "upload_data": 0.07},
+        "spans": {"function_execution": {"count": 1, "wall_ns": 1320113021, "cpu_ns": 1298000000,
+                                         "rss_delta": 5246976, "read_bytes": 184320,
+                                         "write_bytes": 1613824}, ...},
+        "metrics": {...},
+        "metadata": ...
+    }
+
+``latencies`` are in seconds and keep the phase names the OpenWhisk actions
+always reported (``download_data``, ``function_execution``, ``upload_data``).
+RSS and I/O counters come from ``/proc/self`` and are ``None`` where it is not
+available.
+"""
+import contextlib
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from time import perf_counter_ns, process_time_ns
+except ImportError:  # Python < 3.7
+    def perf_counter_ns():
+        return int(time.perf_counter() * 1e9)
+
+    def process_time_ns():
+        return int(time.process_time() * 1e9)
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+FUNCTION_EXECUTION = "function_execution"
+DOWNLOAD_DATA = "download_data"
+UPLOAD_DATA = "upload_data"
+MODEL_LOAD = "model_load"
+
+_PAGE_SIZE = resource.getpagesize() if resource else 4096
+_local = threading.local()
+
+
+def rss():
+    """Current resident set size in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+def anon_rss():
+    """Resident set size without file-backed pages (memory-mapped files, shared libraries), in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            fields = f.read().split()
+        return (int(fields[1]) - int(fields[2])) * _PAGE_SIZE
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss():
+    """Peak resident set size of the process in bytes."""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class RSSHighWater(object):
+    """
+    Samples ``anon_rss()`` every ``interval`` seconds while open; ``growth`` is
+    the highest value seen above the one on entry.  Unlike ``peak_rss()`` it is
+    not raised by whatever an earlier invocation of a warm process allocated,
+    and pages of memory-mapped files (reclaimable page cache) are not counted.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.baseline = None
+        self.high = None
+
+    def _sample(self):
+        value = anon_rss()
+        if value is not None and value > self.high:
+            self.high = value
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.baseline = self.high = anon_rss()
+        self._thread = None
+        if self.baseline is not None:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="rss-high-water")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        return False
+
+    @property
+    def growth(self):
+        """Bytes, or ``None`` where ``/proc`` is not available."""
+        if self.baseline is None:
+            return None
+        return self.high - self.baseline
+
+
+def io_counters():
+    """Bytes passed through read/write system calls so far (files, pipes and sockets)."""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (IOError, OSError, KeyError, ValueError):
+        return None, None
+
+
+def _io_overhead():
+    # reading /proc/self/io is itself counted by the next reading
+    first, _ = io_counters()
+    second, _ = io_counters()
+    return second - first if first is not None else 0
+
+
+_IO_OVERHEAD = _io_overhead()
+
+
+def _delta(end, start, overhead=0):
+    if end is None or start is None:
+        return None
+    return end - start - overhead
+
+
+class Span(object):
+    """Context manager measuring one region; ``resources=False`` only records wall and CPU time."""
+
+    def __init__(self, name, recorder=None, resources=True):
+        self.name = name
+        self.recorder = recorder
+        self.resources = resources
+        self.wall_ns = 0
+        self.cpu_ns = 0
+        self.rss_delta = None
+        self.read_bytes = None
+        self.write_bytes = None
+
+    def __enter__(self):
+        if self.resources:
+            self._rss = rss()
+            self._read, self._write = io_counters()
+        self._cpu = process_time_ns()
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall_ns = perf_counter_ns() - self._start
+        self.cpu_ns = process_time_ns() - self._cpu
+        if self.resources:
+            read, write = io_counters()
+            self.read_bytes = _delta(read, self._read, _IO_OVERHEAD)
+            self.write_bytes = _delta(write, self._write)
+            self.rss_delta = _delta(rss(), self._rss)
+        if self.recorder is not None:
+            self.recorder.add(self)
+        return False
+
+    @property
+    def seconds(self):
+        return self.wall_ns / 1e9
+
+    def as_dict(self):
+        return {
+            "count": 1,
+            "wall_ns": self.wall_ns,
+            "cpu_ns": self.cpu_ns,
+            "rss_delta": self.rss_delta,
+            "read_bytes": self.read_bytes,
+            "write_bytes": self.write_bytes,
+        }
+
+
+class Recorder(object):
+    """Collects the spans of one invocation; use as ``with Recorder(...) as rec:``."""
+
+    def __init__(self, workload=None, platform=None, resources=True):
+        self.workload = workload
+        self.platform = platform
+        self.resources = resources
+        self.spans = OrderedDict()
+        self.metrics = OrderedDict()
+        self.timestamps = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, resources=None):
+        return Span(name, self, self.resources if resources is None else resources)
+
+    def add(self, span):
+        record = span.as_dict()
+        with self._lock:
+            total = self.spans.get(span.name)
+            if total is None:
+                self.spans[span.name] = record
+                return
+            for key, value in record.items():
+                if value is not None and total[key] is not None:
+                    total[key] += value
+
+    def metric(self, name, value):
+        self.metrics[name] = value
+
+    def __enter__(self):
+        _stack().append(self)
+        self.timestamps["starting_time"] = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timestamps["finishing_time"] = time.time()
+        _stack().remove(self)
+        return False
+
+    def latencies(self):
+        return OrderedDict((name, s["wall_ns"] / 1e9) for name, s in self.spans.items())
+
+    def result(self, metadata=None, **metrics):
+        self.metrics.update(metrics)
+        return {
+            "workload": self.workload,
+            "platform": self.platform,
+            "timestamps": dict(self.timestamps),
+            "latencies": self.latencies(),
+            "spans": OrderedDict((name, dict(s)) for name, s in self.spans.items()),
+            "metrics": dict(self.metrics),
+            "metadata": metadata,
+        }
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current():
+    """The innermost active ``Recorder`` of this thread, or ``None``."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+@contextlib.contextmanager
+def attach(recorder):
+    """Makes ``recorder`` the active recorder of the current thread, e.g. inside a worker pool."""
+    if recorder is None:
+        yield None
+        return
+    stack = _stack()
+    stack.append(recorder)
+    try:
+        yield recorder
+    finally:
+        stack.remove(recorder)
+
+
+def span(name, resources=None):
+    """
+    A span recorded into the active recorder.  Without one the span is only
+    timed, so kernels called outside an adapter do not pay for /proc reads.
+    """
+    recorder = current()
+    if recorder is not None:
+        return recorder.span(name, resources)
+    return Span(name, None, bool(resources))
+
+
+def timed(name=None, resources=None):
+    """Decorator recording every call of the wrapped function as a span."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, resources):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,338 @@
+"""
+Concurrency sweep load generator.
+
+Drives a handler in-process (imported as with ``functionbench.harness``) or a
+deployed function over HTTP (e.g. the OpenWhisk REST API), either closed-loop
+(N clients invoking back to back) or open-loop (Poisson arrivals at a fixed
+rate), and reports throughput and p50/p90/p99/p99.9 latency per level.
+
+    python -m functionbench.loadgen aws/cpu-memory/matmul/lambda_function.py \\
+        --event '{"n": 256}' --closed 1,2,4,8 --duration 20
+
+    python -m functionbench.loadgen --openwhisk http://172.17.0.1:3233 --action matmul \\
+        --auth USER:PASS --event '{"n": 256}' --open 5,10,20 --duration 30
+
+Open-loop latency is measured from the scheduled arrival time, so requests
+queued behind a saturated system are not under-reported.
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import random
+import ssl
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import Request, urlopen
+
+from functionbench import harness, instrument, results, storage
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Histogram(object):
+    """
+    Log-linear latency histogram in the style of HdrHistogram: values below
+    ``2 ** sub_bits`` are exact, larger ones keep ``sub_bits`` significant bits
+    (relative error below ``2 ** (1 - sub_bits)``, 0.1% by default).
+    """
+
+    def __init__(self, sub_bits=11):
+        self.sub_bits = sub_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value):
+        shift = max(value.bit_length() - self.sub_bits, 0)
+        return (shift << self.sub_bits) + (value >> shift)
+
+    def _value(self, index):
+        shift = index >> self.sub_bits
+        mantissa = index & ((1 << self.sub_bits) - 1)
+        if shift == 0:
+            return mantissa
+        # midpoint of the bucket
+        return (mantissa << shift) + (1 << (shift - 1))
+
+    def record(self, value):
+        value = max(int(value), 0)
+        index = self._index(value)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+            self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        with self._lock:
+            for index, n in other.counts.items():
+                self.counts[index] = self.counts.get(index, 0) + n
+            self.count += other.count
+            self.total += other.total
+            self.max = max(self.max, other.max)
+            if other.min is not None:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def summary(self, scale=1e-9):
+        """Percentiles and moments, converted from ns to seconds by default."""
+        if not self.count:
+            return {"n": 0}
+        summary = {
+            "n": self.count,
+            "mean": self.total / float(self.count) * scale,
+            "min": self.min * scale,
+            "max": self.max * scale,
+        }
+        for q in PERCENTILES:
+            summary["p%s" % ("%g" % q).replace(".", "_")] = self.percentile(q) * scale
+        return summary
+
+
+class InProcessTarget(object):
+    """Invokes a handler imported into this interpreter, from many threads."""
+
+    def __init__(self, path, event, handler_name=None, platform=None):
+        handler, platform, _ = harness.load_handler(path, handler_name, platform)
+        self.invoke = harness.make_invoker(handler, platform, event)
+
+    def __call__(self):
+        return harness._jsonable(self.invoke())
+
+
+class HttpTarget(object):
+    """POSTs the event as JSON to ``url`` and returns the decoded response."""
+
+    def __init__(self, url, event, auth=None, insecure=False, timeout=300):
+        self.url = url
+        self.body = json.dumps(event).encode()
+        self.headers = {"Content-Type": "application/json"}
+        if auth:
+            self.headers["Authorization"] = "Basic " + base64.b64encode(auth.encode()).decode()
+        self.context = ssl._create_unverified_context() if insecure else None
+        self.timeout = timeout
+
+    def __call__(self):
+        request = Request(self.url, data=self.body, headers=self.headers, method="POST")
+        with urlopen(request, timeout=self.timeout, context=self.context) as response:
+            return harness._jsonable(response.read().decode())
+
+
+def openwhisk_url(host, action, namespace="guest"):
+    return "%s/api/v1/namespaces/%s/actions/%s?blocking=true&result=true" % (
+        host.rstrip("/"), namespace, action)
+
+
+class Level(object):
+    """Histograms and counters for one load level."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.execution = Histogram()
+        self.errors = 0
+        self.error_samples = []
+        self._lock = threading.Lock()
+
+    def complete(self, latency_ns, result):
+        self.latency.record(latency_ns)
+        # the function's own view of its compute time, when it reports one
+        try:
+            execution = result["latencies"][instrument.FUNCTION_EXECUTION]
+        except (KeyError, TypeError):
+            return
+        self.execution.record(execution * 1e9)
+
+    def fail(self, exc):
+        with self._lock:
+            self.errors += 1
+            if len(self.error_samples) < 5:
+                self.error_samples.append(repr(exc))
+
+
+def _call(target, level, scheduled_ns, measure):
+    try:
+        result = target()
+    except Exception as e:
+        if measure():
+            level.fail(e)
+        return
+    if measure():
+        level.complete(instrument.perf_counter_ns() - scheduled_ns, result)
+
+
+def run_closed(target, clients, duration, warmup=0.0):
+    """``clients`` threads invoking back to back for ``warmup + duration`` seconds."""
+    level = Level()
+    start = instrument.perf_counter_ns()
+    measure_from = start + int(warmup * 1e9)
+    stop = measure_from + int(duration * 1e9)
+
+    def client():
+        while True:
+            now = instrument.perf_counter_ns()
+            if now >= stop:
+                return
+            _call(target, level, now, lambda: now >= measure_from)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return level, (instrument.perf_counter_ns() - measure_from) / 1e9
+
+
+def run_open(target, rate, duration, warmup=0.0, max_outstanding=256, seed=None):
+    """Poisson arrivals at ``rate`` per second; at most ``max_outstanding`` requests in flight."""
+    level = Level()
+    rng = random.Random(seed)
+    start = instrument.perf_counter_ns()
+    measure_from = start + int(warmup * 1e9)
+    stop = measure_from + int(duration * 1e9)
+
+    with ThreadPoolExecutor(max_workers=max_outstanding) as pool:
+        arrival = start
+        while True:
+            arrival += int(rng.expovariate(rate) * 1e9)
+            if arrival >= stop:
+                break
+            delay = arrival - instrument.perf_counter_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            scheduled = arrival
+            pool.submit(_call, target, level, scheduled, lambda s=scheduled: s >= measure_from)
+    # requests still in flight at the deadline complete before the pool exits
+    return level, (instrument.perf_counter_ns() - measure_from) / 1e9
+
+
+def report(mode, load, level, elapsed):
+    completed = level.latency.count
+    return {
+        "mode": mode,
+        "concurrency" if mode == "closed" else "rate": load,
+        "completed": completed,
+        "errors": level.errors,
+        "error_samples": level.error_samples,
+        "throughput": completed / elapsed if elapsed else None,
+        "latency": level.latency.summary(),
+        "function_execution": level.execution.summary(),
+    }
+
+
+def record(store, reports, workload, platform, event):
+    """Appends one row per load level to ``store``."""
+    rows = []
+    for r in reports:
+        run = results.new_run(workload, platform, "loadgen-" + r["mode"], event)
+        values = {"concurrency": r.get("concurrency"), "rate": r.get("rate"),
+                  "completed": r["completed"], "errors": r["errors"], "throughput": r["throughput"]}
+        for name in ("latency", "function_execution"):
+            for key, value in r[name].items():
+                if key != "n":
+                    values["%s.%s" % (name, key)] = value
+        rows.append(results.make_row(run, **values))
+    store.append(rows)
+
+
+def _levels(value, cast):
+    return [cast(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("handler_path", nargs="?", help="handler module to drive in-process")
+    parser.add_argument("--handler", help="handler function name (default depends on the platform)")
+    parser.add_argument("--platform", choices=harness.PLATFORMS, help="detected from the path by default")
+    parser.add_argument("--url", help="drive a deployed function by POSTing the event to this URL")
+    parser.add_argument("--openwhisk", metavar="HOST", help="OpenWhisk API host, used with --action")
+    parser.add_argument("--action", help="OpenWhisk action name")
+    parser.add_argument("--namespace", default="guest")
+    parser.add_argument("--auth", help="USER:PASS for HTTP basic auth (the OpenWhisk API key)")
+    parser.add_argument("--insecure", action="store_true", help="do not verify TLS certificates")
+    parser.add_argument("--event", default="{}", help="event as a JSON string")
+    parser.add_argument("--event-file", help="read the event from a JSON file")
+    parser.add_argument("--closed", metavar="N,N,...", help="closed-loop sweep over client counts")
+    parser.add_argument("--open", metavar="R,R,...", help="open-loop sweep over arrival rates (req/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each level")
+    parser.add_argument("--max-outstanding", type=int, default=256,
+                        help="open loop: maximum requests in flight")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--storage", help="storage backend for in-process handlers")
+    parser.add_argument("--put", action="append", default=[], metavar="BUCKET/KEY=FILE",
+                        help="upload FILE to the store before the sweep (repeatable)")
+    parser.add_argument("-o", "--output", help="write the JSON report to this file")
+    parser.add_argument("--store", default=os.environ.get(results.RESULTS_ENV),
+                        help="append one row per level to this result store directory")
+    args = parser.parse_args(argv)
+
+    if args.event_file:
+        with open(args.event_file) as f:
+            event = json.load(f)
+    else:
+        event = json.loads(args.event)
+
+    if args.openwhisk:
+        if not args.action:
+            parser.error("--openwhisk needs --action")
+        target = HttpTarget(openwhisk_url(args.openwhisk, args.action, args.namespace),
+                            event, args.auth, args.insecure)
+        workload, platform = args.action, "openwhisk"
+    elif args.url:
+        target = HttpTarget(args.url, event, args.auth, args.insecure)
+        workload, platform = args.url, args.platform
+    elif args.handler_path:
+        if args.storage:
+            os.environ[storage.STORAGE_ENV] = args.storage
+        harness.seed_store(args.put)
+        target = InProcessTarget(args.handler_path, event, args.handler, args.platform)
+        workload = os.path.basename(os.path.dirname(os.path.abspath(args.handler_path)))
+        platform = args.platform or harness.detect_platform(args.handler_path)
+    else:
+        parser.error("give a handler path, --url or --openwhisk")
+
+    if not args.closed and not args.open:
+        args.closed = "1"
+
+    reports = []
+    for clients in _levels(args.closed or "", int):
+        level, elapsed = run_closed(target, clients, args.duration, args.warmup)
+        reports.append(report("closed", clients, level, elapsed))
+        print(json.dumps(reports[-1]), file=sys.stderr)
+    for rate in _levels(args.open or "", float):
+        level, elapsed = run_open(target, rate, args.duration, args.warmup,
+                                  args.max_outstanding, args.seed)
+        reports.append(report("open", rate, level, elapsed))
+        print(json.dumps(reports[-1]), file=sys.stderr)
+
+    if args.store:
+        record(results.ResultStore(args.store), reports, workload, platform, event)
+
+    output = json.dumps(reports, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Model cache shared by the model-serving workloads.
+
+Model files are kept on local disk under their SHA-256
+(``$FUNCTIONBENCH_MODEL_CACHE``, default ``/tmp/functionbench-models``) and
+loaded models are kept in memory for the life of the process, so a warm
+container neither downloads nor rebuilds a model it has already loaded:
+
+    model, source = models.load(store, bucket, key, loader)
+
+``source`` is ``"memory"``, ``"disk"`` or ``"download"``.  Which digest a
+``bucket/key`` refers to is remembered after its first download; pass the
+expected ``sha256`` to pin a version, in which case a download that does not
+match it raises ``ValueError``.  Files read back from disk are always
+checked against their digest.
+"""
+import hashlib
+import os
+import threading
+
+CACHE_ENV = "FUNCTIONBENCH_MODEL_CACHE"
+DEFAULT_CACHE_DIR = "/tmp/functionbench-models"
+MEMORY = "memory"
+DISK = "disk"
+DOWNLOAD = "download"
+
+_models = {}
+_digests = {}
+_lock = threading.RLock()
+
+
+def cache_dir(directory=None):
+    return directory or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_DIR
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write(path, data):
+    # write-then-rename so a concurrent reader never sees a partial file
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _ref_path(directory, bucket, key):
+    return os.path.join(directory, hashlib.sha256(("%s/%s" % (bucket, key)).encode("utf-8")).hexdigest() + ".ref")
+
+
+def _known_digest(directory, bucket, key):
+    digest = _digests.get((bucket, key))
+    if digest:
+        return digest
+    try:
+        with open(_ref_path(directory, bucket, key)) as f:
+            return f.read().strip() or None
+    except IOError:
+        return None
+
+
+def fetch(store, bucket, key, sha256=None, directory=None):
+    """Returns ``(path, digest, source)`` of a verified local copy of ``bucket/key``."""
+    directory = cache_dir(directory)
+    os.makedirs(directory, exist_ok=True)
+    ext = os.path.splitext(key)[1]
+    with _lock:
+        digest = sha256 or _known_digest(directory, bucket, key)
+        if digest:
+            path = os.path.join(directory, digest + ext)
+            if os.path.exists(path) and _sha256_file(path) == digest:
+                _digests[(bucket, key)] = digest
+                return path, digest, DISK
+
+        data = store.get_object(bucket, key)
+        digest = hashlib.sha256(data).hexdigest()
+        if sha256 and digest != sha256:
+            raise ValueError("model %s/%s has sha256 %s, expected %s" % (bucket, key, digest, sha256))
+        path = os.path.join(directory, digest + ext)
+        _write(path, data)
+        _write(_ref_path(directory, bucket, key), digest.encode("ascii"))
+        _digests[(bucket, key)] = digest
+        return path, digest, DOWNLOAD
+
+
+def load(store, bucket, key, loader, sha256=None, directory=None):
+    """
+    Returns ``(loader(path), source)`` for ``bucket/key``, reusing the object
+    a previous call built from the same file contents with the same ``loader``.
+    ``loader`` should be a module-level function and raise on an invalid model.
+    """
+    with _lock:
+        digest = sha256 or _digests.get((bucket, key))
+        if digest and (loader, digest) in _models:
+            return _models[(loader, digest)], MEMORY
+        path, digest, source = fetch(store, bucket, key, sha256, directory)
+        model = _models.get((loader, digest))
+        if model is None:
+            model = _models[(loader, digest)] = loader(path)
+        return model, source
+
+
+def clear():
+    """Forgets the in-memory models (the disk cache is kept), as a cold start would."""
+    with _lock:
+        _models.clear()
+        _digests.clear()
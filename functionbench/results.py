@@ -0,0 +1,359 @@
+"""
+Persistent benchmark result store and regression comparison.
+
+Runs are appended to a local columnar store: a directory of gzip-compressed
+segments, each holding the rows of one run column by column.  Columns are the
+run description (workload, platform, mode, params, memory_mb, git_rev, host,
+...) plus one column per phase flattened from the result schema
+(``latency.<span>``, ``cpu_ns.<span>``, ``metric.<name>``).
+
+    python -m functionbench.harness aws/cpu-memory/matmul/lambda_function.py \\
+        --event '{"n": 512}' -n 30 --store results/
+    python -m functionbench.results summary --store results/
+    python -m functionbench.results compare --store results/ --base 1dd45b0 --head HEAD
+
+``compare`` bootstraps a confidence interval for the ratio of medians between
+two revisions for every workload configuration present in both, and flags a
+regression only when the whole interval lies beyond ``--threshold``.
+"""
+import argparse
+import gzip
+import json
+import os
+import platform as _platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import OrderedDict
+
+import functionbench
+
+RESULTS_ENV = "FUNCTIONBENCH_RESULTS"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(functionbench.__file__)))
+# first_call keeps the warm harness's first invocation (imports, JIT, cache fills) out of the steady-state samples
+GROUP_COLUMNS = ("workload", "platform", "mode", "params", "memory_mb", "first_call")
+
+
+class ResultStore(object):
+    """Append-only columnar store rooted at ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _segments(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(os.path.join(self.path, name) for name in os.listdir(self.path)
+                      if name.endswith(".json.gz"))
+
+    def append(self, rows):
+        """Writes ``rows`` (a list of flat dicts) as one new segment."""
+        if not rows:
+            return
+        names = []
+        for row in rows:
+            for name in row:
+                if name not in names:
+                    names.append(name)
+        segment = {
+            "rows": len(rows),
+            "columns": OrderedDict((name, [row.get(name) for row in rows]) for name in names),
+        }
+        os.makedirs(self.path, exist_ok=True)
+        name = "%d-%s.json.gz" % (time.time() * 1e6, uuid.uuid4().hex[:8])
+        tmp = os.path.join(self.path, "." + name)
+        with gzip.open(tmp, "wt") as f:
+            json.dump(segment, f, separators=(",", ":"))
+        # rename is atomic, so readers never see a partial segment
+        os.rename(tmp, os.path.join(self.path, name))
+
+    def columns(self, names=None):
+        """All rows as ``{column: [values]}``; columns missing from a segment are ``None``."""
+        columns = OrderedDict()
+        total = 0
+        for segment_path in self._segments():
+            with gzip.open(segment_path, "rt") as f:
+                segment = json.load(f)
+            n = segment["rows"]
+            for name, values in segment["columns"].items():
+                if names is not None and name not in names:
+                    continue
+                if name not in columns:
+                    columns[name] = [None] * total
+                columns[name].extend(values)
+            total += n
+            for values in columns.values():
+                values.extend([None] * (total - len(values)))
+        return columns
+
+    def rows(self, **filters):
+        columns = self.columns()
+        n = len(next(iter(columns.values()))) if columns else 0
+        for i in range(n):
+            row = {name: values[i] for name, values in columns.items()}
+            if all(row.get(k) == v for k, v in filters.items() if v is not None):
+                yield row
+
+    def compact(self):
+        """Merges all segments into one."""
+        segments = self._segments()
+        if len(segments) < 2:
+            return
+        self.append(list(self.rows()))
+        for segment_path in segments:
+            os.remove(segment_path)
+
+
+def resolve_revision(rev, root=REPO_ROOT):
+    """Abbreviated hash of ``rev`` (keeping a ``-dirty`` suffix), or ``rev`` unchanged."""
+    suffix = ""
+    if rev.endswith("-dirty"):
+        rev, suffix = rev[:-len("-dirty")], "-dirty"
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", rev], cwd=root,
+                                       stderr=subprocess.DEVNULL).decode().strip() + suffix
+    except (OSError, subprocess.CalledProcessError):
+        return rev + suffix
+
+
+def git_revision(root=REPO_ROOT):
+    """Abbreviated HEAD hash, suffixed with ``-dirty`` when tracked files are modified."""
+    try:
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"], cwd=root,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return None
+    rev = resolve_revision("HEAD", root)
+    if rev == "HEAD":
+        return None
+    return rev + ("-dirty" if dirty else "")
+
+
+def environment():
+    """Description of the machine and code revision the run happened on."""
+    return OrderedDict([
+        ("git_rev", git_revision()),
+        ("host", socket.gethostname()),
+        ("machine", _platform.machine()),
+        ("os", _platform.platform()),
+        ("python", _platform.python_version()),
+        ("cpu_count", os.cpu_count()),
+    ])
+
+
+def flatten(result):
+    """Flattens the ``functionbench.instrument`` result schema into store columns."""
+    columns = OrderedDict()
+    if not isinstance(result, dict):
+        return columns
+    for name, span in (result.get("spans") or {}).items():
+        columns["latency." + name] = span["wall_ns"] / 1e9
+        columns["cpu_ns." + name] = span["cpu_ns"]
+        columns["rss_delta." + name] = span.get("rss_delta")
+    for name, value in (result.get("metrics") or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            columns["metric." + name] = value
+    return columns
+
+
+def make_row(run, **values):
+    row = OrderedDict(run)
+    row.update(values)
+    return row
+
+
+def new_run(workload, platform, mode, params, memory_mb=None, **extra):
+    """Columns shared by every row of one run."""
+    run = OrderedDict([
+        ("run_id", uuid.uuid4().hex),
+        ("timestamp", time.time()),
+        ("workload", workload),
+        ("platform", platform),
+        ("mode", mode),
+        ("params", json.dumps(params, sort_keys=True)),
+        ("memory_mb", memory_mb),
+    ])
+    run.update(environment())
+    run.update(extra)
+    return run
+
+
+def open_results(path=None):
+    path = path or os.environ.get(RESULTS_ENV)
+    return ResultStore(path) if path else None
+
+
+def median(values):
+    ordered = sorted(values)
+    n = len(ordered)
+    mid = n // 2
+    return ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2.0
+
+
+def summarize(samples):
+    """Count, mean, min, p50/p90/p99 and max of ``samples``."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def pct(q):
+        return ordered[min(n - 1, int(round(q / 100.0 * (n - 1))))]
+
+    return {
+        "n": n,
+        "mean": sum(ordered) / n,
+        "min": ordered[0],
+        "p50": pct(50),
+        "p90": pct(90),
+        "p99": pct(99),
+        "max": ordered[-1],
+    }
+
+
+def bootstrap_ratio(base, head, resamples=2000, confidence=0.95, seed=None):
+    """
+    Ratio of medians head/base with a percentile bootstrap confidence interval,
+    or ``(None, None, None)`` when the base median is zero (e.g. ``rss_delta.*``,
+    ``read_bytes.*``) and the ratio is undefined.
+    """
+    if not median(base):
+        return None, None, None
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        b = median([base[rng.randrange(len(base))] for _ in base])
+        h = median([head[rng.randrange(len(head))] for _ in head])
+        if b:
+            ratios.append(h / b)
+    if not ratios:
+        return None, None, None
+    ratios.sort()
+    alpha = (1 - confidence) / 2
+    low = ratios[int(alpha * (len(ratios) - 1))]
+    high = ratios[int(round((1 - alpha) * (len(ratios) - 1)))]
+    return median(head) / median(base), low, high
+
+
+def compare(store, base, head, metric="latency.function_execution", threshold=0.05,
+            higher_is_better=False, resamples=2000, confidence=0.95, min_samples=5,
+            workload=None, seed=None):
+    """
+    Compares ``metric`` between two revisions for each configuration found in
+    both; warm first calls form configurations of their own.
+    """
+    groups = OrderedDict()
+    for row in store.rows(workload=workload):
+        value = row.get(metric)
+        if value is None or row.get("git_rev") not in (base, head):
+            continue
+        key = tuple(row.get(c) for c in GROUP_COLUMNS)
+        groups.setdefault(key, {base: [], head: []})[row["git_rev"]].append(value)
+
+    comparisons = []
+    for key, samples in groups.items():
+        a, b = samples[base], samples[head]
+        if len(a) < min_samples or len(b) < min_samples:
+            continue
+        ratio, low, high = bootstrap_ratio(a, b, resamples, confidence, seed)
+        worse_low, worse_high = low, high
+        if higher_is_better and ratio is not None:
+            # a zero head median is an unbounded slowdown
+            worse_low = 1 / high if high else float("inf")
+            worse_high = 1 / low if low else float("inf")
+        if ratio is None:
+            verdict = "not comparable"
+        elif worse_low > 1 + threshold:
+            verdict = "regression"
+        elif worse_high < 1 - threshold:
+            verdict = "improvement"
+        else:
+            verdict = "unchanged"
+        entry = OrderedDict(zip(GROUP_COLUMNS, key))
+        entry.update([
+            ("n_base", len(a)), ("n_head", len(b)),
+            ("median_base", median(a)), ("median_head", median(b)),
+            ("ratio", ratio), ("ci_low", low), ("ci_high", high),
+            ("verdict", verdict),
+        ])
+        comparisons.append(entry)
+    return comparisons
+
+
+def summarize_store(store):
+    counts = OrderedDict()
+    for row in store.rows():
+        key = (row.get("git_rev"),) + tuple(row.get(c) for c in GROUP_COLUMNS)
+        counts[key] = counts.get(key, 0) + 1
+    return [OrderedDict(zip(("git_rev",) + GROUP_COLUMNS + ("rows",), key + (n,)))
+            for key, n in counts.items()]
+
+
+def _print_table(rows, out=sys.stdout):
+    if not rows:
+        print("(no rows)", file=out)
+        return
+    names = list(rows[0])
+
+    def fmt(value):
+        return "%.6g" % value if isinstance(value, float) else str(value)
+
+    cells = [[fmt(row[n]) for n in names] for row in rows]
+    widths = [max(len(n), *(len(c[i]) for c in cells)) for i, n in enumerate(names)]
+    print("  ".join(n.ljust(w) for n, w in zip(names, widths)), file=out)
+    for c in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(c, widths)), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    p = sub.add_parser("summary", help="rows per revision and configuration")
+    p.add_argument("--store", default=os.environ.get(RESULTS_ENV), required=not os.environ.get(RESULTS_ENV))
+
+    p = sub.add_parser("compare", help="flag regressions between two revisions")
+    p.add_argument("--store", default=os.environ.get(RESULTS_ENV), required=not os.environ.get(RESULTS_ENV))
+    p.add_argument("--base", required=True, help="baseline git revision")
+    p.add_argument("--head", required=True, help="revision under test")
+    p.add_argument("--metric", default="latency.function_execution",
+                   help="column to compare, e.g. latency.download_data or metric.mflops")
+    p.add_argument("--higher-is-better", action="store_true", help="for throughput-like metrics")
+    p.add_argument("--threshold", type=float, default=0.05,
+                   help="relative change the whole confidence interval must exceed")
+    p.add_argument("--confidence", type=float, default=0.95)
+    p.add_argument("--resamples", type=int, default=2000)
+    p.add_argument("--min-samples", type=int, default=5)
+    p.add_argument("--workload")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    p = sub.add_parser("compact", help="merge all segments into one")
+    p.add_argument("--store", default=os.environ.get(RESULTS_ENV), required=not os.environ.get(RESULTS_ENV))
+
+    args = parser.parse_args(argv)
+    store = ResultStore(args.store)
+
+    if args.command == "summary":
+        _print_table(summarize_store(store))
+    elif args.command == "compact":
+        store.compact()
+    elif args.command == "compare":
+        base, head = resolve_revision(args.base), resolve_revision(args.head)
+        comparisons = compare(store, base, head, args.metric, args.threshold,
+                              args.higher_is_better, args.resamples, args.confidence,
+                              args.min_samples, args.workload, args.seed)
+        if args.json:
+            print(json.dumps(comparisons, indent=2))
+        else:
+            _print_table(comparisons)
+        if any(c["verdict"] == "regression" for c in comparisons):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
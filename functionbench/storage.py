@@ -0,0 +1,284 @@
+"""
+Pluggable object storage used by the storage-backed workloads.
+
+The platform adapters talk to an ``ObjectStore`` instead of creating
+``boto3.client('s3')``, ``google.cloud.storage.Client()`` or
+``BlockBlobService`` directly, so the same handler can run against the cloud
+service or fully offline.  The backend is picked by ``open_store()``:
+
+    FUNCTIONBENCH_STORAGE=s3|gcs|azure|azure-file   cloud backends
+    FUNCTIONBENCH_STORAGE=memory                    process-wide in-memory store
+    FUNCTIONBENCH_STORAGE=local:/path/to/root       one directory per bucket
+
+and optionally shaped with a fixed per-request latency and a bandwidth cap:
+
+    FUNCTIONBENCH_STORAGE_LATENCY_MS=20
+    FUNCTIONBENCH_STORAGE_BANDWIDTH_MBPS=100
+"""
+import os
+import shutil
+import threading
+import time
+
+STORAGE_ENV = "FUNCTIONBENCH_STORAGE"
+LATENCY_ENV = "FUNCTIONBENCH_STORAGE_LATENCY_MS"
+BANDWIDTH_ENV = "FUNCTIONBENCH_STORAGE_BANDWIDTH_MBPS"
+
+
+class ObjectStore(object):
+    """Bucket/key object storage; argument order of the file helpers follows boto3."""
+
+    def get_object(self, bucket, key):
+        raise NotImplementedError
+
+    def put_object(self, bucket, key, body):
+        raise NotImplementedError
+
+    def list_objects(self, bucket, prefix=""):
+        raise NotImplementedError
+
+    def download_file(self, bucket, key, path):
+        data = self.get_object(bucket, key)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def upload_file(self, path, bucket, key):
+        with open(path, "rb") as f:
+            self.put_object(bucket, key, f.read())
+
+
+def _to_bytes(body):
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return bytes(body)
+
+
+class MemoryStore(ObjectStore):
+
+    def __init__(self):
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def get_object(self, bucket, key):
+        try:
+            return self._objects[(bucket, key)]
+        except KeyError:
+            raise KeyError("no such object %s/%s" % (bucket, key))
+
+    def put_object(self, bucket, key, body):
+        with self._lock:
+            self._objects[(bucket, key)] = _to_bytes(body)
+
+    def list_objects(self, bucket, prefix=""):
+        return sorted(k for b, k in list(self._objects) if b == bucket and k.startswith(prefix))
+
+
+class LocalStore(ObjectStore):
+    """Stores ``bucket/key`` as ``<root>/<bucket>/<key>``."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, key)
+
+    def get_object(self, bucket, key):
+        with open(self._path(bucket, key), "rb") as f:
+            return f.read()
+
+    def put_object(self, bucket, key, body):
+        path = self._path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_to_bytes(body))
+
+    def list_objects(self, bucket, prefix=""):
+        bucket_root = os.path.join(self.root, bucket)
+        keys = []
+        for dirpath, _, filenames in os.walk(bucket_root):
+            for name in filenames:
+                key = os.path.relpath(os.path.join(dirpath, name), bucket_root).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def download_file(self, bucket, key, path):
+        shutil.copyfile(self._path(bucket, key), path)
+
+    def upload_file(self, path, bucket, key):
+        dst = self._path(bucket, key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copyfile(path, dst)
+
+
+class S3Store(ObjectStore):
+    """AWS S3 or any S3-compatible endpoint (e.g. MinIO for OpenWhisk)."""
+
+    def __init__(self, **client_kwargs):
+        import boto3
+        self.client = boto3.client('s3', **client_kwargs)
+
+    def get_object(self, bucket, key):
+        return self.client.get_object(Bucket=bucket, Key=key)['Body'].read()
+
+    def put_object(self, bucket, key, body):
+        self.client.put_object(Body=body, Bucket=bucket, Key=key)
+
+    def list_objects(self, bucket, prefix=""):
+        keys = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            keys += [obj['Key'] for obj in page.get('Contents', [])]
+        return keys
+
+    def download_file(self, bucket, key, path):
+        self.client.download_file(bucket, key, path)
+
+    def upload_file(self, path, bucket, key):
+        self.client.upload_file(path, bucket, key)
+
+
+class GCSStore(ObjectStore):
+
+    def __init__(self, project=None):
+        from google.cloud import storage
+        self.client = storage.Client(project=project)
+
+    def _blob(self, bucket, key):
+        return self.client.bucket(bucket).blob(key)
+
+    def get_object(self, bucket, key):
+        return self._blob(bucket, key).download_as_string()
+
+    def put_object(self, bucket, key, body):
+        self._blob(bucket, key).upload_from_string(body)
+
+    def list_objects(self, bucket, prefix=""):
+        return [blob.name for blob in self.client.list_blobs(bucket, prefix=prefix or None)]
+
+    def download_file(self, bucket, key, path):
+        self._blob(bucket, key).download_to_filename(path)
+
+    def upload_file(self, path, bucket, key):
+        self._blob(bucket, key).upload_from_filename(path)
+
+
+class AzureBlobStore(ObjectStore):
+    """Azure Blob Storage; buckets are containers."""
+
+    def __init__(self, account_name=None, account_key=None):
+        from azure.storage.blob import BlockBlobService
+        self.service = BlockBlobService(account_name=account_name, account_key=account_key)
+
+    def get_object(self, bucket, key):
+        return self.service.get_blob_to_bytes(bucket, key).content
+
+    def put_object(self, bucket, key, body):
+        self.service.create_blob_from_bytes(bucket, key, _to_bytes(body))
+
+    def list_objects(self, bucket, prefix=""):
+        return [blob.name for blob in self.service.list_blobs(bucket, prefix=prefix or None)]
+
+    def download_file(self, bucket, key, path):
+        self.service.get_blob_to_path(bucket, key, path)
+
+    def upload_file(self, path, bucket, key):
+        self.service.create_blob_from_path(bucket, key, path)
+
+
+class AzureFileStore(ObjectStore):
+    """Azure Files; buckets are shares and keys live in the share root."""
+
+    def __init__(self, account_name=None, account_key=None):
+        from azure.storage.file import FileService
+        self.service = FileService(account_name=account_name, account_key=account_key)
+
+    def get_object(self, bucket, key):
+        return self.service.get_file_to_bytes(bucket, None, key).content
+
+    def put_object(self, bucket, key, body):
+        self.service.create_file_from_bytes(bucket, None, key, _to_bytes(body))
+
+    def list_objects(self, bucket, prefix=""):
+        return [f.name for f in self.service.list_directories_and_files(bucket, prefix=prefix or None)]
+
+    def download_file(self, bucket, key, path):
+        self.service.get_file_to_path(bucket, None, key, path)
+
+    def upload_file(self, path, bucket, key):
+        self.service.create_file_from_path(bucket, None, key, path)
+
+
+class ShapedStore(ObjectStore):
+    """Adds a fixed per-request latency and a bandwidth cap on top of another store."""
+
+    def __init__(self, store, latency=0.0, bandwidth=None):
+        self.store = store
+        self.latency = latency
+        self.bandwidth = bandwidth  # bytes per second, None for unlimited
+
+    def _delay(self, nbytes=0):
+        delay = self.latency
+        if self.bandwidth:
+            delay += nbytes / float(self.bandwidth)
+        if delay > 0:
+            time.sleep(delay)
+
+    def get_object(self, bucket, key):
+        data = self.store.get_object(bucket, key)
+        self._delay(len(data))
+        return data
+
+    def put_object(self, bucket, key, body):
+        body = _to_bytes(body)
+        self._delay(len(body))
+        self.store.put_object(bucket, key, body)
+
+    def list_objects(self, bucket, prefix=""):
+        self._delay()
+        return self.store.list_objects(bucket, prefix)
+
+    def download_file(self, bucket, key, path):
+        self.store.download_file(bucket, key, path)
+        self._delay(os.path.getsize(path))
+
+    def upload_file(self, path, bucket, key):
+        self._delay(os.path.getsize(path))
+        self.store.upload_file(path, bucket, key)
+
+
+_memory_store = MemoryStore()
+
+_CLOUD_BACKENDS = {
+    "s3": S3Store,
+    "gcs": GCSStore,
+    "azure": AzureBlobStore,
+    "azure-file": AzureFileStore,
+}
+
+
+def open_store(spec=None, default="s3", latency=None, bandwidth=None, **kwargs):
+    """
+    Returns the ``ObjectStore`` selected by ``spec`` (or ``$FUNCTIONBENCH_STORAGE``,
+    falling back to ``default``).  ``kwargs`` are the cloud client arguments the
+    adapter would have used (endpoint, credentials, ...) and are ignored by the
+    local backends.  ``latency`` is in seconds and ``bandwidth`` in bytes/sec.
+    """
+    spec = spec or os.environ.get(STORAGE_ENV) or default
+
+    if spec == "memory":
+        store = _memory_store
+    elif spec.startswith("local:"):
+        store = LocalStore(spec[len("local:"):])
+    elif spec in _CLOUD_BACKENDS:
+        store = _CLOUD_BACKENDS[spec](**kwargs)
+    else:
+        raise ValueError("unknown storage backend %r" % spec)
+
+    if latency is None:
+        latency = float(os.environ.get(LATENCY_ENV, 0)) / 1000.0
+    if bandwidth is None and os.environ.get(BANDWIDTH_ENV):
+        bandwidth = float(os.environ[BANDWIDTH_ENV]) * 1000 * 1000 / 8
+    if latency or bandwidth:
+        store = ShapedStore(store, latency, bandwidth)
+    return store
@@ -0,0 +1,10 @@
+"""
+Platform-neutral workload kernels.
+
+Each module holds the compute part of one FunctionBench workload and only
+takes local paths and plain parameters; downloading inputs and uploading
+results is left to the platform adapters (``lambda_handler``,
+``function_handler``, Azure ``main(req)`` and OpenWhisk ``main(event)``).
+Modules are imported explicitly since most of them pull in heavy optional
+dependencies (numpy, OpenCV, TensorFlow, PyTorch, ...).
+"""
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import socket
+import threading
+
+import six
+from chameleon import PageTemplate
+from chameleon.loader import ModuleLoader
+
+from .. import instrument
+
+# directory for generated template modules, e.g. /tmp/chameleon; created on first use
+# (unlike chameleon's own CHAMELEON_CACHE, which must exist before chameleon is imported)
+CACHE_ENV = "FUNCTIONBENCH_TEMPLATE_CACHE"
+
+
+BIGTABLE_ZPT = """\
+<table xmlns="http://www.w3.org/1999/xhtml"
+xmlns:tal="http://xml.zope.org/namespaces/tal">
+<tr tal:repeat="row python: options['table']">
+<td tal:repeat="c python: row.values()">
+<span tal:define="d python: c + 1"
+tal:attributes="class python: 'column-' + %s(d)"
+tal:content="python: d" />
+</td>
+</tr>
+</table>""" % six.text_type.__name__
+
+# the rows of BIGTABLE_ZPT alone; TABLE_HEAD + chunks + TABLE_TAIL is byte-identical to the full render
+ROWS_ZPT = """\
+<tal:rows xmlns="http://www.w3.org/1999/xhtml"
+xmlns:tal="http://xml.zope.org/namespaces/tal"
+tal:repeat="row python: options['table']">
+<tr>
+<td tal:repeat="c python: row.values()">
+<span tal:define="d python: c + 1"
+tal:attributes="class python: 'column-' + %s(d)"
+tal:content="python: d" />
+</td>
+</tr></tal:rows>""" % six.text_type.__name__
+TABLE_HEAD = '<table xmlns="http://www.w3.org/1999/xhtml">'
+TABLE_TAIL = '\n</table>'
+
+
+_templates = {}
+_template_classes = {}
+_local = threading.local()
+
+
+class _ModuleLoader(ModuleLoader):
+    """Notes in the calling thread when a template had to be compiled rather than imported from disk."""
+
+    def build(self, source, filename):
+        _local.built = True
+        return ModuleLoader.build(self, source, filename)
+
+
+def _template_class(cache_dir):
+    if not cache_dir:
+        return PageTemplate
+    cls = _template_classes.get(cache_dir)
+    if cls is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # generated modules are named after the digest of the source, so a restarted
+        # worker finds and imports them instead of compiling again
+        cls = type("PageTemplate", (PageTemplate,), {"loader": _ModuleLoader(cache_dir)})
+        _template_classes[cache_dir] = cls
+    return cls
+
+
+def compile_template(source, cache_dir=None):
+    """
+    Compiled ``PageTemplate`` for ``source`` and the cache layer it came from:
+    ``"memory"`` (this process), ``"disk"`` (a module generated earlier in
+    ``cache_dir``) or ``None`` when it was compiled.  Templates are cached by
+    source hash; with ``cache_dir`` the generated module is also persisted there.
+    """
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    tmpl = _templates.get(key)
+    if tmpl is not None:
+        return tmpl, "memory"
+    _local.built = False
+    tmpl = _templates[key] = _template_class(cache_dir)(source)
+    return tmpl, "disk" if cache_dir and not _local.built else None
+
+
+def render_table(num_of_rows, num_of_cols, cache_dir=None):
+    """Returns the result and the rendered table; ``cache_dir`` defaults to ``$FUNCTIONBENCH_TEMPLATE_CACHE``."""
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_ENV)
+
+    with instrument.RSSHighWater() as high_water, instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with instrument.span("compile") as compile_span:
+            tmpl, template_cache = compile_template(BIGTABLE_ZPT, cache_dir)
+
+        data = {}
+        for i in range(num_of_cols):
+            data[str(i)] = i
+
+        table = [data for x in range(num_of_rows)]
+        options = {'table': table}
+
+        with instrument.span("render") as render_span:
+            data = tmpl.render(options=options)
+    latency = span.seconds
+
+    result = {
+        'template_cache': template_cache,
+        'cache_hit': template_cache is not None,
+        'compile_time': compile_span.seconds,
+        'render_time': render_span.seconds,
+        'output_bytes': len(data),
+        'rows_per_sec': num_of_rows / latency if latency else None,
+        'peak_rss_growth': high_water.growth,
+        'latency': latency
+    }
+
+    return result, data
+
+
+class DiscardSink(object):
+    def write(self, data):
+        return len(data)
+
+    def close(self):
+        pass
+
+
+class SocketSink(object):
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port))
+
+    def write(self, data):
+        self.sock.sendall(data)
+        return len(data)
+
+    def close(self):
+        self.sock.close()
+
+
+def open_sink(spec):
+    """``discard``, ``file:/path`` or ``socket:host:port``."""
+    if spec == "discard":
+        return DiscardSink()
+    if spec.startswith("file:"):
+        return open(spec[len("file:"):], "wb")
+    if spec.startswith("socket:"):
+        host, port = spec[len("socket:"):].rsplit(":", 1)
+        return SocketSink(host, int(port))
+    raise ValueError("unknown sink %s, expected discard, file:/path or socket:host:port" % spec)
+
+
+def render_table_stream(num_of_rows, num_of_cols, sink="discard", chunk_rows=1000, cache_dir=None):
+    """
+    Renders the table ``chunk_rows`` rows at a time and writes each chunk to
+    ``sink`` as it is produced, so memory stays bounded by one chunk.
+    ``peak_rss_growth`` (also reported by ``render_table``) is the RSS
+    high-water mark above the start of the call.
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_ENV)
+
+    out = open_sink(sink)
+    output_bytes = 0
+    render_time = 0.0
+    try:
+        with instrument.RSSHighWater() as high_water, instrument.span(instrument.FUNCTION_EXECUTION) as span:
+            with instrument.span("compile") as compile_span:
+                tmpl, template_cache = compile_template(ROWS_ZPT, cache_dir)
+            compile_time = compile_span.seconds
+
+            data = {}
+            for i in range(num_of_cols):
+                data[str(i)] = i
+
+            output_bytes += out.write(TABLE_HEAD.encode("utf-8"))
+            for start in range(0, num_of_rows, chunk_rows):
+                table = [data for x in range(min(chunk_rows, num_of_rows - start))]
+                with instrument.span("render") as render_span:
+                    chunk = tmpl.render(options={'table': table}).encode("utf-8")
+                render_time += render_span.seconds
+                with instrument.span("write"):
+                    output_bytes += out.write(chunk)
+            output_bytes += out.write(TABLE_TAIL.encode("utf-8"))
+    finally:
+        out.close()
+    latency = span.seconds
+
+    result = {
+        'template_cache': template_cache,
+        'cache_hit': template_cache is not None,
+        'compile_time': compile_time,
+        'render_time': render_time,
+        'output_bytes': output_bytes,
+        'rows_per_sec': num_of_rows / latency if latency else None,
+        'peak_rss_growth': high_water.growth,
+        'latency': latency
+    }
+
+    return result
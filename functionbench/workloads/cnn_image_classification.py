@@ -0,0 +1,256 @@
+import threading
+from concurrent.futures import Future
+from queue import Empty, Queue
+from time import perf_counter
+
+from tensorflow.keras.preprocessing import image
+from tensorflow.keras.applications.resnet50 import preprocess_input, decode_predictions
+import numpy as np
+
+from .. import instrument
+from ..results import summarize
+from .cnn_preprocessing import preprocess_batch
+from .squeezenet import SqueezeNet
+
+INPUT_SIZE = (227, 227)
+
+
+def load_model(weights_path='imagenet'):
+    """
+    SqueezeNet with the weights in ``weights_path``; usable as a
+    ``functionbench.models`` loader.  Runs one prediction so the first request
+    does not pay for building the predict function.
+    """
+    model = SqueezeNet(weights=weights_path)
+    model.predict(np.zeros((1,) + INPUT_SIZE + (3,), dtype=np.float32), verbose=0)
+    return model
+
+
+def _load_images(img_local_paths, preprocessing="keras"):
+    if preprocessing == "keras":
+        x = np.stack([image.img_to_array(image.load_img(path, target_size=INPUT_SIZE)) for path in img_local_paths])
+        return preprocess_input(x)
+    return preprocess_batch(img_local_paths, preprocessing)
+
+
+def predict(img_local_path, model=None, preprocessing="keras"):
+    """
+    Classifies the image at ``img_local_path`` with ``model`` (from
+    ``load_model``); without one, the model is built and loaded from the
+    default weights in a ``model_load`` span first.  ``preprocessing`` is
+    ``keras`` (the Keras utilities) or a ``cnn_preprocessing`` mode.
+    """
+    if model is None:
+        with instrument.span(instrument.MODEL_LOAD):
+            model = load_model()
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with instrument.span("preprocess"):
+            if preprocessing == "keras":
+                img = image.load_img(img_local_path, target_size=INPUT_SIZE)
+                x = image.img_to_array(img)
+                x = np.expand_dims(x, axis=0)
+                x = preprocess_input(x)
+            else:
+                x = preprocess_batch([img_local_path], preprocessing)
+        with instrument.span("inference"):
+            preds = model.predict(x)
+        res = decode_predictions(preds)
+    latency = span.seconds
+    return latency, res
+
+
+def predict_batch(img_local_paths, model=None, batch_size=32, preprocessing="keras"):
+    """
+    Classifies all of ``img_local_paths`` in batches of ``batch_size``;
+    returns the result and one prediction list per image.
+    """
+    if not img_local_paths:
+        return {
+            'images': 0,
+            'batch_size': batch_size,
+            'images_per_sec': 0.0,
+            'inference_images_per_sec': None,
+            'latency': 0.0
+        }, []
+    if model is None:
+        with instrument.span(instrument.MODEL_LOAD):
+            model = load_model()
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with instrument.span("preprocess"):
+            x = _load_images(img_local_paths, preprocessing)
+        with instrument.span("inference") as inference:
+            preds = np.concatenate([model.predict_on_batch(x[i:i + batch_size]) for i in range(0, len(x), batch_size)])
+        res = decode_predictions(preds)
+    latency = span.seconds
+
+    result = {
+        'images': len(x),
+        'batch_size': batch_size,
+        'images_per_sec': len(x) / latency if latency else None,
+        'inference_images_per_sec': len(x) / inference.seconds if inference.seconds else None,
+        'latency': latency
+    }
+
+    return result, res
+
+
+class MicroBatcher(object):
+    """
+    Serves single-image requests from one thread, running them through
+    ``model`` in batches: a batch starts once it holds ``max_batch_size``
+    images or ``max_wait`` seconds after its oldest request arrived.
+    ``submit`` returns a ``Future`` of that image's prediction vector.
+    """
+
+    def __init__(self, model, max_batch_size=8, max_wait=0.005, recorder=None):
+        self.model = model
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max_wait
+        self.recorder = recorder
+        # batch size -> (batch count, queueing delays, inference seconds)
+        self.batches = {}
+        self._queue = Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, x):
+        future = Future()
+        self._queue.put((perf_counter(), x, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None, True
+        batch = [first]
+        deadline = first[0] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - perf_counter()
+            try:
+                # past the deadline, still take whatever is already queued
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        closed = False
+        while not closed:
+            batch, closed = self._collect()
+            if not batch:
+                break
+            start = perf_counter()
+            try:
+                with instrument.Span("inference", self.recorder, resources=False) as span:
+                    preds = self.model.predict_on_batch(np.stack([x for _, x, _ in batch]))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            count, delays, seconds = self.batches.get(len(batch), (0, [], 0.0))
+            delays.extend(start - submitted for submitted, _, _ in batch)
+            self.batches[len(batch)] = (count + 1, delays, seconds + span.seconds)
+            for (_, _, future), pred in zip(batch, preds):
+                future.set_result(pred)
+
+    def stats(self):
+        """Per batch size: how many batches ran, their queueing delay and inference throughput."""
+        stats = {}
+        for size, (count, delays, seconds) in sorted(self.batches.items()):
+            stats[size] = {
+                'batches': count,
+                'queue_delay': summarize(delays),
+                'inference_mean': seconds / count,
+                'images_per_sec': size * count / seconds if seconds else None,
+            }
+        return stats
+
+
+def serve(img_local_paths, model=None, requests=None, concurrency=8, max_batch_size=8, max_wait=0.005,
+          preprocessing="keras"):
+    """
+    Local serving mode: ``concurrency`` clients each send one image at a time
+    (cycling through ``img_local_paths``, ``requests`` in total) to a
+    ``MicroBatcher`` and wait for its answer before sending the next.
+    """
+    if not img_local_paths:
+        return {
+            'images': 0,
+            'requests': 0,
+            'concurrency': 0,
+            'max_batch_size': max(int(max_batch_size), 1),
+            'max_wait': max_wait,
+            'images_per_sec': 0.0,
+            'mean_batch_size': None,
+            'queue_delay': summarize([]),
+            'request_latency': summarize([]),
+            'per_batch_size': {},
+            'latency': 0.0
+        }, []
+    if model is None:
+        with instrument.span(instrument.MODEL_LOAD):
+            model = load_model()
+    with instrument.span("preprocess"):
+        x = _load_images(img_local_paths, preprocessing)
+    requests = int(requests or len(x))
+    concurrency = max(min(int(concurrency), requests), 1)
+    recorder = instrument.current()
+    latencies = [None] * requests
+    preds = [None] * len(x)
+    errors = []
+
+    def client(first):
+        try:
+            for i in range(first, requests, concurrency):
+                start = perf_counter()
+                pred = batcher.submit(x[i % len(x)]).result()
+                latencies[i] = perf_counter() - start
+                preds[i % len(x)] = pred
+        except Exception as e:
+            errors.append(e)
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        batcher = MicroBatcher(model, max_batch_size, max_wait, recorder)
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        batcher.close()
+    latency = span.seconds
+    if errors:
+        raise errors[0]
+
+    batches = batcher.stats()
+    delays = [d for _, ds, _ in batcher.batches.values() for d in ds]
+    count = sum(s['batches'] for s in batches.values())
+    result = {
+        'images': len(x),
+        'requests': requests,
+        'concurrency': concurrency,
+        'max_batch_size': batcher.max_batch_size,
+        'max_wait': max_wait,
+        'images_per_sec': requests / latency if latency else None,
+        'mean_batch_size': requests / count if count else None,
+        'queue_delay': summarize(delays),
+        'request_latency': summarize(latencies),
+        'per_batch_size': batches,
+        'latency': latency
+    }
+
+    # aligned with img_local_paths; None for images no request reached
+    done = [i for i, pred in enumerate(preds) if pred is not None]
+    decoded = decode_predictions(np.stack([preds[i] for i in done])) if done else []
+    predictions = [None] * len(preds)
+    for i, res in zip(done, decoded):
+        predictions[i] = res
+    return result, predictions
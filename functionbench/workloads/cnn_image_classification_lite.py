@@ -0,0 +1,93 @@
+"""
+SqueezeNet classification from an artifact written by ``squeezenet_export``,
+without importing TensorFlow: ``.tflite`` models run on ``tflite_runtime``
+(or ``ai_edge_litert``), ``.onnx`` models on ``onnxruntime``.  Preprocessing
+(``cnn_preprocessing``) and decoding reproduce the Keras path of
+``cnn_image_classification``.
+"""
+import json
+import os
+
+import numpy as np
+
+from .. import instrument
+from .cnn_preprocessing import INPUT_SIZE, preprocess_batch
+
+
+class TFLiteModel(object):
+
+    def __init__(self, model_path):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from ai_edge_litert.interpreter import Interpreter
+        self.interpreter = Interpreter(model_path=model_path)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]["index"]
+        self._output = self.interpreter.get_output_details()[0]["index"]
+
+    def predict(self, x):
+        if tuple(self.interpreter.get_input_details()[0]["shape"]) != x.shape:
+            # exported with a dynamic batch dimension
+            self.interpreter.resize_tensor_input(self._input, x.shape)
+            self.interpreter.allocate_tensors()
+        self.interpreter.set_tensor(self._input, x)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output).copy()
+
+
+class ONNXModel(object):
+
+    def __init__(self, model_path):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self._input = self.session.get_inputs()[0].name
+
+    def predict(self, x):
+        return self.session.run(None, {self._input: x})[0]
+
+
+RUNTIMES = {
+    ".tflite": TFLiteModel,
+    ".onnx": ONNXModel,
+}
+
+
+def load_model(model_path):
+    """The runtime for ``model_path``'s extension, warmed up with one prediction; usable as a ``functionbench.models`` loader."""
+    ext = os.path.splitext(model_path)[1]
+    try:
+        runtime = RUNTIMES[ext]
+    except KeyError:
+        raise ValueError("unknown model format %s, expected one of %s" % (ext, ", ".join(RUNTIMES)))
+    model = runtime(model_path)
+    model.predict(np.zeros((1,) + INPUT_SIZE + (3,), dtype=np.float32))
+    return model
+
+
+def load_labels(labels_path):
+    """``[(wnid, name), ...]`` by class id from an ImageNet class index JSON."""
+    with open(labels_path) as f:
+        index = json.load(f)
+    return [tuple(index[str(i)]) for i in range(len(index))]
+
+
+def decode(preds, labels=None, top=5):
+    """Like keras' ``decode_predictions``; without ``labels`` classes are named by id."""
+    res = []
+    for pred in preds:
+        top_ids = pred.argsort()[-top:][::-1]
+        res.append([(labels[i] if labels else (str(i), str(i))) + (float(pred[i]),) for i in top_ids])
+    return res
+
+
+def predict(img_local_path, model, labels=None, preprocessing="keras"):
+    """``preprocessing`` is a ``cnn_preprocessing`` mode."""
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with instrument.span("preprocess"):
+            x = preprocess_batch([img_local_path], preprocessing)
+        with instrument.span("inference"):
+            preds = model.predict(x)
+        res = decode(preds, labels)
+    latency = span.seconds
+    return latency, res
@@ -0,0 +1,94 @@
+"""
+ImageNet "caffe" preprocessing for the SqueezeNet workloads, without
+TensorFlow: RGB to BGR, then per-channel mean subtraction, as Keras'
+``preprocess_input`` does for ResNet50.
+
+``preprocess`` reproduces ``load_img`` + ``img_to_array`` + ``preprocess_input``
+exactly.  ``BatchPreprocessor`` is the fast path: JPEGs are decoded in draft
+mode straight to a reduced size, each image is written once into a reused
+float32 batch buffer and the means are subtracted in place.
+"""
+import threading
+
+import numpy as np
+from PIL import Image
+
+from .. import instrument
+
+INPUT_SIZE = (227, 227)
+# per-channel ImageNet means subtracted by keras' "caffe" preprocess_input, in BGR order
+MEAN_BGR = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+MODES = ("keras", "fast")
+
+
+def _open(img_local_path, size, draft):
+    with Image.open(img_local_path) as img:
+        if draft:
+            # JPEG only: decode at the smallest 1/2, 1/4 or 1/8 scale still at least ``size``
+            img.draft("RGB", size)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        if img.size != size:
+            # nearest neighbour, like keras' load_img
+            img = img.resize(size, Image.NEAREST)
+        img.load()
+        return img
+
+
+def preprocess(img_local_path, target_size=INPUT_SIZE):
+    """One image as a ``(1, height, width, 3)`` batch, identical to the Keras utilities."""
+    x = np.asarray(_open(img_local_path, target_size[::-1], False), dtype=np.float32)
+    return (x[..., ::-1] - MEAN_BGR)[np.newaxis]
+
+
+class BatchPreprocessor(object):
+    """
+    Fills a preallocated ``(n, height, width, 3)`` float32 buffer, grown as
+    needed and reused between calls; ``__call__`` returns a view of it that
+    stays valid until the next call.  ``draft`` trades exactness against the
+    Keras path for decoding large JPEGs at a fraction of their size.
+    """
+
+    def __init__(self, target_size=INPUT_SIZE, draft=True):
+        self.target_size = tuple(target_size)
+        self.draft = draft
+        self.buffer = np.empty((0,) + self.target_size + (3,), dtype=np.float32)
+
+    def _reserve(self, n):
+        if len(self.buffer) < n:
+            self.buffer = np.empty((n,) + self.target_size + (3,), dtype=np.float32)
+        return self.buffer[:n]
+
+    def __call__(self, img_local_paths):
+        batch = self._reserve(len(img_local_paths))
+        size = self.target_size[::-1]
+        for i, path in enumerate(img_local_paths):
+            with instrument.span("decode", resources=False):
+                img = _open(path, size, self.draft)
+            with instrument.span("convert", resources=False):
+                # uint8 RGB -> float32 BGR directly into the batch slot, one channel at a time
+                # (several times faster than copying through a reversed-stride view)
+                rgb = np.asarray(img)
+                for c in range(3):
+                    batch[i, ..., c] = rgb[..., 2 - c]
+        with instrument.span("normalize", resources=False):
+            batch -= MEAN_BGR
+        return batch
+
+
+_local = threading.local()
+
+
+def preprocess_batch(img_local_paths, mode="fast"):
+    """
+    ``(n, height, width, 3)`` batch for ``img_local_paths``: ``keras`` stacks
+    ``preprocess`` results, ``fast`` uses this thread's ``BatchPreprocessor``.
+    """
+    if mode == "keras":
+        return np.concatenate([preprocess(path) for path in img_local_paths])
+    if mode != "fast":
+        raise ValueError("unknown preprocessing %s, expected one of %s" % (mode, ", ".join(MODES)))
+    preprocessor = getattr(_local, "preprocessor", None)
+    if preprocessor is None:
+        preprocessor = _local.preprocessor = BatchPreprocessor()
+    return preprocessor(img_local_paths)
@@ -0,0 +1,32 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .. import instrument
+from .text import cleanup
+
+
+def extract_features(df):
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        df['Text'] = df['Text'].apply(cleanup)
+        text = df['Text'].tolist()
+        result = set()
+        for item in text:
+            result.update(item.split())
+        print("Number of Feature : " + str(len(result)))
+
+        feature = str(list(result))
+        feature = feature.lstrip('[').rstrip(']').replace(' ', '')
+    latency = span.seconds
+    return latency, feature
+
+
+def split_features(body):
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    return body.replace("'", '').split(',')
+
+
+def reduce_features(words):
+    tfidf_vect = TfidfVectorizer().fit(words)
+    feature = str(tfidf_vect.get_feature_names())
+    feature = feature.lstrip('[').rstrip(']').replace(' ', '')
+    return feature
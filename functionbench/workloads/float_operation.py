@@ -0,0 +1,80 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import instrument
+
+ENGINES = ("python", "numpy", "numpy-mt")
+# sin, cos and sqrt per element
+OPS_PER_ELEMENT = 3
+# 64K float64 elements (512 KB) per buffer keeps memory bounded for any n
+CHUNK_SIZE = 1 << 16
+
+
+def _python(n):
+    for i in range(0, n):
+        sin_i = math.sin(i)
+        cos_i = math.cos(i)
+        sqrt_i = math.sqrt(i)
+
+
+def _numpy_worker(np, chunk_size):
+    offsets = np.arange(chunk_size, dtype=np.float64)
+    x = np.empty(chunk_size)
+    out = np.empty(chunk_size)
+
+    def run(start, stop):
+        size = stop - start
+        xs, outs = x[:size], out[:size]
+        # numpy ufuncs release the GIL, so chunks run in parallel under numpy-mt
+        np.add(offsets[:size], start, out=xs)
+        np.sin(xs, out=outs)
+        np.cos(xs, out=outs)
+        np.sqrt(xs, out=outs)
+    return run
+
+
+def _numpy(n, chunk_size, threads):
+    import numpy as np
+
+    bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    if threads <= 1:
+        run = _numpy_worker(np, chunk_size)
+        for start, stop in bounds:
+            run(start, stop)
+        return
+
+    def run_slice(part):
+        run = _numpy_worker(np, chunk_size)
+        for start, stop in bounds[part::threads]:
+            run(start, stop)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(run_slice, range(threads)))
+
+
+def float_operations(n, engine="python", chunk_size=CHUNK_SIZE, threads=None):
+    """
+    ``python`` loops in the interpreter; ``numpy`` evaluates ``chunk_size``
+    elements at a time and ``numpy-mt`` spreads the chunks over ``threads``
+    threads (default: one per CPU).
+    """
+    if engine not in ENGINES:
+        raise ValueError("unknown engine %s, expected one of %s" % (engine, ", ".join(ENGINES)))
+    threads = threads or os.cpu_count() or 1
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        if engine == "python":
+            _python(n)
+        else:
+            _numpy(n, chunk_size, threads if engine == "numpy-mt" else 1)
+    latency = span.seconds
+
+    result = {
+        'engine': engine,
+        'threads': threads if engine == "numpy-mt" else 1,
+        'ops_per_sec': OPS_PER_ELEMENT * n / latency if latency else None,
+        'latency': latency
+    }
+
+    return result
@@ -0,0 +1,23 @@
+import gzip
+import os
+
+from .. import instrument
+
+TMP = "/tmp/"
+
+
+def gzip_compression(file_size, tmp=TMP):
+    file_write_path = os.path.join(tmp, 'file')
+
+    with instrument.span("disk_write") as span:
+        with open(file_write_path, 'wb') as f:
+            f.write(os.urandom(file_size * 1024 * 1024))
+    disk_latency = span.seconds
+
+    with open(file_write_path, 'rb') as f:
+        with instrument.span("compress") as span:
+            with gzip.open(os.path.join(tmp, 'result.gz'), 'wb') as gz:
+                gz.writelines(f)
+        compress_latency = span.seconds
+
+    return {'disk_write': disk_latency, "compress": compress_latency}
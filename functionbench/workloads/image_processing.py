@@ -0,0 +1,259 @@
+import io
+import os
+import posixpath
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageFilter
+
+from .. import instrument
+
+TMP = "/tmp/"
+
+# The original ten outputs.  Every entry names an output (prefixed to the input
+# file name) and the steps applied to the decoded image to produce it; an entry
+# may also set "format" (e.g. "WEBP") and "quality".
+DEFAULT_OPS = [
+    {"name": "flip-left-right-", "op": "transpose", "method": "flip_left_right"},
+    {"name": "flip-top-bottom-", "op": "transpose", "method": "flip_top_bottom"},
+    {"name": "rotate-90-", "op": "transpose", "method": "rotate_90"},
+    {"name": "rotate-180-", "op": "transpose", "method": "rotate_180"},
+    {"name": "rotate-270-", "op": "transpose", "method": "rotate_270"},
+    {"name": "blur-", "op": "filter", "filter": "blur"},
+    {"name": "contour-", "op": "filter", "filter": "contour"},
+    {"name": "sharpen-", "op": "filter", "filter": "sharpen"},
+    {"name": "gray-scale-", "op": "convert", "mode": "L"},
+    {"name": "resized-", "op": "resize", "size": [128, 128], "keep_aspect": True},
+]
+
+_STEP_KEYS = ("op", "method", "filter", "mode", "size", "resample", "keep_aspect", "angle", "expand", "params")
+
+
+def _constant(module, name, kind):
+    try:
+        return getattr(module, name.upper())
+    except AttributeError:
+        raise ValueError("unknown %s %s" % (kind, name))
+
+
+def _transpose(step):
+    method = _constant(Image, step["method"], "transpose method")
+    return lambda image: image.transpose(method)
+
+
+def _filter(step):
+    params = step.get("params")
+    if params:
+        # parametric filters by class name, e.g. {"filter": "gaussian_blur", "params": {"radius": 2}}
+        name = "".join(part.capitalize() for part in step["filter"].split("_"))
+        try:
+            image_filter = getattr(ImageFilter, name)(**params)
+        except AttributeError:
+            raise ValueError("unknown filter %s" % step["filter"])
+    else:
+        image_filter = _constant(ImageFilter, step["filter"], "filter")
+    return lambda image: image.filter(image_filter)
+
+
+def _convert(step):
+    mode = step["mode"]
+    return lambda image: image.convert(mode)
+
+
+def _resize(step):
+    size = tuple(step["size"])
+    kwargs = {}
+    if step.get("resample"):
+        kwargs["resample"] = _constant(Image, step["resample"], "resampling filter")
+    if step.get("keep_aspect"):
+        def thumbnail(image):
+            # thumbnail() resizes in place, so it gets a copy rather than the shared image
+            img = image.copy()
+            img.thumbnail(size, **kwargs)
+            return img
+        return thumbnail
+    return lambda image: image.resize(size, **kwargs)
+
+
+def _rotate(step):
+    angle = step["angle"]
+    expand = bool(step.get("expand"))
+    return lambda image: image.rotate(angle, expand=expand)
+
+
+STEPS = {
+    "transpose": _transpose,
+    "filter": _filter,
+    "convert": _convert,
+    "resize": _resize,
+    "rotate": _rotate,
+}
+
+
+def _step(step):
+    try:
+        build = STEPS[step["op"]]
+    except KeyError:
+        raise ValueError("unknown op %s, expected one of %s" % (step.get("op"), ", ".join(STEPS)))
+    return build(step)
+
+
+def _output_format(file_name):
+    # what img.save(path) would pick from the extension
+    ext = os.path.splitext(file_name)[1].lower()
+    Image.init()
+    try:
+        return Image.registered_extensions()[ext]
+    except KeyError:
+        raise ValueError("unknown image extension %s" % ext)
+
+
+# formats whose lower-cased name is not their usual extension
+EXTENSIONS = {
+    "JPEG": ".jpg",
+    "JPEG2000": ".jp2",
+    "TIFF": ".tif",
+}
+
+
+def _extension(fmt):
+    Image.init()
+    registered = Image.registered_extensions()
+    ext = EXTENSIONS.get(fmt, "." + fmt.lower())
+    if registered.get(ext) == fmt:
+        return ext
+    for ext, name in sorted(registered.items()):
+        if name == fmt:
+            return ext
+    raise ValueError("unknown image format %s" % fmt)
+
+
+class Operation(object):
+    """One output: a chain of steps, each returning a new image, and its encoding."""
+
+    def __init__(self, spec, file_name, index=0):
+        steps = spec.get("steps")
+        if steps is None:
+            steps = [dict((k, v) for k, v in spec.items() if k in _STEP_KEYS)]
+        self.steps = [_step(step) for step in steps]
+        self.label = spec.get("name") or "%d-%s-" % (index, steps[0]["op"] if steps else "copy")
+        self.format = spec["format"].upper() if spec.get("format") else _output_format(file_name)
+        self.save_kwargs = {"quality": int(spec["quality"])} if spec.get("quality") else {}
+        if spec.get("format"):
+            file_name = os.path.splitext(file_name)[0] + _extension(self.format)
+        # object keys may carry a prefix: photos/cat.jpg -> photos/blur-cat.jpg
+        head, tail = posixpath.split(file_name)
+        self.output_name = posixpath.join(head, self.label + tail)
+
+    def apply(self, image):
+        for step in self.steps:
+            image = step(image)
+        return image
+
+    def encode(self, image):
+        buf = io.BytesIO()
+        self.apply(image).save(buf, format=self.format, **self.save_kwargs)
+        return buf.getvalue()
+
+
+def compile_ops(ops, file_name):
+    """``Operation``s for an event's ``ops`` list (``DEFAULT_OPS`` when empty)."""
+    return [Operation(spec, file_name, i) for i, spec in enumerate(ops or DEFAULT_OPS)]
+
+
+def image_processing(file_name, image_path, tmp=TMP, ops=None):
+    """Serial reference: runs ``ops`` one after another and saves every output under ``tmp``."""
+    path_list = []
+    operations = compile_ops(ops, file_name)
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with Image.open(image_path) as image:
+            for operation in operations:
+                path = os.path.join(tmp, operation.output_name)
+                operation.apply(image).save(path, format=operation.format, **operation.save_kwargs)
+                path_list.append(path)
+    latency = span.seconds
+    return latency, path_list
+
+
+def image_pipeline(data, file_name, workers=None, ops=None):
+    """
+    Decodes ``data`` once and runs ``ops`` (``DEFAULT_OPS`` by default) on a
+    thread pool, encoding each result into memory instead of /tmp.
+    Returns the result and an ordered ``{output name: encoded bytes}``;
+    the bytes are identical to what ``image_processing`` writes.
+    """
+    operations = compile_ops(ops, file_name)
+    recorder = instrument.current()
+    op_times = {}
+
+    def run(operation):
+        label = operation.label.rstrip("-")
+        # spans opened in pool threads are not seen by the caller's recorder unless passed explicitly
+        with instrument.Span(label, recorder, resources=False) as span:
+            body = operation.encode(image)
+        op_times[label] = span.seconds
+        return operation.output_name, body
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with instrument.span("decode"):
+            image = Image.open(io.BytesIO(data))
+            # decode before sharing the image between threads
+            image.load()
+        with ThreadPoolExecutor(max_workers=workers or min(len(operations), os.cpu_count() or 1)) as pool:
+            outputs = OrderedDict(pool.map(run, operations))
+    latency = span.seconds
+
+    result = {
+        'op_times': OrderedDict((op.label.rstrip("-"), op_times[op.label.rstrip("-")]) for op in operations),
+        'output_bytes': sum(len(body) for body in outputs.values()),
+        'latency': latency
+    }
+
+    return result, outputs
+
+
+def image_batch(store, input_bucket, keys, output_bucket, concurrency=4, workers=1, ops=None):
+    """
+    Runs ``image_pipeline`` over ``keys``, at most ``concurrency`` images at a
+    time, each downloaded from and uploaded to ``store`` by the same worker so
+    transfers overlap with processing.  ``workers`` threads process each image.
+    """
+    recorder = instrument.current()
+
+    def run(key):
+        # per-image phases overlap, so they are recorded under image.* names (summed over images) and
+        # image_pipeline runs detached; only the batch as a whole counts as function_execution
+        with instrument.Span("image", recorder, resources=False) as total:
+            with instrument.Span("image.download", recorder, resources=False) as download:
+                data = store.get_object(input_bucket, key)
+            with instrument.Span("image.process", recorder, resources=False):
+                result, outputs = image_pipeline(data, key, workers, ops)
+            with instrument.Span("image.upload", recorder, resources=False) as upload:
+                for name, body in outputs.items():
+                    store.put_object(output_bucket, name, body)
+        return OrderedDict([
+            ('key', key),
+            ('input_bytes', len(data)),
+            ('output_bytes', result['output_bytes']),
+            ('download', download.seconds),
+            ('process', result['latency']),
+            ('upload', upload.seconds),
+            ('latency', total.seconds),
+        ])
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            images = list(pool.map(run, keys))
+    latency = span.seconds
+
+    input_bytes = sum(image['input_bytes'] for image in images)
+    result = {
+        'images': len(images),
+        'images_per_sec': len(images) / latency if latency else None,
+        'input_mb_per_sec': input_bytes / latency / 1e6 if latency else None,
+        'mean_image_latency': sum(image['latency'] for image in images) / len(images) if images else None,
+        'per_image': images,
+        'latency': latency
+    }
+
+    return result
@@ -0,0 +1,20 @@
+import json
+from urllib.request import urlopen
+
+from .. import instrument
+
+
+def fetch(link):
+    with instrument.span(instrument.DOWNLOAD_DATA) as span:
+        f = urlopen(link)
+        data = f.read().decode("utf-8")
+    network = span.seconds
+    return network, data
+
+
+def dumps_loads(data):
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        json_data = json.loads(data)
+        str_json = json.dumps(json_data, indent=4)
+    latency = span.seconds
+    return latency, str_json
@@ -0,0 +1,101 @@
+import numpy as np
+
+from .. import instrument
+
+MODES = ("solve", "lu", "batched")
+# HPL accepts a scaled residual below 16
+RESIDUAL_THRESHOLD = 16.0
+
+
+def _factor_ops(n):
+    return 2.0 * n * n * n / 3.0
+
+
+def _solve_ops(n):
+    return 2.0 * n * n
+
+
+def _system(shape, n):
+    # AxA array of random numbers -0.5 to 0.5; b is the row sums so x is all ones
+    A = np.random.random_sample(shape + (n, n)) - 0.5
+    return A, A.sum(axis=-1)
+
+
+def scaled_residual(A, x, b):
+    """HPL residual ||Ax - b|| / (||A|| ||x|| n eps), in the infinity norm; batched over leading axes."""
+    n = A.shape[-1]
+    r = np.abs(np.matmul(A, x[..., None])[..., 0] - b).max(axis=-1)
+    norm_a = np.abs(A).sum(axis=-1).max(axis=-1)
+    norm_x = np.abs(x).max(axis=-1)
+    return float(np.max(r / (norm_a * norm_x * n * np.finfo(A.dtype).eps)))
+
+
+def _solve(n):
+    A, b = _system((), n)
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        x = np.linalg.solve(A, b)
+    return _factor_ops(n) + _solve_ops(n), span.seconds, scaled_residual(A, x, b), {}
+
+
+def _lu(n, rhs):
+    from scipy.linalg import lu_factor, lu_solve
+
+    A, b = _system((), n)
+    B = np.random.random_sample((rhs, n)) - 0.5
+    B[0] = b
+    X = np.empty_like(B)
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with instrument.span("factorize") as factorize:
+            lu = lu_factor(A, check_finite=False)
+        with instrument.span("solve") as solve:
+            # one right-hand side at a time, as requests against a cached factorization would arrive
+            for i in range(rhs):
+                X[i] = lu_solve(lu, B[i], check_finite=False)
+    residual = max(scaled_residual(A, X[i], B[i]) for i in range(rhs))
+    metrics = {
+        'factorize_mflops': _factor_ops(n) * 1e-6 / factorize.seconds,
+        'solve_mflops': rhs * _solve_ops(n) * 1e-6 / solve.seconds,
+    }
+    return _factor_ops(n) + rhs * _solve_ops(n), span.seconds, residual, metrics
+
+
+def _batched(n, batch):
+    A, b = _system((batch,), n)
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        x = np.linalg.solve(A, b[..., None])[..., 0]
+    return batch * (_factor_ops(n) + _solve_ops(n)), span.seconds, scaled_residual(A, x, b), {}
+
+
+def linpack(n, mode="solve", rhs=100, batch=1000):
+    """
+    ``solve`` solves one n x n system; ``lu`` factorizes once and solves
+    ``rhs`` right-hand sides against the factorization (needs scipy);
+    ``batched`` solves ``batch`` independent n x n systems as one stacked call.
+    """
+    if mode not in MODES:
+        raise ValueError("unknown mode %s, expected one of %s" % (mode, ", ".join(MODES)))
+    if mode == "lu" and rhs < 1:
+        raise ValueError("rhs must be at least 1, got %s" % rhs)
+    if mode == "batched" and batch < 1:
+        raise ValueError("batch must be at least 1, got %s" % batch)
+
+    # LINPACK benchmarks
+    if mode == "solve":
+        ops, latency, residual, metrics = _solve(n)
+    elif mode == "lu":
+        ops, latency, residual, metrics = _lu(n, rhs)
+    else:
+        ops, latency, residual, metrics = _batched(n, batch)
+
+    mflops = (ops * 1e-6 / latency)
+
+    result = {
+        'mode': mode,
+        'mflops': mflops,
+        'residual': residual,
+        'residual_ok': residual < RESIDUAL_THRESHOLD,
+        'latency': latency
+    }
+    result.update(metrics)
+
+    return result
@@ -0,0 +1,33 @@
+import json
+
+subs = "</title><text>"
+computer_language = ["JavaScript", "Java", "PHP", "Python", "C#", "C++",
+                     "Ruby", "CSS", "Objective-C", "Perl",
+                     "Scala", "Haskell", "MATLAB", "Clojure", "Groovy"]
+
+
+def init_output():
+    output = {}
+    for lang in computer_language:
+        output[lang] = 0
+    return output
+
+
+def map_contents(contents, output):
+    if isinstance(contents, bytes):
+        contents = contents.decode('utf-8')
+
+    for line in contents.split('\n')[:-1]:
+        idx = line.find(subs)
+        text = line[idx + len(subs): len(line) - 16]
+        for lang in computer_language:
+            if lang in text:
+                output[lang] += 1
+    return output
+
+
+def reduce_contents(contents, output):
+    data = json.loads(contents)
+    for key in data:
+        output[key] += int(data[key])
+    return output
@@ -0,0 +1,153 @@
+import contextlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .. import instrument
+
+LAYOUTS = ("C", "F", "T")
+DTYPES = {
+    "float32": np.float32,
+    "float64": np.float64,
+    "int": np.int64,
+    "int32": np.int32,
+    "int64": np.int64,
+}
+
+
+@contextlib.contextmanager
+def blas_threads(threads):
+    """Limits the BLAS thread pool to ``threads`` when threadpoolctl is available; yields the limit applied."""
+    if not threads:
+        yield None
+        return
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        # OPENBLAS_NUM_THREADS / MKL_NUM_THREADS only take effect before numpy is imported
+        yield None
+        return
+    with threadpool_limits(limits=threads, user_api="blas"):
+        yield threads
+
+
+def _random(shape, dtype):
+    if np.issubdtype(dtype, np.integer):
+        return np.random.randint(0, 100, size=shape).astype(dtype)
+    return np.random.rand(*shape).astype(dtype, copy=False)
+
+
+def _matrix(n, dtype, layout):
+    A = _random((n, n), dtype)
+    if layout == "F":
+        return np.asfortranarray(A)
+    if layout == "T":
+        # a transposed view of a C matrix; BLAS sees it as a transpose flag
+        return A.T
+    return A
+
+
+def _in_core(n, dtype, layout):
+    A = _matrix(n, dtype, layout)
+    B = _matrix(n, dtype, layout)
+    C = np.empty((n, n), dtype=dtype)
+    return lambda: np.matmul(A, B, out=C)
+
+
+def _memmap(path, n, dtype, order, block_size, fill):
+    M = np.memmap(path, dtype=dtype, mode="w+", shape=(n, n), order=order)
+    if fill:
+        for i in range(0, n, block_size):
+            for j in range(0, n, block_size):
+                tile = M[i:i + block_size, j:j + block_size]
+                tile[...] = _random(tile.shape, dtype)
+    return M
+
+
+def _blocked(n, dtype, layout, block_size, workdir):
+    """
+    Out-of-core C = A @ B over ``np.memmap`` files: only three
+    ``block_size`` x ``block_size`` tiles are resident at a time.  With layout
+    ``T`` the files hold the transposes of A and B, as in ``_matrix``.
+    """
+    order = "F" if layout == "F" else "C"
+    A = _memmap(os.path.join(workdir, "a.dat"), n, dtype, order, block_size, True)
+    B = _memmap(os.path.join(workdir, "b.dat"), n, dtype, order, block_size, True)
+    C = _memmap(os.path.join(workdir, "c.dat"), n, dtype, order, block_size, False)
+    A.flush()
+    B.flush()
+
+    def tile(M, i, j):
+        if layout == "T":
+            return np.array(M[j:j + block_size, i:i + block_size]).T
+        return np.array(M[i:i + block_size, j:j + block_size])
+
+    def run():
+        for i in range(0, n, block_size):
+            for j in range(0, n, block_size):
+                acc = None
+                for k in range(0, n, block_size):
+                    a = tile(A, i, k)
+                    b = tile(B, k, j)
+                    acc = a @ b if acc is None else acc + a @ b
+                C[i:i + block_size, j:j + block_size] = acc
+        C.flush()
+    return run
+
+
+def matmul(n, dtype="float64", layout="C", threads=None, reps=1, warmup=0,
+           blocked=False, block_size=1024, workdir=None):
+    """
+    ``reps`` timed multiplications after ``warmup`` untimed ones.  With
+    ``blocked`` the matrices live in memory-mapped files under ``workdir``
+    (default: a temporary directory) and are multiplied tile by tile.
+    ``peak_rss_growth`` is the RSS high-water mark above the start of the
+    call, so it stays comparable between modes in a warm process.
+    """
+    if dtype not in DTYPES:
+        raise ValueError("unknown dtype %s, expected one of %s" % (dtype, ", ".join(DTYPES)))
+    if layout not in LAYOUTS:
+        raise ValueError("unknown layout %s, expected one of %s" % (layout, ", ".join(LAYOUTS)))
+    reps = max(int(reps), 1)
+
+    tmpdir = None
+    if blocked:
+        tmpdir = tempfile.mkdtemp(prefix="matmul-", dir=workdir)
+    try:
+        with instrument.RSSHighWater() as high_water:
+            if blocked:
+                run = _blocked(n, DTYPES[dtype], layout, block_size, tmpdir)
+            else:
+                run = _in_core(n, DTYPES[dtype], layout)
+
+            with blas_threads(threads) as applied:
+                for _ in range(warmup):
+                    run()
+                latencies = []
+                for _ in range(reps):
+                    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+                        run()
+                    latencies.append(span.seconds)
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    latency = sum(latencies)
+    best = min(latencies)
+    flops = 2.0 * n * n * n
+
+    result = {
+        'dtype': dtype,
+        'layout': layout,
+        'blocked': bool(blocked),
+        'blas_threads': applied,
+        'reps': reps,
+        'gflops': flops * reps / latency * 1e-9 if latency else None,
+        'best_gflops': flops / best * 1e-9 if best else None,
+        'peak_rss_growth': high_water.growth,
+        'latency': latency
+    }
+
+    return result
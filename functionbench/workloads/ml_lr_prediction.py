@@ -0,0 +1,41 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+import joblib
+
+from .. import instrument
+from .text import cleanup
+
+
+def load_model(model_path):
+    """The model saved by ``model_training.train``; usable as a ``functionbench.models`` loader."""
+    return joblib.load(model_path)
+
+
+def needs_dataset(model):
+    """
+    Models trained before the vectorizer was saved with them are bare
+    classifiers: predicting with those refits TF-IDF on the training set.
+    """
+    return not isinstance(model, Pipeline)
+
+
+def predict(x, model, dataset=None):
+    """``model`` is a path or a model from ``load_model``; ``dataset`` is only read when ``needs_dataset(model)``."""
+    if isinstance(model, str):
+        model = load_model(model)
+    if needs_dataset(model) and dataset is None:
+        raise ValueError("model has no fitted vectorizer, the training dataset is required")
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        X = [cleanup(x)]
+
+        if needs_dataset(model):
+            dataset['train'] = dataset['Text'].apply(cleanup)
+
+            tfidf_vect = TfidfVectorizer(min_df=100).fit(dataset['train'])
+
+            X = tfidf_vect.transform(X)
+
+        y = list(model.predict(X))
+    latency = span.seconds
+    return latency, y
@@ -0,0 +1,122 @@
+"""
+Dataset-size sweep for ml_lr_prediction.
+
+    python -m functionbench.workloads.ml_lr_sweep --sizes 5000,20000,80000 -n 10 --store results/
+
+For every size, trains a bare classifier (as ``model_training`` saved it
+before the vectorizer was kept with the model, so prediction refits TF-IDF
+on the dataset) and a ``Pipeline`` (``model_training.train``), then invokes
+the AWS handler on each with the warm harness against the in-memory store.
+Reviews come from ``--dataset`` (a CSV with ``Text`` and ``Score`` columns,
+resampled to each size) or are generated.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import string
+import tempfile
+
+import joblib
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from .model_training import train
+from .text import cleanup
+
+HANDLER = os.path.join("aws", "cpu-memory", "model_serving", "ml_lr_prediction", "lambda_function.py")
+KINDS = ("legacy", "pipeline")
+
+
+def synthetic_reviews(rows, vocabulary=3000, seed=0):
+    """``rows`` reviews scored 1 or 5, each with a few words that give its score away."""
+    rng = random.Random(seed)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+             for _ in range(vocabulary)]
+    good, bad = words[:50], words[50:100]
+    texts, scores = [], []
+    for _ in range(rows):
+        score = rng.choice((1, 5))
+        tell = good if score == 5 else bad
+        texts.append(" ".join([rng.choice(words) for _ in range(20)] + [rng.choice(tell) for _ in range(5)]))
+        scores.append(score)
+    return pd.DataFrame({"Text": texts, "Score": scores})
+
+
+def train_legacy(df, model_file_path):
+    """The bare ``LogisticRegression`` that ``model_training`` used to save."""
+    text = df['Text'].apply(cleanup)
+    tfidf_vector = TfidfVectorizer(min_df=100).fit(text)
+    joblib.dump(LogisticRegression().fit(tfidf_vector.transform(text), df['Score']), model_file_path)
+
+
+def sweep(sizes, invocations=10, dataset=None, store=None, seed=0):
+    """One summary per size and model kind; with ``store`` every invocation is also recorded."""
+    from .. import harness, results, storage
+
+    os.environ[storage.STORAGE_ENV] = "memory"
+    workdir = tempfile.mkdtemp(prefix="ml-lr-sweep-")
+    # a fresh model cache, so every first call includes the download
+    os.environ["FUNCTIONBENCH_MODEL_CACHE"] = os.path.join(workdir, "models")
+    handler = os.path.join(harness.REPO_ROOT, HANDLER)
+    source = pd.read_csv(dataset) if dataset else None
+    summaries = []
+    try:
+        for rows in sizes:
+            if source is None:
+                df = synthetic_reviews(rows, seed=seed)
+            else:
+                df = source.sample(rows, replace=len(source) < rows, random_state=seed).reset_index(drop=True)
+            dataset_path = os.path.join(workdir, "reviews-%d.csv" % rows)
+            df[['Text', 'Score']].to_csv(dataset_path, index=False)
+            x = df['Text'][0]
+
+            for kind in KINDS:
+                model_path = os.path.join(workdir, "lr-%s-%d.pk" % (kind, rows))
+                if kind == "legacy":
+                    train_legacy(df, model_path)
+                else:
+                    train(df.copy(), model_path)
+                # distinct keys per run, so warm runs in this process never share a cached model
+                event = {"x": x, "dataset_bucket": "datasets", "dataset_object_key": os.path.basename(dataset_path),
+                         "model_bucket": "models", "model_object_key": os.path.basename(model_path)}
+                puts = ["datasets/%s=%s" % (event["dataset_object_key"], dataset_path),
+                        "models/%s=%s" % (event["model_object_key"], model_path)]
+                samples = []
+                report = harness.run_warm(handler, event, invocations, puts=puts,
+                                          on_sample=samples.append if store else None)
+                if store:
+                    harness.record(results.ResultStore(store), handler, report["platform"], "warm", event, 128,
+                                   samples)
+                metrics = report["result"]["metrics"]
+                summaries.append({
+                    "rows": rows,
+                    "model": kind,
+                    "model_bytes": os.path.getsize(model_path),
+                    "refit": metrics["refit"],
+                    "first_call": report["first_call"],
+                    "steady_p50": report["steady_state"].get("p50"),
+                    "y": metrics["y"],
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="5000,20000,80000", help="comma-separated dataset row counts")
+    parser.add_argument("-n", "--invocations", type=int, default=10)
+    parser.add_argument("--dataset", help="reviews CSV to resample instead of generated reviews")
+    parser.add_argument("--store", help="also append every invocation to this result store directory")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(json.dumps(sweep(sizes, args.invocations, args.dataset, args.store, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import cv2
+
+from .. import instrument
+
+TMP = "/tmp/"
+FILE_NAME_INDEX = 0
+# a detection counts as agreeing with a baseline box when they overlap this much
+IOU_THRESHOLD = 0.5
+
+
+def load_cascade(model_path):
+    """A ``CascadeClassifier`` for ``model_path``; usable as a ``functionbench.models`` loader."""
+    face_cascade = cv2.CascadeClassifier()
+    try:
+        loaded = face_cascade.load(model_path)
+    except cv2.error:
+        loaded = False
+    if not loaded or face_cascade.empty():
+        raise ValueError("cannot load cascade model %s" % model_path)
+    return face_cascade
+
+
+def _detector(model, scale=1.0, min_size=None, max_size=None):
+    """
+    Returns ``detect(gray_frame)`` giving face boxes in full-frame pixels.
+    With ``scale`` < 1 the cascade runs on a downscaled copy and the boxes are
+    mapped back; ``min_size``/``max_size`` are face widths in full-frame pixels.
+    """
+    face_cascade = load_cascade(model) if isinstance(model, str) else model
+    kwargs = {}
+    if min_size:
+        kwargs['minSize'] = (max(1, int(float(min_size) * scale)),) * 2
+    if max_size:
+        kwargs['maxSize'] = (max(1, int(float(max_size) * scale)),) * 2
+
+    def detect(gray_frame):
+        if scale != 1.0:
+            small = cv2.resize(gray_frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            faces = face_cascade.detectMultiScale(small, 1.3, 5, **kwargs)
+            return [tuple(int(round(v / scale)) for v in face) for face in faces]
+        return [tuple(int(v) for v in face) for face in face_cascade.detectMultiScale(gray_frame, 1.3, 5, **kwargs)]
+    return detect
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    w = min(ax + aw, bx + bw) - max(ax, bx)
+    h = min(ay + ah, by + bh) - max(ay, by)
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = float(w * h)
+    return inter / (aw * ah + bw * bh - inter)
+
+
+def agreement(baseline, boxes, threshold=IOU_THRESHOLD):
+    """
+    F1 of per-frame ``boxes`` against ``baseline`` (lists of boxes per frame),
+    matching each baseline box greedily to the best unmatched box with IoU >= ``threshold``.
+    """
+    matched = expected = found = 0
+    for want, got in zip(baseline, boxes):
+        expected += len(want)
+        found += len(got)
+        free = list(got)
+        for box in want:
+            best = max(free, key=lambda other: _iou(box, other), default=None)
+            if best is not None and _iou(box, best) >= threshold:
+                free.remove(best)
+                matched += 1
+    if not expected and not found:
+        return 1.0
+    return 2.0 * matched / (expected + found)
+
+
+def _baseline(video_path, model):
+    """Full-rate, full-resolution detections per frame."""
+    detect = _detector(model)
+    video = cv2.VideoCapture(video_path)
+    frames = []
+    gray_frame = None
+    while video.isOpened():
+        ret, frame = video.read()
+        if not ret:
+            break
+        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_frame)
+        frames.append(detect(gray_frame))
+    video.release()
+    return frames
+
+
+def video_processing(object_key, video_path, model, tmp=TMP, every=1, scale=1.0,
+                     min_size=None, max_size=None, compare=False):
+    """
+    Detects faces on every ``every``-th frame, reusing the last boxes in
+    between, on frames downscaled by ``scale``.  With ``compare`` and any
+    option away from its default, a full-rate baseline pass runs outside
+    the timed span and ``agreement`` reports how closely the boxes match it.
+    ``model`` is a cascade file path or a classifier from ``load_cascade``.
+    """
+    every = max(int(every or 1), 1)
+    scale = float(scale or 1.0)
+    if not 0 < scale <= 1:
+        raise ValueError("scale must be in (0, 1], got %s" % scale)
+
+    file_name = object_key.split(".")[FILE_NAME_INDEX]
+    result_file_path = os.path.join(tmp, file_name + '-detection.avi')
+
+    video = cv2.VideoCapture(video_path)
+
+    width = int(video.get(3))
+    height = int(video.get(4))
+
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    out = cv2.VideoWriter(result_file_path, fourcc, 20.0, (width, height))
+
+    detect = _detector(model, scale, min_size, max_size)
+    boxes = []
+    faces = []
+    gray_frame = None
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        while video.isOpened():
+            ret, frame = video.read()
+
+            if ret:
+                if len(boxes) % every == 0:
+                    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_frame)
+                    faces = detect(gray_frame)
+
+                for (x, y, w, h) in faces:
+                    cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+                out.write(frame)
+                boxes.append(faces)
+            else:
+                break
+    latency = span.seconds
+
+    video.release()
+    out.release()
+
+    result = {
+        'every': every,
+        'scale': scale,
+        'frames': len(boxes),
+        'fps': len(boxes) / latency if latency else None,
+        'detections': sum(len(faces) for faces in boxes),
+        'latency': latency
+    }
+    if every == 1 and scale == 1.0 and not min_size and not max_size:
+        result['agreement'] = 1.0
+    elif compare:
+        with instrument.span("baseline"):
+            reference = _baseline(video_path, model)
+        result['agreement'] = agreement(reference, boxes)
+
+    return result, result_file_path
@@ -0,0 +1,28 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+import joblib
+
+from .. import instrument
+from .text import cleanup
+
+
+def train(df, model_file_path):
+    """
+    Fits TF-IDF features and a logistic regression on ``df`` and saves both
+    as one ``Pipeline``, so prediction never has to refit the vectorizer.
+    """
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        df['train'] = df['Text'].apply(cleanup)
+
+        model = Pipeline([
+            ('tfidf', TfidfVectorizer(min_df=100)),
+            ('lr', LogisticRegression()),
+        ])
+        model.fit(df['train'], df['Score'])
+    latency = span.seconds
+
+    # stop_words_ lists every term min_df pruned; it is only there for introspection and dominates the pickle
+    model.named_steps['tfidf'].stop_words_ = None
+    joblib.dump(model, model_file_path)
+    return latency
@@ -0,0 +1,64 @@
+import os
+
+import pyaes
+
+from .. import instrument
+
+# 128-bit key (16 bytes)
+KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
+# pyaes.Counter() starts at 1; the C backend starts from the same block so both produce the same ciphertext
+INITIAL_COUNTER = (1).to_bytes(16, "big")
+BACKENDS = ("pyaes", "cryptography")
+
+
+def generate(length):
+    return os.urandom(length)
+
+
+def _pyaes():
+    def encrypt(message):
+        return pyaes.AESModeOfOperationCTR(KEY).encrypt(message)
+
+    def decrypt(ciphertext):
+        return pyaes.AESModeOfOperationCTR(KEY).decrypt(ciphertext)
+    return encrypt, decrypt
+
+
+def _cryptography():
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    def crypt(data):
+        ctx = Cipher(algorithms.AES(KEY), modes.CTR(INITIAL_COUNTER), backend=default_backend()).encryptor()
+        return ctx.update(data) + ctx.finalize()
+    # CTR decryption is the same keystream XOR
+    return crypt, crypt
+
+
+def encrypt_decrypt(message, num_of_iterations, backend="pyaes"):
+    """Encrypts and decrypts ``message`` with AES-CTR ``num_of_iterations`` times using ``backend``."""
+    if backend == "pyaes":
+        encrypt, decrypt = _pyaes()
+    elif backend == "cryptography":
+        encrypt, decrypt = _cryptography()
+    else:
+        raise ValueError("unknown backend %s, expected one of %s" % (backend, ", ".join(BACKENDS)))
+    if isinstance(message, str):
+        message = message.encode()
+
+    plaintext = message
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        for loops in range(num_of_iterations):
+            ciphertext = encrypt(message)
+            plaintext = decrypt(ciphertext)
+    latency = span.seconds
+
+    result = {
+        'backend': backend,
+        # bytes encrypted plus bytes decrypted
+        'mb_per_sec': 2 * len(message) * num_of_iterations / latency / 1e6 if latency else None,
+        'verified': plaintext == message,
+        'latency': latency
+    }
+
+    return result
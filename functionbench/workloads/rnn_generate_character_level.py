@@ -0,0 +1,33 @@
+"""
+Language
+ - Italian, German, Portuguese, Chinese, Greek, Polish, French
+ - English, Spanish, Arabic, Crech, Russian, Irish, Dutch
+ - Scottish, Vietnamese, Korean, Japanese
+"""
+import pickle
+import torch
+
+from .. import instrument
+from . import rnn
+
+
+def load_model(parameter_path, model_path):
+    with open(parameter_path, 'rb') as pkl:
+        params = pickle.load(pkl)
+
+    all_categories = params['all_categories']
+    n_categories = params['n_categories']
+    all_letters = params['all_letters']
+    n_letters = params['n_letters']
+
+    rnn_model = rnn.RNN(n_letters, 128, n_letters, all_categories, n_categories, all_letters, n_letters)
+    rnn_model.load_state_dict(torch.load(model_path))
+    rnn_model.eval()
+    return rnn_model
+
+
+def generate(rnn_model, language, start_letters):
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        output_names = list(rnn_model.samples(language, start_letters))
+    latency = span.seconds
+    return latency, output_names
@@ -3,6 +3,8 @@ Reference : https://github.com/rcmalli/keras-squeezenet
 SqueezeNet v1.1 Implementation using Keras Functional Framework 2.0
 
 """
+import os
+
 from keras_applications.imagenet_utils import _obtain_input_shape
 from tensorflow.keras import backend as K
 from tensorflow.keras.layers import Input, Convolution2D, MaxPooling2D, Activation, concatenate, Dropout
@@ -16,7 +18,7 @@ sq1x1 = "squeeze1x1"
 exp1x1 = "expand1x1"
 exp3x3 = "expand3x3"
 relu = "relu_"
-tmp = "./"
+
 WEIGHTS_PATH = "https://github.com/rcmalli/keras-squeezenet/releases/download/v1.0/squeezenet_weights_tf_dim_ordering_tf_kernels.h5"
 WEIGHTS_PATH_NO_TOP = "https://github.com/rcmalli/keras-squeezenet/releases/download/v1.0/squeezenet_weights_tf_dim_ordering_tf_kernels_notop.h5"
 
@@ -49,12 +51,15 @@ def SqueezeNet(include_top=True, weights='imagenet',
                pooling=None,
                classes=1000):
     """Instantiates the SqueezeNet architecture.
+
+    ``weights`` is ``None``, ``'imagenet'`` or the path to a weights file.
     """
 
-    if weights not in {'imagenet', None}:
+    if not (weights in {'imagenet', None} or os.path.exists(weights)):
         raise ValueError('The `weights` argument should be either '
-                         '`None` (random initialization) or `imagenet` '
-                         '(pre-training on ImageNet).')
+                         '`None` (random initialization), `imagenet` '
+                         '(pre-training on ImageNet), '
+                         'or the path to the weights file to be loaded.')
 
     if weights == 'imagenet' and classes != 1000:
         raise ValueError('If using `weights` as imagenet with `include_top`'
@@ -123,11 +128,11 @@ def SqueezeNet(include_top=True, weights='imagenet',
     # load weights
     if weights == 'imagenet':
         if include_top:
-            weights_path = tmp + 'squeezenet_weights_tf_dim_ordering_tf_kernels.h5'
+            weights_path = '/tmp/squeezenet_weights_tf_dim_ordering_tf_kernels.h5'
         else:
             weights_path = get_file('squeezenet_weights_tf_dim_ordering_tf_kernels_notop.h5',
                                     WEIGHTS_PATH_NO_TOP,
-                                    cache_dir=tmp)
+                                    cache_dir='/tmp/')
 
         model.load_weights(weights_path)
         if K.backend() == 'theano':
@@ -135,4 +140,6 @@ def SqueezeNet(include_top=True, weights='imagenet',
 
         if K.image_data_format() == 'channels_first':
             pass
+    elif weights is not None:
+        model.load_weights(weights)
     return model
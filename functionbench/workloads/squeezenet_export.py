@@ -0,0 +1,62 @@
+"""
+Offline export of SqueezeNet to a self-contained inference artifact.
+
+    python -m functionbench.workloads.squeezenet_export \\
+        squeezenet_weights_tf_dim_ordering_tf_kernels.h5 squeezenet.tflite --labels imagenet_class_index.json
+
+The format follows the output extension: ``.tflite`` (TensorFlow Lite) or
+``.onnx`` (needs tf2onnx).  Both are served by
+``cnn_image_classification_lite`` without importing TensorFlow; ``--labels``
+also writes the ImageNet class index it uses to name predictions.
+"""
+import argparse
+import os
+import shutil
+
+FORMATS = (".tflite", ".onnx")
+CLASS_INDEX_PATH = "https://storage.googleapis.com/download.tensorflow.org/data/imagenet_class_index.json"
+
+
+def export(weights_path, output_path):
+    """Builds SqueezeNet with ``weights_path`` and writes it to ``output_path`` in the format of its extension."""
+    fmt = os.path.splitext(output_path)[1]
+    if fmt not in FORMATS:
+        raise ValueError("unknown format %s, expected one of %s" % (fmt, ", ".join(FORMATS)))
+
+    import tensorflow as tf
+    from .squeezenet import SqueezeNet
+
+    model = SqueezeNet(weights=weights_path)
+    if fmt == ".tflite":
+        with open(output_path, "wb") as f:
+            f.write(tf.lite.TFLiteConverter.from_keras_model(model).convert())
+    else:
+        import tf2onnx
+        spec = tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="input")
+        tf2onnx.convert.from_keras(model, input_signature=[spec], output_path=output_path)
+    return output_path
+
+
+def export_labels(output_path):
+    """Copies the ImageNet class index used by ``decode_predictions`` to ``output_path``."""
+    from tensorflow.keras.utils import get_file
+
+    path = get_file("imagenet_class_index.json", CLASS_INDEX_PATH, cache_subdir="models")
+    shutil.copyfile(path, output_path)
+    return output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("weights", help="SqueezeNet .h5 weights file")
+    parser.add_argument("output", help="artifact to write: *.tflite or *.onnx")
+    parser.add_argument("--labels", help="also write the ImageNet class index JSON here")
+    args = parser.parse_args(argv)
+
+    print(export(args.weights, args.output))
+    if args.labels:
+        print(export_labels(args.labels))
+
+
+if __name__ == "__main__":
+    main()
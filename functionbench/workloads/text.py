@@ -0,0 +1,9 @@
+import re
+
+cleanup_re = re.compile('[^a-z]+')
+
+
+def cleanup(sentence):
+    sentence = sentence.lower()
+    sentence = cleanup_re.sub(' ', sentence).strip()
+    return sentence
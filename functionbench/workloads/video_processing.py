@@ -0,0 +1,448 @@
+import multiprocessing
+import os
+import threading
+import time
+from queue import Empty, Full, Queue
+
+import cv2
+
+from .. import instrument
+
+TMP = "/tmp/"
+FILE_NAME_INDEX = 0
+# memory: gray frames go back to 3 channels with cvtColor
+# disk-stress: the original per-frame JPEG write and re-read through tmp
+MODES = ("memory", "disk-stress")
+FPS = 20.0
+# how often blocked pipeline stages check for a stop, and how long a stopped pipeline may take to drain
+POLL_INTERVAL = 0.1
+STOP_TIMEOUT = 10.0
+
+
+def _writer(path, width, height):
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    return cv2.VideoWriter(path, fourcc, FPS, (width, height))
+
+
+def _convert(video, out, mode, tmp, limit=None):
+    frames = 0
+    gray_frame = bgr_frame = None
+    while video.isOpened() and (limit is None or frames < limit):
+        ret, frame = video.read()
+
+        if ret:
+            # conversions write into the same buffers every frame
+            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_frame)
+            if mode == "disk-stress":
+                tmp_file_path = os.path.join(tmp, 'tmp-%d.jpg' % os.getpid())
+                cv2.imwrite(tmp_file_path, gray_frame)
+                bgr_frame = cv2.imread(tmp_file_path)
+            else:
+                bgr_frame = cv2.cvtColor(gray_frame, cv2.COLOR_GRAY2BGR, dst=bgr_frame)
+            out.write(bgr_frame)
+            frames += 1
+        else:
+            break
+    return frames
+
+
+def _process(video_path, result_file_path, mode, tmp):
+    video = cv2.VideoCapture(video_path)
+
+    width = int(video.get(3))
+    height = int(video.get(4))
+
+    out = _writer(result_file_path, width, height)
+    frames = _convert(video, out, mode, tmp)
+
+    video.release()
+    out.release()
+    return frames
+
+
+def video_processing(object_key, video_path, tmp=TMP, mode="memory"):
+    if mode not in MODES:
+        raise ValueError("unknown mode %s, expected one of %s" % (mode, ", ".join(MODES)))
+    file_name = object_key.split(".")[FILE_NAME_INDEX]
+    result_file_path = os.path.join(tmp, file_name + '-output.avi')
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        frames = _process(video_path, result_file_path, mode, tmp)
+    latency = span.seconds
+
+    result = {
+        'mode': mode,
+        'frames': frames,
+        'fps': frames / latency if latency else None,
+        'latency': latency
+    }
+
+    return result, result_file_path
+
+
+def keyframes(video_path):
+    """
+    Indices of the key frames, read from the packet flags without decoding, or
+    ``None`` where the OpenCV build cannot return raw packets.
+    """
+    if not hasattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME"):
+        return None
+    video = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+    keys = []
+    index = 0
+    try:
+        while True:
+            ret, _ = video.read()
+            if not ret:
+                break
+            if video.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keys.append(index)
+            index += 1
+    finally:
+        video.release()
+    return keys or None
+
+
+def split_segments(keys, total, workers):
+    """
+    ``(start, stop)`` frame ranges, one per worker where possible, each
+    starting on the key frame nearest an even split (``keys=None``: even split).
+    ``total`` is only an estimate for many containers, so the last range is
+    ``(start, None)``: it runs to the end of the stream.
+    """
+    starts = [0]
+    for i in range(1, workers):
+        target = i * total // workers
+        start = target if keys is None else min(keys, key=lambda k: abs(k - target))
+        if starts[-1] < start < total:
+            starts.append(start)
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def _segment(conn, video_path, start, stop, path, tmp):
+    try:
+        video = cv2.VideoCapture(video_path)
+        # seeking decodes forward from the preceding key frame, so starts on key frames are cheap
+        video.set(cv2.CAP_PROP_POS_FRAMES, start)
+        out = _writer(path, int(video.get(3)), int(video.get(4)))
+        frames = _convert(video, out, "memory", tmp, None if stop is None else stop - start)
+        video.release()
+        out.release()
+        conn.send((frames, None))
+    except Exception as e:
+        conn.send((0, repr(e)))
+    finally:
+        conn.close()
+
+
+def _raw_writer(path, width, height):
+    raw = getattr(cv2, "VIDEOWRITER_PROP_RAW_VIDEO", None)
+    if raw is None:
+        return None
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    out = cv2.VideoWriter(path, cv2.CAP_FFMPEG, fourcc, FPS, (width, height), [raw, 1])
+    return out if out.isOpened() else None
+
+
+def concat_segments(paths, result_file_path, width, height):
+    """
+    Joins the segment files.  Packets are copied without re-encoding where the
+    OpenCV build supports raw writing; otherwise the segments are re-encoded.
+    Returns whether packets were copied.
+    """
+    out = _raw_writer(result_file_path, width, height)
+    copied = out is not None
+    if not copied:
+        out = _writer(result_file_path, width, height)
+    for path in paths:
+        if copied:
+            video = cv2.VideoCapture(path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        else:
+            video = cv2.VideoCapture(path)
+        while True:
+            ret, data = video.read()
+            if not ret:
+                break
+            if copied:
+                # every segment starts with a key frame of its own encoder
+                out.set(cv2.VIDEOWRITER_PROP_KEY_FLAG, video.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))
+            out.write(data)
+        video.release()
+    out.release()
+    return copied
+
+
+def video_processing_parallel(object_key, video_path, tmp=TMP, workers=None, compare=False):
+    """
+    Splits the video into key-frame-aligned segments, converts them in
+    ``workers`` processes (default: one per CPU) and concatenates the results.
+    With ``compare`` the serial path runs first so the speedup can be reported.
+    Processes talk over pipes rather than a ``multiprocessing.Pool``, which
+    needs /dev/shm and is unavailable on AWS Lambda.
+    """
+    workers = workers or os.cpu_count() or 1
+    file_name = object_key.split(".")[FILE_NAME_INDEX]
+    result_file_path = os.path.join(tmp, file_name + '-output.avi')
+
+    serial = None
+    if compare:
+        serial_path = os.path.join(tmp, file_name + '-serial.avi')
+        with instrument.span("serial") as serial_span:
+            _process(video_path, serial_path, "memory", tmp)
+        serial = serial_span.seconds
+        os.remove(serial_path)
+
+    video = cv2.VideoCapture(video_path)
+    width, height = int(video.get(3)), int(video.get(4))
+    total = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    video.release()
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        with instrument.span("split"):
+            segments = split_segments(keyframes(video_path), total, workers)
+        paths = [os.path.join(tmp, "%s-segment-%d.avi" % (file_name, i)) for i in range(len(segments))]
+
+        with instrument.span("segments"):
+            running = []
+            for (start, stop), path in zip(segments, paths):
+                recv, send = multiprocessing.Pipe(False)
+                process = multiprocessing.Process(target=_segment,
+                                                  args=(send, video_path, start, stop, path, tmp))
+                process.start()
+                # only the child may hold the write end, so a worker that dies without sending gives EOFError
+                send.close()
+                running.append((process, recv))
+            frames = 0
+            errors = []
+            for i, (process, recv) in enumerate(running):
+                try:
+                    count, error = recv.recv()
+                except EOFError:
+                    process.join()
+                    count, error = 0, "segment %d exited with code %s without a result" % (i, process.exitcode)
+                process.join()
+                recv.close()
+                frames += count
+                if error:
+                    errors.append(error)
+        if errors:
+            raise RuntimeError("segment workers failed: %s" % "; ".join(errors))
+
+        with instrument.span("concat"):
+            copied = concat_segments(paths, result_file_path, width, height)
+    latency = span.seconds
+
+    for path in paths:
+        os.remove(path)
+
+    result = {
+        'mode': "parallel",
+        'workers': len(segments),
+        'frames': frames,
+        'fps': frames / latency if latency else None,
+        'packet_copy': copied,
+        'serial_latency': serial,
+        'speedup': serial / latency if serial and latency else None,
+        'latency': latency
+    }
+
+    return result, result_file_path
+
+
+class _Stage(object):
+    """Busy time and queue depth samples of one pipeline stage."""
+
+    def __init__(self):
+        self.busy_ns = 0
+        self.depths = []
+        self._lock = threading.Lock()
+
+    def add(self, busy_ns, depth=None):
+        with self._lock:
+            self.busy_ns += busy_ns
+            if depth is not None:
+                self.depths.append(depth)
+
+
+class _Slot(object):
+    """Preallocated buffers for one frame in flight."""
+
+    def __init__(self, height, width):
+        import numpy as np
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.gray = np.empty((height, width), dtype=np.uint8)
+        self.bgr = np.empty((height, width, 3), dtype=np.uint8)
+
+
+class _Stopped(Exception):
+    """Raised in a stage blocked on a queue once another stage has failed."""
+
+
+class _Pipeline(object):
+    """Stop event shared by the stages, and the errors that set it in order of occurrence."""
+
+    def __init__(self):
+        self.stop = threading.Event()
+        self.errors = []
+
+    def fail(self, error):
+        self.errors.append(error)
+        self.stop.set()
+
+    def get(self, queue):
+        while not self.stop.is_set():
+            try:
+                return queue.get(timeout=POLL_INTERVAL)
+            except Empty:
+                pass
+        raise _Stopped()
+
+    def put(self, queue, item):
+        while not self.stop.is_set():
+            try:
+                return queue.put(item, timeout=POLL_INTERVAL)
+            except Full:
+                pass
+        raise _Stopped()
+
+    def run(self, target):
+        def stage():
+            try:
+                target()
+            except _Stopped:
+                pass
+            except Exception as e:
+                self.fail(e)
+        return threading.Thread(target=stage)
+
+    def join(self, threads):
+        """Waits for ``threads``; once stopped, gives them ``STOP_TIMEOUT`` seconds to exit."""
+        deadline = None
+        for t in threads:
+            while t.is_alive():
+                if deadline is None and self.stop.is_set():
+                    deadline = time.time() + STOP_TIMEOUT
+                if deadline is not None and time.time() >= deadline:
+                    raise RuntimeError("pipeline stages did not stop within %ss" % STOP_TIMEOUT)
+                t.join(POLL_INTERVAL)
+
+
+def video_processing_pipelined(object_key, video_path, tmp=TMP, workers=2, queue_size=8):
+    """
+    Decode thread -> ``workers`` transform threads -> ordered encode thread,
+    connected by queues of at most ``queue_size`` frames.  Frames live in a
+    fixed pool of preallocated buffers that are recycled once encoded.
+    OpenCV releases the GIL in read, cvtColor and write, so stages overlap.
+    A failing stage stops the others and its exception is re-raised.
+    """
+    file_name = object_key.split(".")[FILE_NAME_INDEX]
+    result_file_path = os.path.join(tmp, file_name + '-output.avi')
+
+    video = cv2.VideoCapture(video_path)
+    width, height = int(video.get(3)), int(video.get(4))
+    out = _writer(result_file_path, width, height)
+
+    free = Queue()
+    for _ in range(2 * queue_size + workers):
+        free.put(_Slot(height, width))
+    decoded = Queue(maxsize=queue_size)
+    transformed = Queue(maxsize=queue_size)
+    decode, transform, encode = _Stage(), _Stage(), _Stage()
+    pipeline = _Pipeline()
+    frames = [0]
+
+    def decoder():
+        index = 0
+        while video.isOpened():
+            slot = pipeline.get(free)
+            try:
+                start = instrument.perf_counter_ns()
+                ret, frame = video.read(slot.frame)
+                if not ret:
+                    free.put(slot)
+                    break
+                # OpenCV allocates a new array instead when the buffer does not fit
+                slot.frame = frame
+                decode.add(instrument.perf_counter_ns() - start, decoded.qsize())
+                pipeline.put(decoded, (index, slot))
+            except BaseException:
+                free.put(slot)
+                raise
+            index += 1
+        for _ in range(workers):
+            pipeline.put(decoded, None)
+
+    def transformer():
+        while True:
+            item = pipeline.get(decoded)
+            if item is None:
+                break
+            index, slot = item
+            try:
+                start = instrument.perf_counter_ns()
+                slot.gray = cv2.cvtColor(slot.frame, cv2.COLOR_BGR2GRAY, dst=slot.gray)
+                slot.bgr = cv2.cvtColor(slot.gray, cv2.COLOR_GRAY2BGR, dst=slot.bgr)
+                transform.add(instrument.perf_counter_ns() - start)
+                pipeline.put(transformed, (index, slot))
+            except BaseException:
+                free.put(slot)
+                raise
+        pipeline.put(transformed, None)
+
+    def encoder():
+        pending = {}
+        next_index = 0
+        finished = 0
+        try:
+            while finished < workers:
+                depth = transformed.qsize()
+                item = pipeline.get(transformed)
+                if item is None:
+                    finished += 1
+                    continue
+                encode.add(0, depth)
+                pending[item[0]] = item[1]
+                # frames may finish out of order; write them in decode order
+                while next_index in pending:
+                    start = instrument.perf_counter_ns()
+                    out.write(pending[next_index].bgr)
+                    encode.add(instrument.perf_counter_ns() - start)
+                    free.put(pending.pop(next_index))
+                    next_index += 1
+        finally:
+            for slot in pending.values():
+                free.put(slot)
+            frames[0] = next_index
+
+    with instrument.span(instrument.FUNCTION_EXECUTION) as span:
+        threads = [pipeline.run(decoder), pipeline.run(encoder)]
+        threads += [pipeline.run(transformer) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        pipeline.join(threads)
+    latency = span.seconds
+
+    video.release()
+    out.release()
+    if pipeline.errors:
+        raise pipeline.errors[0]
+
+    # a stage's throughput limit is its busy time spread over its threads
+    load = {'decode': decode.busy_ns, 'transform': transform.busy_ns / workers, 'encode': encode.busy_ns}
+    result = {
+        'mode': "pipelined",
+        'workers': workers,
+        'frames': frames[0],
+        'fps': frames[0] / latency if latency else None,
+        'decode_time': decode.busy_ns / 1e9,
+        'transform_time': transform.busy_ns / 1e9,
+        'encode_time': encode.busy_ns / 1e9,
+        'decode_queue_mean': sum(decode.depths) / float(len(decode.depths)) if decode.depths else 0,
+        'decode_queue_max': max(decode.depths) if decode.depths else 0,
+        'encode_queue_mean': sum(encode.depths) / float(len(encode.depths)) if encode.depths else 0,
+        'encode_queue_max': max(encode.depths) if encode.depths else 0,
+        'bottleneck': max(load, key=load.get),
+        'latency': latency
+    }
+
+    return result, result_file_path
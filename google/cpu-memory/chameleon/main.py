@@ -1,19 +1,7 @@
-from time import time
-import six
-from chameleon import PageTemplate
+import json
 
-
-BIGTABLE_ZPT = """\
-<table xmlns="http://www.w3.org/1999/xhtml"
-xmlns:tal="http://xml.zope.org/namespaces/tal">
-<tr tal:repeat="row python: options['table']">
-<td tal:repeat="c python: row.values()">
-<span tal:define="d python: c + 1"
-tal:attributes="class python: 'column-' + %s(d)"
-tal:content="python: d" />
-</td>
-</tr>
-</table>""" % six.text_type.__name__
+from functionbench import events, instrument
+from functionbench.workloads.chameleon import render_table, render_table_stream
 
 
 def function_handler(request):
@@ -21,22 +9,13 @@ def function_handler(request):
     num_of_rows = request_json['num_of_rows']
     num_of_cols = request_json['num_of_cols']
 
-    message = generate(length_of_message)
-
-    # 128-bit key (16 bytes)
-    KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
-
-    start = time()
-    tmpl = PageTemplate(BIGTABLE_ZPT)
-
-    data = {}
-    for i in range(num_of_cols):
-        data[str(i)] = i
-
-    table = [data for x in range(num_of_rows)]
-    options = {'table': table}
-
-    data = tmpl.render(options=options)
-    latency = time() - start
+    with instrument.Recorder("chameleon", "google") as rec:
+        if events.flag(request_json.get('stream')):
+            result = render_table_stream(num_of_rows, num_of_cols, request_json.get('sink', 'discard'),
+                                         int(request_json.get('chunk_rows', 1000)))
+        else:
+            result, data = render_table(num_of_rows, num_of_cols)
 
-    return "latency : " + str(latency)
+    return json.dumps(rec.result(output_bytes=result['output_bytes'], template_cache=result['template_cache'],
+                                 cache_hit=result['cache_hit'],
+                                 rows_per_sec=result['rows_per_sec'], peak_rss_growth=result['peak_rss_growth']))
@@ -1,18 +1,14 @@
-import math
-from time import time
+import json
 
-def float_operation(N):
-    start = time()
-    for i in range(0, N):
-        sin_i = math.sin(i)
-        cos_i = math.cos(i)
-        sqrt_i = math.sqrt(i)
-    latency = time() - start
-    return latency
+from functionbench import instrument
+from functionbench.workloads.float_operation import float_operations
 
 def function_handler(request):
     request_json = request.get_json(silent=True)
     N = request_json['N']
-    latency = float_operation(N)
-    print(latency)
-    return "latency : " + str(latency)
\ No newline at end of file
+    engine = request_json.get('engine', 'python')
+    threads = request_json.get('threads')
+    with instrument.Recorder("float_operation", "google") as rec:
+        result = float_operations(N, engine, threads=threads and int(threads))
+    return json.dumps(rec.result(engine=result['engine'], threads=result['threads'],
+                                 ops_per_sec=result['ops_per_sec']))
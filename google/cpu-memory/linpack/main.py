@@ -1,38 +1,14 @@
-from numpy import matrix, array, linalg, random, amax, asscalar
-from time import time
+import json
 
-def linpack(N):
-    eps=2.22e-16
-
-    ops=(2.0*N)*N*N/3.0+(2.0*N)*N
-
-    # Create AxA array of random numbers -0.5 to 0.5
-    A=random.random_sample((N,N))-0.5
-    B=A.sum(axis=1)
-
-    # Convert to matrices
-    A=matrix(A)
-
-    B=matrix(B.reshape((N,1)))
-    na=amax(abs(A.A))
-
-    start = time()
-    X=linalg.solve(A,B)
-    latency = time() - start
-
-    mflops = (ops*1e-6/latency)
-
-    result = {
-        'mflops': mflops,
-        'latency': latency
-    }
-
-    return result
+from functionbench import instrument
+from functionbench.workloads.linpack import linpack
 
 
 def function_handler(request):
     request_json = request.get_json(silent=True)
     N = request_json['N']
-    result = linpack(N)
-    print(result)
-    return "latency : " + str(result['latency']) + " mflops : " + str(result['mflops'])
\ No newline at end of file
+    with instrument.Recorder("linpack", "google") as rec:
+        result = linpack(N, request_json.get('mode', 'solve'), int(request_json.get('rhs', 100)),
+                         int(request_json.get('batch', 1000)))
+    return json.dumps(rec.result(mflops=result['mflops'], residual=result['residual'],
+                                 residual_ok=result['residual_ok']))
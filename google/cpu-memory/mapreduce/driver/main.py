@@ -1,11 +1,11 @@
-from google.cloud import storage
-import gcsfs
 from functools import partial
 from multiprocessing.dummy import Pool as ThreadPool
 import time
 import json
 import requests
 
+from functionbench import instrument, storage
+
 
 total_map = 0
 total_network = 0
@@ -31,9 +31,9 @@ def map_invoke_lambda(job_bucket, dataset_bucket, all_keys, batch_size, mapper_i
     response = requests.post(mapper_url, json=payload)
     print(response.text)
 
-    output = json.loads(response.text)
-    total_map += float(output['map'])
-    total_network += float(output['network'])
+    latencies = json.loads(response.text)['latencies']
+    total_map += latencies[instrument.FUNCTION_EXECUTION]
+    total_network += latencies[instrument.DOWNLOAD_DATA] + latencies[instrument.UPLOAD_DATA]
 
 
 def reduce_invoke_lambda(job_bucket):
@@ -53,15 +53,10 @@ def function_handler(request):
     dataset_bucket = request_json['dataset_bucket']
     n_mapper = int(request_json['n_mapper'])
     
-    storage_client = storage.Client()
-    d_bucket = storage_client.get_bucket(dataset_bucket)
-    j_bucket = storage_client.get_bucket(job_bucket)
+    store = storage.open_store(default='gcs')
 
     # Fetch all the keys
-    dataset_blobs = d_bucket.list_blobs()
-    all_keys = []
-    for d_blob in dataset_blobs:
-        all_keys.append(d_blob.name)
+    all_keys = store.list_objects(dataset_bucket)
 
     total_size = len(all_keys)
     batch_size = 1
@@ -86,8 +81,7 @@ def function_handler(request):
 
     # Check Mapper Done
     while True:
-        job_blobs = j_bucket.list_blobs()
-        done = sum(1 for _ in job_blobs)
+        done = len(store.list_objects(job_bucket))
 
         time.sleep(10)
         if done == total_size:
@@ -1,14 +1,10 @@
-from google.cloud import storage
-import gcsfs
-from time import time 
 import json
 
+from functionbench import instrument, storage
+from functionbench.workloads.mapreduce import init_output, map_contents
 
-storage_client = storage.Client()
-subs = "</title><text>"
-computer_language = ["JavaScript", "Java", "PHP", "Python", "C#", "C++", 
-    "Ruby", "CSS", "Objective-C", "Perl",        
-    "Scala", "Haskell", "MATLAB", "Clojure", "Groovy"]
+
+store = storage.open_store(default='gcs')
 
 
 def function_handler(request):
@@ -18,48 +14,22 @@ def function_handler(request):
     dataset_keys = request_json['dataset_keys']
     mapper_id = request_json['mapper_id']
     
-    d_bucket = storage_client.get_bucket(dataset_bucket)
-    j_bucket = storage_client.get_bucket(job_bucket)
-    
-    output = {}
-    for lang in computer_language:
-        output[lang] = 0
+    output = init_output()
     
-    network = 0
-    map = 0
     keys = dataset_keys.split('/')
     
-    # Download and process all keys
-    for key in keys:
-        blob = d_bucket.blob(key)
-        job_blob = j_bucket.blob(str(mapper_id))
+    with instrument.Recorder("mapreduce_mapper", "google") as rec:
+        # Download and process all keys
+        for key in keys:
+            with rec.span(instrument.DOWNLOAD_DATA):
+                data = store.get_object(dataset_bucket, key).decode("utf-8")
         
-        start = time()
-        data = blob.download_as_string().decode("utf-8")
-        network += time() - start
+            with rec.span(instrument.FUNCTION_EXECUTION):
+                map_contents(data, output)
         
-        start = time()
-        for line in str(data).split('\n')[:-1]:
-            try:
-                idx = line.find(subs)
-                text = line[idx + len(subs): len(line)-16]
-                for lang in computer_language:
-                    if lang in text:
-                        output[lang] += 1
-                        
-            except Exception:
-                print("Error")
-        map += time() - start
-        
-        start = time()
-        job_blob.upload_from_string(json.dumps(output))
-        network += time() - start
+            with rec.span(instrument.UPLOAD_DATA):
+                store.put_object(job_bucket, str(mapper_id), json.dumps(output))
 
-        print(output)
-    
-    result = {
-        'network': str(network),
-        'map': str(map)
-    }
+            print(output)
     
-    return json.dumps(result)
+    return json.dumps(rec.result())
@@ -1,48 +1,25 @@
-from google.cloud import storage
-import gcsfs
-from time import time
 import json
 
-storage_client = storage.Client()
-computer_language = ["JavaScript", "Java", "PHP", "Python", "C#", "C++",
-                     "Ruby", "CSS", "Objective-C", "Perl",
-                     "Scala", "Haskell", "MATLAB", "Clojure", "Groovy"]
+from functionbench import instrument, storage
+from functionbench.workloads.mapreduce import init_output, reduce_contents
+
+store = storage.open_store(default='gcs')
 
 
 def function_handler(request):
     request_json = request.get_json(silent=True)
     job_bucket = request_json['job_bucket']
 
-    j_bucket = storage_client.get_bucket(job_bucket)
-    job_blobs = j_bucket.list_blobs()
-    all_keys = []
-    for j_blob in job_blobs:
-        all_keys.append(j_blob.name)
-
-    output = {}
-
-    for lang in computer_language:
-        output[lang] = 0
-
-    network = 0
-    reduce = 0
-
-    for key in all_keys:
-        job_blob = j_bucket.blob(key)
+    all_keys = store.list_objects(job_bucket)
 
-        start = time()
-        data = job_blob.download_as_string().decode("utf-8")
-        network += time() - start
+    output = init_output()
 
-        start = time()
-        json_data = json.loads(data)
-        for key in json_data:
-            output[key] += int(json_data[key])
-        reduce += time() - start
+    with instrument.Recorder("mapreduce_reducer", "google") as rec:
+        for key in all_keys:
+            with rec.span(instrument.DOWNLOAD_DATA):
+                data = store.get_object(job_bucket, key).decode("utf-8")
 
-    result = {
-        'network': str(network),
-        'reduce': str(reduce)
-    }
+            with rec.span(instrument.FUNCTION_EXECUTION):
+                reduce_contents(data, output)
 
-    return json.dumps(result)
+    return json.dumps(rec.result(output=output))
@@ -1,19 +1,15 @@
-import numpy as np
-from time import time
+import json
 
-def matmul(N):
-    A = np.random.rand(N, N)
-    B = np.random.rand(N, N)
-
-    start = time()
-    C = np.matmul(A, B)
-    latency = time() - start
-
-    return latency
+from functionbench import events, instrument
+from functionbench.workloads.matmul import matmul
 
 def function_handler(request):
     request_json = request.get_json(silent=True)
     N = request_json['N']
-    latency = matmul(N)
-    print(latency)
-    return "latency : " + str(latency)
+    with instrument.Recorder("matmul", "google") as rec:
+        result = matmul(N, request_json.get('dtype', 'float64'), request_json.get('layout', 'C'),
+                        threads=int(request_json.get('threads', 0)), reps=int(request_json.get('reps', 1)),
+                        warmup=int(request_json.get('warmup', 0)), blocked=events.flag(request_json.get('blocked')),
+                        block_size=int(request_json.get('block_size', 1024)))
+    return json.dumps(rec.result(gflops=result['gflops'], best_gflops=result['best_gflops'],
+                                 peak_rss_growth=result['peak_rss_growth'], blas_threads=result['blas_threads']))
@@ -1,49 +1,18 @@
-from google.cloud import storage
-from time import time
-import cv2
+import json
 
-def video_processing(model_path, blob_name, file_path):
-    output_file_path = '/tmp/output-' + blob_name
-    video = cv2.VideoCapture(file_path)
-    
-    width = int(video.get(3))
-    height = int(video.get(4))
-    
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')
-    out = cv2.VideoWriter(output_file_path, fourcc, 20.0, (width, height))
-    
-    face_cascade = cv2.CascadeClassifier(model_path)
-    
-    start = time()
-    while(video.isOpened()):
-        ret, frame = video.read()
+from functionbench import events, instrument, models, storage
+from functionbench.workloads.ml_video_face_detection import load_cascade, video_processing
 
-        if ret:
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray_frame, 1.3, 5)
-            print("Found {0} faces!".format(len(faces)))
-            for (x, y, w, h) in faces:
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
-            out.write(frame)
-        else:
-            break
-            
-    latency = time() - start
-    
-    video.release()
-    out.release()
-    return latency, output_file_path
-
-def download_blob(blob, download_path):
-    blob.download_to_filename(download_path)
+def download_blob(store, bucket_name, blob_name, download_path):
+    store.download_file(bucket_name, blob_name, download_path)
     print('Blob {} downloaded to {}.'.format(
-        blob.name,
+        blob_name,
         download_path))
 
-def upload_blob(bucket_name, blob, upload_path):
-    blob.upload_from_filename(upload_path)
+def upload_blob(store, bucket_name, blob_name, upload_path):
+    store.upload_file(upload_path, bucket_name, blob_name)
     print('File {} uploaded to {}.'.format(
-        blob.name,
+        blob_name,
         bucket_name))
     
 def function_handler(request):
@@ -53,25 +22,27 @@ def function_handler(request):
     dst_bucket = request_json['dst_bucket']
     model_bucket = request_json['model_bucket']
     model_blob_name = request_json['model_blob_name']
+    model_sha256 = request_json.get('model_sha256')
     
     
-    storage_client = storage.Client()
-    m_bucket = storage_client.get_bucket(model_bucket)
-    m_blob = m_bucket.blob(model_blob_name)
-    
-    model_path = "/tmp/" + model_blob_name
-    download_blob(m_blob, model_path)
+    store = storage.open_store(default='gcs')
     
-    s_bucket = storage_client.get_bucket(src_bucket)
-    s_blob = s_bucket.blob(blob_name)
+    with instrument.Recorder("ml_video_face_detection", "google") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            download_path = "/tmp/" + blob_name
+            download_blob(store, src_bucket, blob_name, download_path)
     
-    download_path = "/tmp/" + blob_name
-    download_blob(s_blob, download_path)
+        with rec.span(instrument.MODEL_LOAD):
+            face_cascade, model_cache = models.load(store, model_bucket, model_blob_name, load_cascade,
+                                                    sha256=model_sha256)
     
-    latency, upload_path = video_processing(model_path, blob_name, download_path)
+        result, upload_path = video_processing(blob_name, download_path, face_cascade,
+                                               every=request_json.get('every', 1), scale=request_json.get('scale', 1.0),
+                                               min_size=request_json.get('min_size'), max_size=request_json.get('max_size'),
+                                               compare=events.flag(request_json.get('compare')))
     
-    d_bucket = storage_client.get_bucket(dst_bucket)
-    d_blob = d_bucket.blob(blob_name)
-    upload_blob(dst_bucket, d_blob, upload_path)
+        with rec.span(instrument.UPLOAD_DATA):
+            upload_blob(store, dst_bucket, blob_name, upload_path)
     
-    return "latency : " + str(latency)
\ No newline at end of file
+    metrics = dict((k, v) for k, v in result.items() if k != 'latency')
+    return json.dumps(rec.result(model_cache=model_cache, cache_hit=model_cache != models.DOWNLOAD, **metrics))
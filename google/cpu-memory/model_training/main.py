@@ -1,32 +1,15 @@
-from google.cloud import storage
-import gcsfs
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.externals import joblib
+import io
+import json
 
 import pandas as pd
-import numpy as np
-
-from time import time
-import re
-
-cleanup_re = re.compile('[^a-z]+')
-def cleanup(sentence):
-    sentence = sentence.lower()
-    sentence = cleanup_re.sub(' ', sentence).strip()
-    return sentence
 
-def download_blob(blob, download_path):
-    blob.download_to_filename(download_path)
-    print('Blob {} downloaded to {}.'.format(
-        blob.name,
-        download_path))
+from functionbench import instrument, storage
+from functionbench.workloads.model_training import train
 
-def upload_blob(bucket_name, blob, upload_path):
-    blob.upload_from_filename(upload_path)
+def upload_blob(store, bucket_name, blob_name, upload_path):
+    store.upload_file(upload_path, bucket_name, blob_name)
     print('File {} uploaded to {}.'.format(
-        blob.name,
+        blob_name,
         bucket_name))
 
 def function_handler(request):
@@ -36,29 +19,16 @@ def function_handler(request):
     model_bucket = request_json['model_bucket']
     model_blob_name = request_json['model_blob_name']
     
-    fs = gcsfs.GCSFileSystem(project='Serverless-faas-workbench')
-    with fs.open(dataset_bucket+'/'+dataset_blob_name) as f:
-        df = pd.read_csv(f)
-    
-        start = time()
-        df['train'] = df['Text'].apply(cleanup)
+    store = storage.open_store(default='gcs', project='Serverless-faas-workbench')
 
-        tfidf_vect = TfidfVectorizer(min_df=100).fit(df['train'])
-    
-        train = tfidf_vect.transform(df['train'])
+    with instrument.Recorder("model_training", "google") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            df = pd.read_csv(io.BytesIO(store.get_object(dataset_bucket, dataset_blob_name)))
 
-        model = LogisticRegression()
-        model.fit(train, df['Score'])
-        latency = time() - start
-        print(latency)
-    
         model_file_path = "/tmp/" + model_blob_name
-        joblib.dump(model, model_file_path)
-    
-        storage_client = storage.Client()
-        m_bucket = storage_client.get_bucket(model_bucket)
-        m_blob = m_bucket.blob(model_blob_name)
-    
-        upload_blob(model_bucket, m_blob, model_file_path)
-    
-        return "latency : " + str(latency)
+        train(df, model_file_path)
+
+        with rec.span(instrument.UPLOAD_DATA):
+            upload_blob(store, model_bucket, model_blob_name, model_file_path)
+
+    return json.dumps(rec.result())
@@ -1,35 +1,19 @@
-from time import time
-import random
-import string
-import pyaes
+import json
 
-
-def generate(length):
-    letters = string.ascii_lowercase + string.digits
-    return ''.join(random.choice(letters) for i in range(length))
+from functionbench import instrument
+from functionbench.workloads.pyaes import generate, encrypt_decrypt
 
 
 def function_handler(request):
     request_json = request.get_json(silent=True)
     length_of_message = request_json['length_of_message']
     num_of_iterations = request_json['num_of_iterations']
+    backend = request_json.get('backend', 'pyaes')
 
     message = generate(length_of_message)
 
-    # 128-bit key (16 bytes)
-    KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
-
-    start = time()
-    for loops in range(num_of_iterations):
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        ciphertext = aes.encrypt(message)
-        print(ciphertext)
-
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        plaintext = aes.decrypt(ciphertext)
-        print(plaintext)
-        aes = None
-
-    latency = time() - start
+    with instrument.Recorder("pyaes", "google") as rec:
+        result = encrypt_decrypt(message, num_of_iterations, backend)
 
-    return "latency : " + str(latency)
+    return json.dumps(rec.result(backend=result['backend'], mb_per_sec=result['mb_per_sec'],
+                                 verified=result['verified']))
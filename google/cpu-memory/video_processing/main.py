@@ -1,45 +1,19 @@
-from google.cloud import storage
-from time import time
-import cv2
+import json
 
-def video_processing(blob_name, file_path):
-    output_file_path = '/tmp/output-' + blob_name
-    video = cv2.VideoCapture(file_path)
-    
-    width = int(video.get(3))
-    height = int(video.get(4))
-    
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')
-    out = cv2.VideoWriter(output_file_path, fourcc, 20.0, (width, height))
-    
-    start = time()
-    while(video.isOpened()):
-        ret, frame = video.read()
+from functionbench import events, instrument, storage
+from functionbench.workloads.video_processing import (video_processing, video_processing_parallel,
+                                                       video_processing_pipelined)
 
-        if ret:
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            im = cv2.imwrite('/tmp/frame.jpg', gray_frame)
-            gray_frame = cv2.imread('/tmp/frame.jpg')
-            out.write(gray_frame)
-        else:
-            break
-            
-    latency = time() - start
-    
-    video.release()
-    out.release()
-    return latency, output_file_path
-
-def download_blob(blob, download_path):
-    blob.download_to_filename(download_path)
+def download_blob(store, bucket_name, blob_name, download_path):
+    store.download_file(bucket_name, blob_name, download_path)
     print('Blob {} downloaded to {}.'.format(
-        blob.name,
+        blob_name,
         download_path))
 
-def upload_blob(bucket_name, blob, upload_path):
-    blob.upload_from_filename(upload_path)
+def upload_blob(store, bucket_name, blob_name, upload_path):
+    store.upload_file(upload_path, bucket_name, blob_name)
     print('File {} uploaded to {}.'.format(
-        blob.name,
+        blob_name,
         bucket_name))
     
 def function_handler(request):
@@ -48,17 +22,25 @@ def function_handler(request):
     blob_name = request_json['blob_name']
     dst_bucket = request_json['dst_bucket']
     
-    storage_client = storage.Client()
-    s_bucket = storage_client.get_bucket(src_bucket)
-    s_blob = s_bucket.blob(blob_name)
+    store = storage.open_store(default='gcs')
     
-    download_path = "/tmp/" + blob_name
-    download_blob(s_blob, download_path)
+    with instrument.Recorder("video_processing", "google") as rec:
+        download_path = "/tmp/" + blob_name
+        with rec.span(instrument.DOWNLOAD_DATA):
+            download_blob(store, src_bucket, blob_name, download_path)
     
-    latency, upload_path = video_processing(blob_name, download_path)
+        mode = request_json.get('mode', 'memory')
+        workers = request_json.get('workers')
+        if mode == 'parallel':
+            result, upload_path = video_processing_parallel(blob_name, download_path, workers=workers and int(workers),
+                                                            compare=events.flag(request_json.get('compare')))
+        elif mode == 'pipelined':
+            result, upload_path = video_processing_pipelined(blob_name, download_path, workers=int(workers or 2))
+        else:
+            result, upload_path = video_processing(blob_name, download_path, mode=mode)
     
-    d_bucket = storage_client.get_bucket(dst_bucket)
-    d_blob = d_bucket.blob(blob_name)
-    upload_blob(dst_bucket, d_blob, upload_path)
+        with rec.span(instrument.UPLOAD_DATA):
+            upload_blob(store, dst_bucket, blob_name, upload_path)
     
-    return "latency : " + str(latency)
\ No newline at end of file
+    metrics = dict((k, v) for k, v in result.items() if k != 'latency')
+    return json.dumps(rec.result(**metrics))
@@ -1,6 +1,9 @@
+import json
 import os
 import subprocess
 
+from functionbench import instrument
+
 
 def function_handler(request):
     request_json = request.get_json(silent=True)
@@ -8,9 +11,11 @@ def function_handler(request):
     count = 'count='+request_json['count']
     print(bs)
     print(count)
-    out_fd = open('/tmp/io_write_logs','w')
-    a = subprocess.Popen(['dd', 'if=/dev/zero', 'of=/tmp/out', bs, count], stderr=out_fd)
-    a.communicate()
+    with instrument.Recorder("dd", "google") as rec:
+        out_fd = open('/tmp/io_write_logs','w')
+        with rec.span("disk_write"):
+            a = subprocess.Popen(['dd', 'if=/dev/zero', 'of=/tmp/out', bs, count], stderr=out_fd)
+            a.communicate()
     
     output = subprocess.check_output(['ls', '-alh', '/tmp/'])
     print(output)
@@ -21,4 +26,4 @@ def function_handler(request):
     with open('/tmp/io_write_logs') as logs:
         result = str(logs.readlines()[2]).replace('\n', '')
         print(result)
-        return result
\ No newline at end of file
+        return json.dumps(rec.result(dd=result))
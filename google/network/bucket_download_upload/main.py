@@ -1,16 +1,17 @@
-from google.cloud import storage
-from time import time
+import json
+
+from functionbench import instrument, storage
         
-def download_blob(blob, download_path):
-    blob.download_to_filename(download_path)
+def download_blob(store, bucket_name, blob_name, download_path):
+    store.download_file(bucket_name, blob_name, download_path)
     print('Blob {} downloaded to {}.'.format(
-        blob.name,
+        blob_name,
         download_path))
 
-def upload_blob(bucket_name, blob, upload_path):
-    blob.upload_from_filename(upload_path)
+def upload_blob(store, bucket_name, blob_name, upload_path):
+    store.upload_file(upload_path, bucket_name, blob_name)
     print('File {} uploaded to {}.'.format(
-        blob.name,
+        blob_name,
         bucket_name))
 
 def function_handler(request):
@@ -19,21 +20,16 @@ def function_handler(request):
     src_bucket = request_json['src_bucket']
     dst_bucket = request_json['dst_bucket']
     
-    storage_client = storage.Client()
-    s_bucket = storage_client.get_bucket(src_bucket)
-    s_blob = s_bucket.blob(blob_name)
+    store = storage.open_store(default='gcs')
     
-    start = time()
-    file_path = "/tmp/" + blob_name
-    download_blob(s_blob, file_path)
-    download_time = time() - start
+    with instrument.Recorder("bucket_download_upload", "google") as rec:
+        file_path = "/tmp/" + blob_name
+        with rec.span(instrument.DOWNLOAD_DATA):
+            download_blob(store, src_bucket, blob_name, file_path)
     
-    start = time()
-    d_bucket = storage_client.get_bucket(dst_bucket)
-    d_blob = d_bucket.blob(blob_name)
-    upload_blob(dst_bucket, d_blob, file_path) 
-    upload_time = time() - start
+        with rec.span(instrument.UPLOAD_DATA):
+            upload_blob(store, dst_bucket, blob_name, file_path) 
     
-    result = "Download time : " + str(download_time) + " Upload Time : " + str(upload_time)
-    print(result)
-    return result
\ No newline at end of file
+    result = rec.result()
+    print(result["latencies"])
+    return json.dumps(result)
@@ -1,24 +1,18 @@
-from time import time
 import json
-from urllib.request import urlopen
+
+from functionbench import instrument
+from functionbench.workloads.json_dumps_loads import fetch, dumps_loads
 
 
 def function_handler(request):
     request_json = request.get_json(silent=True)
     link = request_json['link'] # https://github.com/jdorfman/awesome-json-datasets
 
-    start = time()
-    f = urlopen(link)
-    data = f.read().decode("utf-8")
-    network = time() - start
+    with instrument.Recorder("json_dumps_loads", "google") as rec:
+        network, data = fetch(link)
 
-    start = time()
-    json_data = json.loads(data)
-    str_json = json.dumps(json_data, indent=4)
-    latency = time() - start
+        latency, str_json = dumps_loads(data)
 
     print(str_json)
 
-    return "network : " + str(network) \
-           + "/ latency : " + str(latency)
-
+    return json.dumps(rec.result())
@@ -1,12 +1,12 @@
-import boto3
 import json
 from functools import partial
 from multiprocessing.dummy import Pool as ThreadPool
 
 import requests
 
-s3 = boto3.resource('s3')
-lambda_client = boto3.client('lambda')
+from functionbench import storage
+
+s3 = storage.open_store()
 
 wsk_host = "http://172.17.0.1:3233"
 
@@ -36,10 +36,7 @@ def invoke_lambda(output_bucket, key):
 def main(args):
     bucket = args['input_bucket']
 
-    all_keys = []
-
-    for obj in s3.Bucket(bucket).objects.all():
-        all_keys.append(obj.key)
+    all_keys = s3.list_objects(bucket)
 
     print("Number of File : " + str(len(all_keys)))
     print("File : " + str(all_keys))
@@ -1,24 +1,13 @@
-import math
-from time import time
-
-
-def float_operations(n):
-    start = time()
-    for i in range(0, n):
-        sin_i = math.sin(i)
-        cos_i = math.cos(i)
-        sqrt_i = math.sqrt(i)
-    latency = time() - start
-    return latency
+from functionbench import instrument
+from functionbench.workloads.float_operation import float_operations
 
 
 def main(event):
-    latencies = {}
-    timestamps = {}
-    timestamps["starting_time"] = time()
     n = int(event['n'])
-    metadata = event['metadata']
-    latency = float_operations(n)
-    latencies["function_execution"] = latency
-    timestamps["finishing_time"] = time()
-    return {"latencies": latencies, "timestamps": timestamps, "metadata": metadata}
\ No newline at end of file
+    engine = event.get('engine', 'python')
+    threads = event.get('threads')
+    metadata = event.get('metadata')
+    with instrument.Recorder("float_operation", "openwhisk") as rec:
+        result = float_operations(n, engine, threads=threads and int(threads))
+    return rec.result(metadata, engine=result['engine'], threads=result['threads'],
+                      ops_per_sec=result['ops_per_sec'])
@@ -1,72 +0,0 @@
-from PIL import Image, ImageFilter
-
-TMP = "./"
-
-
-def flip(image, file_name):
-    path_list = []
-    path = TMP + "flip-left-right-" + file_name
-    img = image.transpose(Image.FLIP_LEFT_RIGHT)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "flip-top-bottom-" + file_name
-    img = image.transpose(Image.FLIP_TOP_BOTTOM)
-    img.save(path)
-    path_list.append(path)
-
-    return path_list
-
-
-def rotate(image, file_name):
-    path_list = []
-    path = TMP + "rotate-90-" + file_name
-    img = image.transpose(Image.ROTATE_90)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "rotate-180-" + file_name
-    img = image.transpose(Image.ROTATE_180)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "rotate-270-" + file_name
-    img = image.transpose(Image.ROTATE_270)
-    img.save(path)
-    path_list.append(path)
-
-    return path_list
-
-
-def filter(image, file_name):
-    path_list = []
-    path = TMP + "blur-" + file_name
-    img = image.filter(ImageFilter.BLUR)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "contour-" + file_name
-    img = image.filter(ImageFilter.CONTOUR)
-    img.save(path)
-    path_list.append(path)
-
-    path = TMP + "sharpen-" + file_name
-    img = image.filter(ImageFilter.SHARPEN)
-    img.save(path)
-    path_list.append(path)
-
-    return path_list
-
-
-def gray_scale(image, file_name):
-    path = TMP + "gray-scale-" + file_name
-    img = image.convert('L')
-    img.save(path)
-    return [path]
-
-
-def resize(image, file_name):
-    path = TMP + "resized-" + file_name
-    image.thumbnail((128, 128))
-    image.save(path)
-    return [path]
@@ -1,6 +0,0 @@
-from setuptools import find_packages, setup
-
-setup(name="ops",
-      version="0.1",
-      packages=find_packages(),
-      )
\ No newline at end of file
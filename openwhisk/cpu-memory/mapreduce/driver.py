@@ -1,4 +1,3 @@
-import boto3
 import json
 from functools import partial
 from multiprocessing.dummy import Pool as ThreadPool
@@ -6,10 +5,9 @@ import time
 
 import requests
 
-# Create AWS resource and client
-s3 = boto3.resource('s3')
-s3_client = boto3.client('s3')
-lambda_client = boto3.client('lambda')
+from functionbench import instrument, storage
+
+s3_client = storage.open_store()
 
 wsk_host= "http://172.17.0.1:3233"
 
@@ -45,11 +43,11 @@ def map_invoke_lambda(job_bucket, bucket, all_keys, batch_size, mapper_id):
         })
     )
 
-    json_data = response['result']
+    latencies = response['result']['latencies']
 
     global total_map, total_network
-    total_map += float(json_data['map'])
-    total_network += float(json_data['network'])
+    total_map += latencies[instrument.FUNCTION_EXECUTION]
+    total_network += latencies[instrument.DOWNLOAD_DATA] + latencies[instrument.UPLOAD_DATA]
 
 
 def reduce_invoke_lambda(job_bucket):
@@ -68,10 +66,7 @@ def main(args):
     n_mapper = args['n_mapper']
 
     # Fetch all the keys
-    all_keys = []
-    for obj in s3.Bucket(src_bucket).objects.all():
-        all_keys.append(obj.key)
-
+    all_keys = s3_client.list_objects(src_bucket)
 
     print("dataset file : " + str(len(all_keys)))
     print("key name : " + str(all_keys))
@@ -95,7 +90,7 @@ def main(args):
     pool.join()
 
     while True:
-        job_keys = s3_client.list_objects(Bucket=job_bucket)["Contents"]
+        job_keys = s3_client.list_objects(job_bucket)
         print("Wait Mapper Jobs ...")
         time.sleep(5)
         if len(job_keys) == len(all_keys):
@@ -1,48 +1,22 @@
-import json
-import boto3
-from time import time
+from functionbench import instrument, storage
+from functionbench.workloads.mapreduce import init_output, reduce_contents
 
-# Create S3 session
-s3 = boto3.resource('s3')
-s3_client = boto3.client('s3')
-
-
-computer_language = ["JavaScript", "Java", "PHP", "Python", "C#", "C++",
-                     "Ruby", "CSS", "Objective-C", "Perl",
-                     "Scala", "Haskell", "MATLAB", "Clojure", "Groovy"]
+s3_client = storage.open_store()
 
 
 def main(args):
     job_bucket = args['job_bucket']
 
-    output = {}
-
-    for lang in computer_language:
-        output[lang] = 0
-
-    network = 0
-    reduce = 0
-
-    all_keys = []
-    for obj in s3.Bucket(job_bucket).objects.all():
-        all_keys.append(obj.key)
+    output = init_output()
 
-    for key in all_keys:
-        start = time()
-        response = s3_client.get_object(Bucket=job_bucket, Key=key)
-        contents = response['Body'].read()
-        network += time() - start
+    all_keys = s3_client.list_objects(job_bucket)
 
-        start = time()
-        data = json.loads(contents)
-        for key in data:
-            output[key] += data[key]
-        reduce += time() - start
+    with instrument.Recorder("mapreduce_reducer", "openwhisk") as rec:
+        for key in all_keys:
+            with rec.span(instrument.DOWNLOAD_DATA):
+                contents = s3_client.get_object(job_bucket, key)
 
-    metadata = {
-        'output': str(output),
-        'network': str(network),
-        'reduce': str(reduce)
-    }
+            with rec.span(instrument.FUNCTION_EXECUTION):
+                reduce_contents(contents, output)
 
-    return metadata
+    return rec.result(args.get('metadata'), output=output)
@@ -1,26 +1,14 @@
-import numpy as np
-from time import time
-
-
-def matmul(n):
-    A = np.random.rand(n, n)
-    B = np.random.rand(n, n)
-
-    start = time()
-    C = np.matmul(A, B)
-    latency = time() - start
-    return latency
+from functionbench import events, instrument
+from functionbench.workloads.matmul import matmul
 
 
 def main(event):
-    latencies = {}
-    timestamps = {}
-    
-    timestamps["starting_time"] = time()
     n = int(event['n'])
-    metadata = event['metadata']
-    result = matmul(n)
-    latencies["function_execution"] = result
-    timestamps["finishing_time"] = time()
-
-    return {"latencies": latencies, "timestamps": timestamps, "metadata": metadata}
+    metadata = event.get('metadata')
+    with instrument.Recorder("matmul", "openwhisk") as rec:
+        result = matmul(n, event.get('dtype', 'float64'), event.get('layout', 'C'),
+                        threads=int(event.get('threads', 0)), reps=int(event.get('reps', 1)),
+                        warmup=int(event.get('warmup', 0)), blocked=events.flag(event.get('blocked')),
+                        block_size=int(event.get('block_size', 1024)))
+    return rec.result(metadata, gflops=result['gflops'], best_gflops=result['best_gflops'],
+                      peak_rss_growth=result['peak_rss_growth'], blas_threads=result['blas_threads'])
@@ -1,46 +1,60 @@
-import boto3
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.applications.resnet50 import preprocess_input, decode_predictions
-import numpy as np
+import os
 import uuid
-from time import time
 
-from squeezenet import SqueezeNet
+from functionbench import instrument, models, storage
+from functionbench.workloads.cnn_image_classification import load_model, predict, predict_batch, serve
 
-s3_client = boto3.client('s3')
+s3_client = storage.open_store()
 
 tmp = "/tmp/"
 
 
-
-def predict(img_local_path):
-    start = time()
-    model = SqueezeNet(weights='imagenet')
-    img = image.load_img(img_local_path, target_size=(227, 227))
-    x = image.img_to_array(img)
-    x = np.expand_dims(x, axis=0)
-    x = preprocess_input(x)
-    preds = model.predict(x)
-    res = decode_predictions(preds)
-    latency = time() - start
-    return latency, res
-
-
 def main(args):
     input_bucket = args['input_bucket']
-    object_key = args['object_key']
+    # batch form: "object_keys": [...] or "prefix": "..." instead of "object_key"
+    object_keys = args.get('object_keys')
+    if object_keys is None and 'prefix' in args:
+        object_keys = s3_client.list_objects(input_bucket, args['prefix'])
+    object_key = args.get('object_key')
+    mode = args.get('mode')
+    preprocessing = args.get('preprocessing', 'keras')  # or "fast"
 
     model_object_key = args['model_object_key']  # example : squeezenet_weights_tf_dim_ordering_tf_kernels.h5
     model_bucket = args['model_bucket']
-
-    download_path = tmp + '{}{}'.format(uuid.uuid4(), object_key)
-    s3_client.download_file(input_bucket, object_key, download_path)
-
-    model_path = tmp + '{}{}'.format(uuid.uuid4(), model_object_key)
-    s3_client.download_file(model_bucket, model_object_key, model_path)
-    
-    latency, result = predict(download_path)
-        
-    _tmp_dic = {x[1]: {'N': str(x[2])} for x in result[0]}
-
-    return {"latency": latency}
+    model_sha256 = args.get('model_sha256')
+
+    with instrument.Recorder("cnn_image_classification", "openwhisk") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            download_paths = []
+            for key in ([object_key] if object_keys is None else object_keys):
+                download_path = tmp + '{}{}'.format(uuid.uuid4(), os.path.basename(key))
+                s3_client.download_file(input_bucket, key, download_path)
+                download_paths.append(download_path)
+
+        with rec.span(instrument.MODEL_LOAD):
+            model, model_cache = models.load(s3_client, model_bucket, model_object_key, load_model,
+                                             sha256=model_sha256)
+
+        metrics = {}
+        if mode == 'serve':
+            result, predictions = serve(download_paths, model, requests=args.get('requests'),
+                                        concurrency=int(args.get('concurrency', 8)),
+                                        max_batch_size=int(args.get('max_batch_size', 8)),
+                                        max_wait=float(args.get('max_wait_ms', 5)) / 1000,
+                                        preprocessing=preprocessing)
+            metrics = dict((k, v) for k, v in result.items() if k != 'latency')
+        elif object_keys is not None:
+            result, predictions = predict_batch(download_paths, model, batch_size=int(args.get('batch_size', 32)),
+                                                preprocessing=preprocessing)
+            metrics = dict((k, v) for k, v in result.items() if k != 'latency')
+        else:
+            latency, predictions = predict(download_paths[0], model, preprocessing)
+
+    if object_keys is None:
+        metrics['predictions'] = [[x[1], float(x[2])] for x in predictions[0]]
+    else:
+        # one entry per request, in order: a batch may name the same key more than once
+        metrics['predictions'] = [{'key': key,
+                                   'predictions': None if res is None else [[x[1], float(x[2])] for x in res]}
+                                  for key, res in zip(object_keys, predictions)]
+    return rec.result(args.get('metadata'), model_cache=model_cache, cache_hit=model_cache != models.DOWNLOAD, **metrics)
@@ -1,29 +1,13 @@
-import boto3
 import os
-import pickle
-import numpy as np
-import torch
-import rnn
 
-from time import time
+from functionbench import instrument, storage
+from functionbench.workloads.rnn_generate_character_level import load_model, generate
 
 
 tmp = "/tmp/"
 
-"""
-Language
- - Italian, German, Portuguese, Chinese, Greek, Polish, French
- - English, Spanish, Arabic, Crech, Russian, Irish, Dutch
- - Scottish, Vietnamese, Korean, Japanese
-"""
-
 
 def main(event):
-    latencies = {}
-    timestamps = {}
-    
-    timestamps["starting_time"] = time()
-
     language = event['language']
     start_letters = event['start_letters']
     model_parameter_object_key = event['model_parameter_object_key']  # example : rnn_params.pkl
@@ -32,49 +16,28 @@ def main(event):
     endpoint_url = event['endpoint_url']
     aws_access_key_id = event['aws_access_key_id']
     aws_secret_access_key = event['aws_secret_access_key']
-    metadata = event['metadata']
+    metadata = event.get('metadata')
 
-    s3_client = boto3.client('s3',
-                    endpoint_url=endpoint_url,
-                    aws_access_key_id=aws_access_key_id,
-                    aws_secret_access_key=aws_secret_access_key)#,                                                                                                                                                                                                                                                                                                            
-                    #config=Config(signature_version='s3v4'),                                                                                                                                                                                                                                                                                                                 
-                    #region_name='us-east-1')  
+    s3_client = storage.open_store(endpoint_url=endpoint_url,
+                                   aws_access_key_id=aws_access_key_id,
+                                   aws_secret_access_key=aws_secret_access_key)
 
     # Check if models are available
     # Download model from S3 if model is not already present
     parameter_path = tmp + model_parameter_object_key
     model_path = tmp + model_object_key
 
-    start = time()
-
-    if not os.path.isfile(parameter_path):
-        s3_client.download_file(model_bucket, model_parameter_object_key, parameter_path)
-
-    if not os.path.isfile(model_path):
-        s3_client.download_file(model_bucket, model_object_key, model_path)
-
-    download_data = time() - start
-    latencies["download_data"] = download_data
-
-    start = time()
-
-    with open(parameter_path, 'rb') as pkl:
-        params = pickle.load(pkl)
-
-    all_categories = params['all_categories']
-    n_categories = params['n_categories']
-    all_letters = params['all_letters']
-    n_letters = params['n_letters']
+    with instrument.Recorder("rnn_generate_character_level", "openwhisk") as rec:
+        with rec.span(instrument.DOWNLOAD_DATA):
+            if not os.path.isfile(parameter_path):
+                s3_client.download_file(model_bucket, model_parameter_object_key, parameter_path)
 
-    rnn_model = rnn.RNN(n_letters, 128, n_letters, all_categories, n_categories, all_letters, n_letters)
-    rnn_model.load_state_dict(torch.load(model_path))
-    rnn_model.eval()
+            if not os.path.isfile(model_path):
+                s3_client.download_file(model_bucket, model_object_key, model_path)
 
-    output_names = list(rnn_model.samples(language, start_letters))
+        with rec.span("model_load"):
+            rnn_model = load_model(parameter_path, model_path)
 
-    latency = time() - start
-    latencies["function_execution"] = latency
-    timestamps["finishing_time"] = time()
+        generate(rnn_model, language, start_letters)
 
-    return {"latencies": latencies, "timestamps": timestamps, "metadata": metadata}
\ No newline at end of file
+    return rec.result(metadata)
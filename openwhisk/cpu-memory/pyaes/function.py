@@ -1,39 +1,17 @@
-from time import time
-import random
-import string
-import pyaes
-
-
-def generate(length):
-    letters = string.ascii_lowercase + string.digits
-    return ''.join(random.choice(letters) for i in range(length))
+from functionbench import instrument
+from functionbench.workloads.pyaes import generate, encrypt_decrypt
 
 
 def main(event):
-    latencies = {}
-    timestamps = {}
-    
-    timestamps["starting_time"] = time()
     length_of_message = event['length_of_message']
     num_of_iterations = event['num_of_iterations']
-    metadata = event['metadata']
+    backend = event.get('backend', 'pyaes')
+    metadata = event.get('metadata')
 
     message = generate(length_of_message)
 
-    # 128-bit key (16 bytes)
-    KEY = b'\xa1\xf6%\x8c\x87}_\xcd\x89dHE8\xbf\xc9,'
-
-    start = time()
-    for loops in range(num_of_iterations):
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        ciphertext = aes.encrypt(message)
-
-        aes = pyaes.AESModeOfOperationCTR(KEY)
-        plaintext = aes.decrypt(ciphertext)
-        aes = None
-
-    latency = time() - start
-    latencies["function_execution"] = latency
-    timestamps["finishing_time"] = time()
+    with instrument.Recorder("pyaes", "openwhisk") as rec:
+        result = encrypt_decrypt(message, num_of_iterations, backend)
 
-    return {"latencies": latencies, "timestamps": timestamps, "metadata": metadata}
\ No newline at end of file
+    return rec.result(metadata, backend=result['backend'], mb_per_sec=result['mb_per_sec'],
+                      verified=result['verified'])
@@ -0,0 +1,6 @@
+from setuptools import find_packages, setup
+
+setup(name="functionbench",
+      version="0.1",
+      packages=find_packages(include=["functionbench", "functionbench.*"]),
+      )